@@ -12,6 +12,15 @@ DATA_FILE = BASE / "pint_economy.json"
 # Users can still owe more than this, but will need to split it into multiple debts
 MAXIMUM_PER_DEBT: int = 10
 
+# Set to True to cancel debts around cycles (A owes B, B owes C, C owes A) as soon as a new debt closes one
+# The smallest debt in the cycle is settled around it, recorded as settle transactions
+CANCEL_DEBT_CYCLES: bool = False
+# The most debts in a cycle to look for; longer cycles are left for /debts/simplify
+DEBT_CYCLE_MAX_LENGTH: int = 4
+
+# The most debts that can be added in one request to /debts/batch
+MAXIMUM_DEBTS_PER_BATCH: int = 50
+
 # The API internally converts everything to Fractions so it can deal with fractional debts.
 # Set this to the allowed smallest fraction of the currency that can be used in the economy
 # If you would like to use whole numbers only, set this to 1
@@ -27,5 +36,57 @@ QUANTIZE_OWING_DEBTS: bool = True
 # True = sort debts most owed by user to least owed, false = sort by most owed to user to least
 SORT_OWES_FIRST: bool = True
 
+# How many /debts, /users/{id}/debts and /debts/between responses to cache between changes (0 to disable)
+RESPONSE_CACHE_SIZE: int = 1024
+
+# Set to True to write data files as compact JSON and encode them and responses with orjson if it is installed
+# Set to False to write indented data files that are easier to read while debugging
+JSON_FAST_MODE: bool = True
+
 TRANSACTIONS_DEFAULT_TIME_PERIOD: int = 30
-VALID_TRANSACTION_TYPES: set[str] = {"owe", "settle", "cashout"}
\ No newline at end of file
+VALID_TRANSACTION_TYPES: set[str] = {"owe", "settle", "cashout"}
+
+# The largest page of transactions /transactions will return when a limit is given
+TRANSACTIONS_MAX_PAGE_SIZE: int = 1000
+
+# Set to True to keep the transaction history in memory with a sorted timestamp index
+# /transactions is then answered without reading storage, at the cost of memory proportional to the history
+# (roughly 30 MiB per 100,000 transactions, depending on the length of their reasons)
+# Off by default, so storage answers instead: segmented mode skips segments outside the date range
+# and the SQLite backend filters with its indexes
+TRANSACTIONS_INDEX_ENABLED: bool = False
+
+# Set to True to keep daily counts and totals of transactions per type and user in memory
+# /transactions/summary is then answered from one rollup per day instead of every transaction, unless filtered by counterparty
+TRANSACTIONS_ROLLUPS_ENABLED: bool = True
+
+# Where the API stores its data
+# "json" keeps debts, transactions and preferences in JSON files in the api/data folder
+# "sqlite" keeps them in indexed tables in api/data/pint_economy.db (WAL mode), which scales to much larger economies
+# Switching to "sqlite" imports the existing JSON data the first time it starts with an empty database
+STORAGE_BACKEND: str = "json"
+
+# How transactions are stored on disk when using the "json" storage backend
+# "jsonl" appends one line per transaction to transactions.jsonl, so writes cost the same however long the history is
+# "segmented" appends to one log per TRANSACTIONS_SEGMENT_PERIOD in the transactions folder, so date range queries
+# only read the periods they cover
+# "json" rewrites the whole transactions.json file on every write (legacy format)
+# Older transaction files are migrated automatically the first time a new mode is used
+TRANSACTIONS_STORAGE_MODE: str = "jsonl"
+
+# The period covered by each transaction segment in "segmented" mode: "day", "week", "month" or "year"
+# This is fixed when the segments are first created
+TRANSACTIONS_SEGMENT_PERIOD: str = "month"
+
+# How the in-memory debt ledger is persisted to disk
+# "sync" writes the ledger before each request that changes it returns, grouping concurrent changes into one write
+# The SQLite backend then also syncs every commit to disk (synchronous=FULL) so power loss can't undo it
+# "batched" writes it in the background at most once every DEBTS_FLUSH_INTERVAL_MS milliseconds
+# "shutdown" only writes it when the API stops (fastest, but a crash loses every change since startup)
+# Transactions are always logged straight away, so with "batched" or "shutdown" a hard kill can lose debts that were
+# already acknowledged and leave the transaction history ahead of the ledger
+DEBTS_DURABILITY_MODE: str = "sync"
+DEBTS_FLUSH_INTERVAL_MS: int = 200
+
+# In "sync" mode, changes that arrive within this many milliseconds of each other are written to disk together
+DEBTS_GROUP_COMMIT_WINDOW_MS: int = 25
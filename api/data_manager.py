@@ -1,58 +1,93 @@
 """Module for handling data loading and saving."""
-import json
+from datetime import datetime
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import api.config as config
+from api.storage.repository import Repository
+from api.storage.json_repository import JsonRepository
+from api.storage.sqlite_repository import SqliteRepository
+from api.transaction_index import transaction_index
+from api.transaction_rollups import transaction_rollups
+from api.ledger import Ledger
 from models import (
-    DebtsData,
-    TransactionsData,
     TransactionEntry,
-    PreferencesData,
+    UserPreferences,
 )
 
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIRECTORY = BASE_DIR / "data"
-DEBTS_FILE = DATA_DIRECTORY / "debts.json"
-TRANSACTIONS_FILE = DATA_DIRECTORY / "transactions.json"
-PREFERENCES_FILE = DATA_DIRECTORY / "preferences.json"
+DATABASE_FILE = DATA_DIRECTORY / "pint_economy.db"
 
-def load_data(file_path: Path, model, fallback):
-    """Generic loader for JSON files with fallback."""
-    if not file_path.exists():
-        return model(**fallback)
-    return model(**json.loads(file_path.read_text()))
+_repository: Optional[Repository] = None
 
-def save_data(file_path: Path, data):
-    """Generic saver for JSON files."""
-    file_path.parent.mkdir(parents=True, exist_ok=True)
-    file_path.write_text(json.dumps(data.model_dump(), indent=2))
+def create_repository(backend: str) -> Repository:
+    """Create the storage backend with the given name."""
+    if backend == "json":
+        return JsonRepository(DATA_DIRECTORY)
+    if backend == "sqlite":
+        repository = SqliteRepository(DATABASE_FILE)
+        repository.import_json(JsonRepository(DATA_DIRECTORY))
+        return repository
+    raise ValueError(f"Unknown storage backend '{backend}'. Must be one of: json, sqlite")
+
+def get_repository() -> Repository:
+    """Get the active storage backend, creating it from config on first use."""
+    global _repository
+    if _repository is None:
+        _repository = create_repository(config.STORAGE_BACKEND)
+    return _repository
+
+def set_repository(repository: Optional[Repository]):
+    """Replace the active storage backend. Passing None recreates it from config on next use."""
+    global _repository
+    _repository = repository
 
 # --- Debts ---
-def load_debts() -> DebtsData:
+def load_debts() -> Ledger:
     """Load debts data."""
-    fallback = {"debtors": {}}
-    return load_data(DEBTS_FILE, DebtsData, fallback)
+    return get_repository().load_debts()
 
-def save_debts(data: DebtsData):
+def save_debts(data: Ledger):
     """Save debts data."""
-    save_data(DEBTS_FILE, data)
+    get_repository().save_debts(data)
+
+def save_debt_pairs(data: Ledger, pairs: Iterable[tuple[str, str]]):
+    """Save the debts of the given (debtor ID, creditor ID) pairs, or the whole ledger if the backend can't write pairs."""
+    get_repository().save_debt_pairs(data, pairs)
+
+def writes_debt_pairs() -> bool:
+    """Whether the storage backend writes only the pairs passed to save_debt_pairs."""
+    return get_repository().writes_debt_pairs
 
 # --- Transactions ---
-def load_transactions() -> TransactionsData:
-    """Load transactions data."""
-    fallback = {"transactions": []}
-    return load_data(TRANSACTIONS_FILE, TransactionsData, fallback)
+def iter_transactions(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[str] = None,
+    transaction_type: Optional[str] = None,
+    counterparty_id: Optional[str] = None,
+) -> Iterator[TransactionEntry]:
+    """Yield stored transactions in the order they were recorded, optionally filtered."""
+    return get_repository().iter_transactions(start, end, user_id, transaction_type, counterparty_id)
 
 def append_transaction(entry: TransactionEntry):
     """Append a new transaction entry."""
-    transactions_data = load_transactions()
-    transactions_data.transactions.append(entry)
-    save_data(TRANSACTIONS_FILE, transactions_data)
+    append_transactions([entry])
+
+def append_transactions(entries: list[TransactionEntry]):
+    """Append several new transaction entries with a single write."""
+    get_repository().append_transactions(entries)
+    for entry in entries:
+        if transaction_index.loaded:
+            transaction_index.add(entry)
+        if transaction_rollups.loaded:
+            transaction_rollups.add(entry)
 
 # --- Preferences ---
-def load_preferences() -> PreferencesData:
-    """Load user preferences data."""
-    fallback = {"users": {}}
-    return load_data(PREFERENCES_FILE, PreferencesData, fallback)
-
-def save_preferences(data: PreferencesData):
-    """Save user preferences data."""
-    save_data(PREFERENCES_FILE, data)
+def get_user_preferences(user_id: str) -> Optional[UserPreferences]:
+    """Get a user's preferences, or None if they have never set any."""
+    return get_repository().get_user_preferences(user_id)
+
+def save_user_preferences(user_id: str, preferences: UserPreferences):
+    """Save a user's preferences."""
+    get_repository().save_user_preferences(user_id, preferences)
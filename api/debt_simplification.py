@@ -0,0 +1,127 @@
+"""Module for simplifying the debts in the economy to as few as possible."""
+from heapq import heapify, heappop, heappush
+from typing import Optional
+from api.ledger import Ledger, LedgerEntry
+from api.utilities.debt_helpers import settle_debts_between_users, sum_ticks
+from api.utilities.tick_helpers import Ticks, from_ticks, normalize_ticks
+from models import TransactionEntry
+
+def net_balances(user_totals: dict[str, dict[str, Ticks]]) -> dict[str, Ticks]:
+    """Each user's balance in ticks, positive when they are owed more than they owe. Settled users are left out."""
+    return {
+        user_id: normalize_ticks(totals["is_owed"] - totals["owes"])
+        for user_id, totals in user_totals.items()
+        if totals["is_owed"] != totals["owes"]
+    }
+
+def simplify_balances(balances: dict[str, Ticks]) -> list[tuple[str, str, Ticks]]:
+    """Debts as (debtor ID, creditor ID, ticks) that leave every user with the same balance.
+
+    The user who owes most is repeatedly matched with the user who is owed most, so each
+    match clears at least one of them and there are fewer debts than users with a balance.
+    Ties are broken by user ID so the result is always the same for the same balances.
+    """
+    # Owing users by balance, most negative first, and owed users by negated balance
+    debtors = [(balance, user_id) for user_id, balance in balances.items() if balance < 0]
+    creditors = [(-balance, user_id) for user_id, balance in balances.items() if balance > 0]
+    heapify(debtors)
+    heapify(creditors)
+
+    debts = []
+    while debtors and creditors:
+        debtor_balance, debtor_id = heappop(debtors)
+        creditor_balance, creditor_id = heappop(creditors)
+        ticks = min(-debtor_balance, -creditor_balance)
+        debts.append((debtor_id, creditor_id, normalize_ticks(ticks)))
+
+        if -debtor_balance > ticks:
+            heappush(debtors, (normalize_ticks(debtor_balance + ticks), debtor_id))
+        if -creditor_balance > ticks:
+            heappush(creditors, (normalize_ticks(creditor_balance + ticks), creditor_id))
+    return debts
+
+def find_cycle(ledger: Ledger, debtor_id: str, creditor_id: str, max_length: int) -> Optional[list[str]]:
+    """The users around the shortest cycle of at most `max_length` debts that includes the debt
+    from debtor to creditor, starting with the debtor, or None if there is no such cycle.
+
+    E.g. ["A", "B", "C"] when A owes B, B owes C and C owes A. The search only follows debts
+    out of the creditor, one level at a time, so it never looks further than `max_length` away.
+    """
+    debtor = ledger.debtors.get(debtor_id)
+    if debtor is None or creditor_id not in debtor.creditors:
+        return None
+
+    # User -> the user they were reached from
+    reached_from = {creditor_id: None}
+    frontier = [creditor_id]
+    for _ in range(max_length - 1):
+        next_frontier = []
+        for user_id in frontier:
+            user = ledger.debtors.get(user_id)
+            if user is None:
+                continue
+            for next_id in user.creditors:
+                if next_id in reached_from:
+                    continue
+                reached_from[next_id] = user_id
+                if next_id == debtor_id:
+                    path = []
+                    while user_id is not None:
+                        path.append(user_id)
+                        user_id = reached_from[user_id]
+                    return [debtor_id] + path[::-1]
+                next_frontier.append(next_id)
+        frontier = next_frontier
+    return None
+
+def plan_simplification(
+    ledger: Ledger,
+    debts: list[tuple[str, str, Ticks]],
+    reason: str,
+    timestamp: str,
+) -> tuple[dict[tuple[str, str], list[LedgerEntry]], list[TransactionEntry]]:
+    """The new entries for every pair the simplified `debts` change, and one transaction recording each change.
+
+    A reduced debt is settled oldest first and a new or increased debt gets a single entry for the
+    difference. Pairs already owing what they should are left out. Only reads the ledger, so it can
+    run on a snapshot in a worker thread; totalling every pair makes it O(debt entries).
+    """
+    current = pair_totals(ledger)
+    target = {(debtor_id, creditor_id): ticks for debtor_id, creditor_id, ticks in debts}
+
+    changes = {}
+    transactions = []
+    for (debtor_id, creditor_id), ticks in current.items():
+        reduction = ticks - target.get((debtor_id, creditor_id), 0)
+        if reduction > 0:
+            entries = ledger.debtors[debtor_id].creditors[creditor_id]
+            changes[debtor_id, creditor_id], settled_ticks = settle_debts_between_users(entries, reduction)
+            transactions.append(TransactionEntry(
+                type="settle",
+                debtor=debtor_id,
+                creditor=creditor_id,
+                amount=from_ticks(settled_ticks),
+                reason=reason
+            ))
+
+    for (debtor_id, creditor_id), ticks in target.items():
+        increase = ticks - current.get((debtor_id, creditor_id), 0)
+        if increase > 0:
+            entries = ledger.debtors[debtor_id].creditors[creditor_id] if (debtor_id, creditor_id) in current else []
+            changes[debtor_id, creditor_id] = entries + [LedgerEntry(normalize_ticks(increase), reason, timestamp)]
+            transactions.append(TransactionEntry(
+                type="owe",
+                debtor=debtor_id,
+                creditor=creditor_id,
+                amount=from_ticks(increase),
+                reason=reason
+            ))
+    return changes, transactions
+
+def pair_totals(ledger: Ledger) -> dict[tuple[str, str], Ticks]:
+    """The total owed by each debtor to each creditor, in ticks."""
+    return {
+        (debtor_id, creditor_id): sum_ticks(entries)
+        for debtor_id, debtor in ledger.debtors.items()
+        for creditor_id, entries in debtor.creditors.items()
+    }
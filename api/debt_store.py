@@ -0,0 +1,292 @@
+"""Module for holding the debt ledger in memory and persisting it in the background."""
+import asyncio
+import logging
+import secrets
+from typing import Callable, Optional
+import api.config as config
+from api.data_manager import load_debts, save_debt_pairs, writes_debt_pairs
+from api.ledger import Ledger, LedgerDebtor, LedgerEntry
+from api.utilities.debt_helpers import sum_ticks
+from api.utilities.tick_helpers import Ticks, format_ticks, normalize_ticks
+
+logger = logging.getLogger(__name__)
+
+class DebtStore:
+    """The authoritative in-memory debt ledger.
+
+    The ledger is loaded once at startup. Handlers read `data` directly, change it through
+    `add_entry()` and `replace_entries()` so the indexes and running totals kept alongside it
+    stay consistent, and call `commit()` after a change, which persists it according to
+    DEBTS_DURABILITY_MODE.
+    Every mutation runs on the event loop, so concurrent requests can no longer interleave
+    a load/modify/save and lose each other's changes.
+    """
+
+    def __init__(self):
+        self.data = Ledger()
+        # Reverse adjacency of data.debtors: creditor -> every debtor who owes them
+        # The inner dicts are used as insertion-ordered sets so responses stay deterministic
+        self.debtors_by_creditor: dict[str, dict[str, None]] = {}
+        # Running totals in ticks: user -> {"owes": ..., "is_owed": ...} for every user with a debt either way
+        self.user_totals: dict[str, dict[str, Ticks]] = {}
+        self.total_in_circulation: Ticks = 0
+        # Bumped on every change; the instance ID keeps versions from a previous run from ever matching
+        self.version = 0
+        self._instance_id = secrets.token_hex(4)
+        # Called with (debtor_id, creditor_id) whenever the debts between a pair change
+        self._pair_listeners: list[Callable[[str, str], None]] = []
+        # Called with no arguments when too many pairs change at once to report them one by one
+        self._reset_listeners: list[Callable[[], None]] = []
+        self._dirty = False
+        # (debtor ID, creditor ID) -> the pair's entries as last written, or None if it had none,
+        # for every pair changed since the last write
+        self._unwritten: dict[tuple[str, str], Optional[list[LedgerEntry]]] = {}
+        self._write_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._pending_commit: Optional[asyncio.Future] = None
+        self._group_commit_task: Optional[asyncio.Task] = None
+
+    def load(self):
+        """Load the ledger from disk, replacing whatever is held in memory."""
+        self.data = load_debts()
+        self._rebuild_indexes()
+        self.version += 1
+        self._dirty = False
+        self._unwritten = {}
+
+    def _rebuild_indexes(self):
+        self.debtors_by_creditor = {}
+        self.user_totals = {}
+        self.total_in_circulation = 0
+        for debtor_id, debtor in self.data.debtors.items():
+            for creditor_id, entries in debtor.creditors.items():
+                self.debtors_by_creditor.setdefault(creditor_id, {})[debtor_id] = None
+                self._adjust_totals(debtor_id, creditor_id, sum_ticks(entries))
+
+    def _adjust_totals(self, debtor_id: str, creditor_id: str, ticks: Ticks):
+        self.total_in_circulation = normalize_ticks(self.total_in_circulation + ticks)
+        for user_id, field in ((debtor_id, "owes"), (creditor_id, "is_owed")):
+            totals = self.user_totals.setdefault(user_id, {"owes": 0, "is_owed": 0})
+            totals[field] = normalize_ticks(totals[field] + ticks)
+            if not totals["owes"] and not totals["is_owed"]:
+                del self.user_totals[user_id]
+
+    def add_pair_listener(self, listener: Callable[[str, str], None]):
+        """Register a callback to run with (debtor_id, creditor_id) whenever a pair's debts change."""
+        self._pair_listeners.append(listener)
+
+    def add_reset_listener(self, listener: Callable[[], None]):
+        """Register a callback to run when many pairs change at once, instead of the pair listeners."""
+        self._reset_listeners.append(listener)
+
+    def _remember_unwritten(self, debtor_id: str, creditor_id: str):
+        # Called before a pair changes, so the first call since the last write sees it as written
+        if (debtor_id, creditor_id) not in self._unwritten:
+            debtor = self.data.debtors.get(debtor_id)
+            entries = None if debtor is None else debtor.creditors.get(creditor_id)
+            # Copied as add_entry() appends to the list in place
+            self._unwritten[debtor_id, creditor_id] = None if entries is None else list(entries)
+
+    def _pair_changed(self, debtor_id: str, creditor_id: str):
+        self.version += 1
+        for listener in self._pair_listeners:
+            listener(debtor_id, creditor_id)
+
+    @property
+    def etag_version(self) -> str:
+        """A version string that changes whenever the ledger does."""
+        return f"{self._instance_id}-{self.version}"
+
+    def debtors_of(self, creditor_id: str) -> list[str]:
+        """Every user who currently owes the creditor something."""
+        return list(self.debtors_by_creditor.get(creditor_id, ()))
+
+    def add_entry(self, debtor_id: str, creditor_id: str, entry: LedgerEntry):
+        """Add a debt owed by the debtor to the creditor."""
+        self._remember_unwritten(debtor_id, creditor_id)
+        if debtor_id not in self.data.debtors:
+            self.data.debtors[debtor_id] = LedgerDebtor()
+        debtor = self.data.debtors[debtor_id]
+
+        if creditor_id not in debtor.creditors:
+            debtor.creditors[creditor_id] = []
+            self.debtors_by_creditor.setdefault(creditor_id, {})[debtor_id] = None
+        debtor.creditors[creditor_id].append(entry)
+        self._adjust_totals(debtor_id, creditor_id, entry.ticks)
+        self._pair_changed(debtor_id, creditor_id)
+
+    def replace_entries(self, debtor_id: str, creditor_id: str, entries: list[LedgerEntry]):
+        """Replace the debts owed by the debtor to the creditor, removing the pair if none remain."""
+        self._remember_unwritten(debtor_id, creditor_id)
+        debtor = self.data.debtors[debtor_id]
+        self._adjust_totals(debtor_id, creditor_id, sum_ticks(entries) - sum_ticks(debtor.creditors[creditor_id]))
+        self._pair_changed(debtor_id, creditor_id)
+        if entries:
+            debtor.creditors[creditor_id] = entries
+            return
+
+        del debtor.creditors[creditor_id]
+        debtors = self.debtors_by_creditor[creditor_id]
+        del debtors[debtor_id]
+        if not debtors:
+            del self.debtors_by_creditor[creditor_id]
+
+        if not debtor.creditors:
+            # Remove debtor if no debts remain
+            del self.data.debtors[debtor_id]
+
+    @classmethod
+    def from_ledger(cls, ledger: Ledger) -> "DebtStore":
+        """A store holding the ledger with its indexes and running totals built, which can be done off the event loop."""
+        store = cls()
+        store.data = ledger
+        store._rebuild_indexes()
+        return store
+
+    def take_over(self, other: "DebtStore", previous: dict[tuple[str, str], Optional[list[LedgerEntry]]]):
+        """Switch to the ledger, indexes and totals of a store built from a copy of this one's ledger.
+
+        `previous` maps each changed (debtor ID, creditor ID) pair to its entries before the change,
+        or None, as returned by Ledger.replace_pairs(). Only those pairs are written out, and the
+        reset listeners are told once rather than the pair listeners once per pair.
+        """
+        # Pairs already changed since the last write keep their older entries
+        self._unwritten = {**previous, **self._unwritten}
+        self.data = other.data
+        self.debtors_by_creditor = other.debtors_by_creditor
+        self.user_totals = other.user_totals
+        self.total_in_circulation = other.total_in_circulation
+        self.version += 1
+        for listener in self._reset_listeners:
+            listener()
+
+    def _roll_back_unwritten(self):
+        """Put every pair changed since the last write back as it was written."""
+        self.data.replace_pairs({pair: entries or [] for pair, entries in self._unwritten.items()})
+        self._unwritten = {}
+        self._dirty = False
+        self._rebuild_indexes()
+        self.version += 1
+        for listener in self._reset_listeners:
+            listener()
+
+    def verify(self) -> dict:
+        """Recompute every index and running total from the ledger and report any drift."""
+        expected = DebtStore.from_ledger(self.data)
+        drift = []
+
+        for user_id in sorted(expected.user_totals.keys() | self.user_totals.keys()):
+            for field in ("owes", "is_owed"):
+                expected_amount = expected.user_totals.get(user_id, {}).get(field, 0)
+                actual_amount = self.user_totals.get(user_id, {}).get(field, 0)
+                if expected_amount != actual_amount:
+                    drift.append({
+                        "field": field,
+                        "user_id": user_id,
+                        "expected": format_ticks(expected_amount),
+                        "actual": format_ticks(actual_amount)
+                    })
+
+        if expected.total_in_circulation != self.total_in_circulation:
+            drift.append({
+                "field": "total_in_circulation",
+                "expected": format_ticks(expected.total_in_circulation),
+                "actual": format_ticks(self.total_in_circulation)
+            })
+
+        for creditor_id in sorted(expected.debtors_by_creditor.keys() | self.debtors_by_creditor.keys()):
+            expected_debtors = sorted(expected.debtors_by_creditor.get(creditor_id, ()))
+            actual_debtors = sorted(self.debtors_by_creditor.get(creditor_id, ()))
+            if expected_debtors != actual_debtors:
+                drift.append({"field": "debtors_by_creditor", "user_id": creditor_id, "expected": expected_debtors, "actual": actual_debtors})
+
+        return {"ok": not drift, "drift": drift}
+
+    @property
+    def dirty(self) -> bool:
+        """Whether there are changes that have not been written to disk yet."""
+        return self._dirty
+
+    async def commit(self):
+        """Record that the ledger has changed.
+
+        In "sync" mode this waits until the change is on disk. Commits that arrive within
+        DEBTS_GROUP_COMMIT_WINDOW_MS of each other share a single write. If that write fails,
+        every change not yet written is undone and this raises, so callers only log the
+        transactions for a change once it has been committed.
+        """
+        self._dirty = True
+        if config.DEBTS_DURABILITY_MODE == "sync":
+            if self._pending_commit is None:
+                self._pending_commit = asyncio.get_running_loop().create_future()
+                self._group_commit_task = asyncio.create_task(self._group_commit(self._pending_commit))
+            # Shield the shared write so one cancelled request cannot cancel it for everyone else
+            await asyncio.shield(self._pending_commit)
+
+    async def _group_commit(self, pending_commit: asyncio.Future):
+        await asyncio.sleep(config.DEBTS_GROUP_COMMIT_WINDOW_MS / 1000)
+        # Later commits start a new group, which writes once this one has finished
+        if self._pending_commit is pending_commit:
+            self._pending_commit = None
+        try:
+            await self.flush()
+        except Exception as exc:
+            # The failed requests log no transactions, so undo their changes rather than write them
+            # later. That also undoes changes from requests waiting on the next group, so fail those too
+            self._roll_back_unwritten()
+            for commit in (pending_commit, self._pending_commit):
+                if commit is not None and not commit.done():
+                    commit.set_exception(exc)
+            self._pending_commit = None
+        else:
+            # Already failed if an earlier group's write failed after this group's changes were made
+            if not pending_commit.done():
+                pending_commit.set_result(None)
+
+    async def flush(self):
+        """Write the ledger to disk if it has changed since the last write.
+
+        Backends that can store single pairs are only given the pairs that changed.
+        """
+        async with self._write_lock:
+            if not self._dirty:
+                return
+            # Snapshot on the event loop so no handler can mutate the ledger mid-write
+            unwritten = self._unwritten
+            snapshot = self.data.snapshot_pairs(unwritten) if writes_debt_pairs() else self.data.snapshot()
+            self._dirty = False
+            self._unwritten = {}
+            try:
+                await asyncio.to_thread(save_debt_pairs, snapshot, unwritten.keys())
+            except Exception:
+                self._dirty = True
+                # Pairs changed again since are still as written before either change
+                self._unwritten = {**self._unwritten, **unwritten}
+                raise
+
+    async def start(self):
+        """Start the background flusher if the durability mode needs one."""
+        if config.DEBTS_DURABILITY_MODE == "batched" and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self):
+        """Stop the background flusher and write any outstanding changes."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    async def _flush_periodically(self):
+        interval = config.DEBTS_FLUSH_INTERVAL_MS / 1000
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to write debts, will retry")
+
+debt_store = DebtStore()
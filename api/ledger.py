@@ -0,0 +1,126 @@
+"""Module for the compact in-memory representation of the debt ledger.
+
+The API keeps its ledger in these slotted classes rather than the pydantic models, which
+are only used to validate requests. Entries are treated as immutable and share interned
+reason and timestamp strings, so snapshots only need to copy the per-pair lists.
+"""
+import sys
+from fractions import Fraction
+from typing import Iterable, Optional
+from api.utilities.tick_helpers import Ticks, format_ticks, from_ticks, parse_ticks, to_ticks
+from models import DebtEntry
+
+class LedgerEntry:
+    """A single debt, with its amount held in ticks."""
+    __slots__ = ("ticks", "reason", "timestamp")
+
+    def __init__(self, ticks: Ticks, reason: str, timestamp: str):
+        self.ticks = ticks
+        self.reason = sys.intern(reason)
+        self.timestamp = sys.intern(timestamp)
+
+    @classmethod
+    def from_debt_entry(cls, entry: DebtEntry) -> "LedgerEntry":
+        """Convert a validated DebtEntry."""
+        return cls(to_ticks(entry.amount), entry.reason, entry.timestamp)
+
+    @classmethod
+    def from_dict(cls, raw: dict) -> "LedgerEntry":
+        """Build an entry from its stored form without going through pydantic."""
+        return cls(parse_ticks(str(raw["amount"])), raw.get("reason", ""), raw["timestamp"])
+
+    @property
+    def amount(self) -> Fraction:
+        """The amount as a Fraction."""
+        return from_ticks(self.ticks)
+
+    def to_dict(self) -> dict:
+        """The stored and serialised form of the entry."""
+        return {"amount": format_ticks(self.ticks), "reason": self.reason, "timestamp": self.timestamp}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, LedgerEntry):
+            return NotImplemented
+        return (self.ticks, self.reason, self.timestamp) == (other.ticks, other.reason, other.timestamp)
+
+    def __repr__(self) -> str:
+        return f"LedgerEntry(ticks={self.ticks!r}, reason={self.reason!r}, timestamp={self.timestamp!r})"
+
+class LedgerDebtor:
+    """Everything one user owes: creditor ID -> their entries, oldest first."""
+    __slots__ = ("creditors",)
+
+    def __init__(self, creditors: dict[str, list[LedgerEntry]] = None):
+        self.creditors = {} if creditors is None else creditors
+
+class Ledger:
+    """Every outstanding debt: debtor ID -> LedgerDebtor, mirroring the shape of DebtsData."""
+    __slots__ = ("debtors",)
+
+    def __init__(self, debtors: dict[str, LedgerDebtor] = None):
+        self.debtors = {} if debtors is None else debtors
+
+    @classmethod
+    def from_dict(cls, raw: dict) -> "Ledger":
+        """Build a ledger from the stored {"debtors": {...}} form without going through pydantic."""
+        return cls({
+            sys.intern(debtor_id): LedgerDebtor({
+                sys.intern(creditor_id): [LedgerEntry.from_dict(entry) for entry in entries]
+                for creditor_id, entries in debtor["creditors"].items()
+            })
+            for debtor_id, debtor in raw.get("debtors", {}).items()
+        })
+
+    def to_dict(self) -> dict:
+        """The stored form of the ledger, matching DebtsData.model_dump()."""
+        return {
+            "debtors": {
+                debtor_id: {
+                    "creditors": {
+                        creditor_id: [entry.to_dict() for entry in entries]
+                        for creditor_id, entries in debtor.creditors.items()
+                    }
+                }
+                for debtor_id, debtor in self.debtors.items()
+            }
+        }
+
+    def snapshot(self) -> "Ledger":
+        """A copy that later changes to this ledger won't affect. Entries are shared as they are never mutated."""
+        return Ledger({
+            debtor_id: LedgerDebtor({creditor_id: list(entries) for creditor_id, entries in debtor.creditors.items()})
+            for debtor_id, debtor in self.debtors.items()
+        })
+
+    def copy_structure(self) -> "Ledger":
+        """A copy of the debtor and creditor dicts that shares the entry lists, so it is much cheaper
+        than snapshot(). Entries added to this ledger afterwards can show up in the copy, so only use
+        it where such changes are detected some other way, such as by a version number."""
+        return Ledger({debtor_id: LedgerDebtor(dict(debtor.creditors)) for debtor_id, debtor in self.debtors.items()})
+
+    def replace_pairs(self, changes: dict[tuple[str, str], list[LedgerEntry]]) -> dict[tuple[str, str], Optional[list[LedgerEntry]]]:
+        """Replace the entries of each (debtor ID, creditor ID) pair, removing pairs and debtors left with none.
+
+        Returns each pair's entries from before, or None for pairs that had none.
+        """
+        previous = {}
+        for (debtor_id, creditor_id), entries in changes.items():
+            debtor = self.debtors.get(debtor_id)
+            previous[debtor_id, creditor_id] = None if debtor is None else debtor.creditors.get(creditor_id)
+            if entries:
+                self.debtors.setdefault(debtor_id, LedgerDebtor()).creditors[creditor_id] = entries
+            elif debtor is not None:
+                debtor.creditors.pop(creditor_id, None)
+                if not debtor.creditors:
+                    del self.debtors[debtor_id]
+        return previous
+
+    def snapshot_pairs(self, pairs: Iterable[tuple[str, str]]) -> "Ledger":
+        """A copy holding only the given (debtor ID, creditor ID) pairs, leaving out any the ledger no longer has."""
+        snapshot = Ledger()
+        for debtor_id, creditor_id in pairs:
+            debtor = self.debtors.get(debtor_id)
+            if debtor is None or creditor_id not in debtor.creditors:
+                continue
+            snapshot.debtors.setdefault(debtor_id, LedgerDebtor()).creditors[creditor_id] = list(debtor.creditors[creditor_id])
+        return snapshot
@@ -1,116 +1,264 @@
 # Imports
 """FastAPI for managing pint debts between users."""
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import date, datetime, timedelta, timezone
-from fractions import Fraction
+import hashlib
+from itertools import islice
+import json
 import logging
-from typing import Optional
-from fastapi import FastAPI, HTTPException, Query, Depends
-from dateutil.parser import isoparse
+from typing import Iterable, Iterator, Optional
+from fastapi import FastAPI, HTTPException, Query, Depends, Request, Response
+from fastapi.responses import StreamingResponse
 import api.config as config
 import api.fraction_functions as fraction_functions
 from api.data_manager import (
     append_transaction,
-    load_debts,
-    load_preferences,
-    load_transactions,
-    save_debts,
-    save_preferences
+    append_transactions,
+    get_user_preferences,
+    iter_transactions,
+    save_user_preferences
 )
+from api.debt_simplification import find_cycle, net_balances, plan_simplification, simplify_balances
+from api.debt_store import DebtStore, debt_store
+from api.ledger import Ledger, LedgerEntry
+from api.response_cache import (
+    ALL_DEBTS_KEY,
+    SIMPLIFIED_DEBTS_KEY,
+    debts_between_key,
+    response_cache,
+    user_debts_key
+)
+from api.transaction_index import transaction_index
+from api.transaction_rollups import transaction_rollups
+from api.transaction_summary import SUMMARY_PERIODS, TransactionSummary
 from api.utilities.debt_helpers import (
     current_timestamp,
     debts_between,
     debts_owed_by,
     debts_owed_to,
-    settle_debts_between_users
+    settle_debts_between_users,
+    sum_ticks
 )
+from api.utilities.etag_helpers import etag_matches, make_etag, not_modified
+from api.utilities.json_helpers import FastJSONResponse, encode_response
+from api.utilities.tick_helpers import Ticks, format_ticks, from_ticks, to_ticks
 from api.utilities.transaction_helpers import (
-    ensure_aware_utc,
-    normalize_transaction_type
+    decode_cursor,
+    encode_cursor,
+    normalize_transaction_type,
+    paginate
 )
 from models import (
     DebtEntry,
+    OweBatchRequest,
     OweRequest,
     SettleRequest,
     SetUnicodePreferenceRequest,
     UserPreferences,
-    UserDebts,
     TransactionEntry
 )
 
 # Setup
 logging.basicConfig(level=logging.DEBUG)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the debt ledger into memory on startup and persist it on shutdown."""
+    debt_store.load()
+    response_cache.clear()
+    if config.TRANSACTIONS_INDEX_ENABLED:
+        transaction_index.build(iter_transactions())
+    if config.TRANSACTIONS_ROLLUPS_ENABLED:
+        transaction_rollups.build(transaction_index.transactions if transaction_index.loaded else iter_transactions())
+    await debt_store.start()
+    yield
+    await debt_store.stop()
+
 # Set up FastAPI
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+debt_store.add_pair_listener(response_cache.invalidate_pair)
+debt_store.add_reset_listener(response_cache.clear)
 
 NO_DEBTS_MESSAGE = "No debts found owed to or from this user."
 HTTP_BAD_REQUEST_CODE = 400
+HTTP_CONFLICT_CODE = 409
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SIMPLIFICATION_REASON = "Debt simplification"
+SIMPLIFY_ATTEMPTS = 3
+SIMPLIFY_RECORD_CHUNK = 1000
+CYCLE_CANCELLATION_REASON = "Debt cycle cancelled"
+
+def _cached_json_response(key: tuple, build, etag: str) -> FastJSONResponse:
+    """Serve an already encoded response body from the cache, building and encoding it on a miss."""
+    body = response_cache.get_or_build(key, lambda: encode_response(build()))
+    return FastJSONResponse(body, headers={"ETag": etag})
 
 @app.get("/health", status_code=200)
 async def health_check():
     """Health check endpoint."""
     return {"status": "ok"}
 
+def _transaction_lines(transactions: Iterable[TransactionEntry]) -> Iterator[str]:
+    for transaction in transactions:
+        yield transaction.model_dump_json() + "\n"
+
+def _check_transaction_filters(
+    start_date: date,
+    end_date: date,
+    user_id: Optional[str],
+    counterparty_id: Optional[str]
+):
+    if start_date > end_date or (counterparty_id and not user_id):
+        raise HTTPException(
+            status_code=HTTP_BAD_REQUEST_CODE,
+            detail="VALIDATION_ERROR"
+        )
+
+def _matching_transactions(
+    start_date: date,
+    end_date: date,
+    user_id: Optional[str],
+    transaction_type: Optional[str],
+    counterparty_id: Optional[str],
+    after: int = -1
+) -> Iterator[tuple[int, TransactionEntry]]:
+    """Check the shared /transactions filters and lazily find the transactions matching them.
+
+    Yields (key, transaction) in the order they were recorded, starting after the key `after`.
+    With the in-memory index the key is the transaction's position in the history, which the
+    index bisects to. Without it, the key counts the matches read from storage, which has to be
+    scanned from the start anyway.
+    """
+    _check_transaction_filters(start_date, end_date, user_id, counterparty_id)
+
+    # Convert date to datetime boundaries
+    start_datetime = datetime.combine(start_date, datetime.min.time(), tzinfo=timezone.utc)
+    end_datetime = datetime.combine(end_date, datetime.max.time(), tzinfo=timezone.utc)
+
+    if transaction_type == "cashout":
+        transaction_type = "settle"
+
+    # Filter by date range, user ID and type using the in-memory index, or in storage without it
+    if transaction_index.loaded:
+        return transaction_index.iter_matches(start_datetime, end_datetime, user_id, transaction_type, counterparty_id, after)
+    transactions = iter_transactions(start_datetime, end_datetime, user_id, transaction_type, counterparty_id)
+    return islice(enumerate(transactions), after + 1, None)
+
 @app.get("/transactions")
 async def get_transactions(
+    request: Request,
     start_date: date = Query(default_factory=lambda: date.today() - timedelta(days=config.TRANSACTIONS_DEFAULT_TIME_PERIOD)),
     end_date: date = Query(default_factory=date.today),
     user_id: Optional[str] = None,
     type: Optional[str] = Query(None),
+    counterparty_id: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
 ):
     
     """
     Get all transactions in a date range (default: last 30 days).
-    Optionally filtered by type and/or user.
+    Optionally filtered by type and/or user, or by the pair of user and counterparty.
+
+    Pass `limit` to get one page at a time. Each page has a `next_cursor`, which is passed back
+    on its own as `cursor` to get the next page with the same filters, or is None on the last page.
+    The cursor records where the page ended, so the next page starts there rather than counting
+    through every earlier match.
+    Send `Accept: application/x-ndjson` to stream the transactions one JSON object per line instead.
     """
+    after = -1
+    if cursor is not None:
+        state = decode_cursor(cursor)
+        try:
+            start_date = date.fromisoformat(state["start_date"])
+            end_date = date.fromisoformat(state["end_date"])
+            user_id, type, counterparty_id = state["user_id"], state["type"], state["counterparty_id"]
+            after = int(state["after"])
+            limit = limit or int(state["limit"])
+        except (KeyError, TypeError, ValueError) as exc:
+            raise HTTPException(status_code=HTTP_BAD_REQUEST_CODE, detail="INVALID_CURSOR") from exc
+
     transaction_type = normalize_transaction_type(type)
-    transactions = load_transactions().transactions
 
-    if start_date > end_date:
+    if after < -1 or (limit is not None and not 1 <= limit <= config.TRANSACTIONS_MAX_PAGE_SIZE):
         raise HTTPException(
             status_code=HTTP_BAD_REQUEST_CODE,
             detail="VALIDATION_ERROR"
         )
-    
-    # Convert date to datetime boundaries
-    start_datetime = datetime.combine(start_date, datetime.min.time(), tzinfo=timezone.utc)
-    end_datetime = datetime.combine(end_date, datetime.max.time(), tzinfo=timezone.utc)
 
-    # Filter by date range
-    transactions = [
-        t for t in transactions
-        if start_datetime <= ensure_aware_utc(isoparse(t.timestamp)) <= end_datetime
-    ]
-
-    # Apply user ID filter
-    if user_id:
-        transactions = [
-            t for t in transactions
-            if t.debtor == user_id or t.creditor == user_id
-        ]
+    matches = _matching_transactions(start_date, end_date, user_id, transaction_type, counterparty_id, after)
+
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        # Stream straight from the index or storage without building the whole response
+        transactions = (transaction for _, transaction in islice(matches, limit))
+        return StreamingResponse(_transaction_lines(transactions), media_type=NDJSON_MEDIA_TYPE)
+
+    response = {
+        "start_date": str(start_date),
+        "end_date": str(end_date),
+    }
+    if limit is not None:
+        transactions, last_key = paginate(matches, limit)
+        response["next_cursor"] = None if last_key is None else encode_cursor({
+            "start_date": str(start_date),
+            "end_date": str(end_date),
+            "user_id": user_id,
+            "type": type,
+            "counterparty_id": counterparty_id,
+            "after": last_key,
+            "limit": limit,
+        })
+    else:
+        transactions = [transaction for _, transaction in matches]
+
+    # Convert each transaction to a dictionary for JSON serialization
+    response["transactions"] = [transaction.model_dump() for transaction in transactions]
+    return FastJSONResponse(response)
+
+@app.get("/transactions/summary")
+async def get_transaction_summary(
+    start_date: date = Query(default_factory=lambda: date.today() - timedelta(days=config.TRANSACTIONS_DEFAULT_TIME_PERIOD)),
+    end_date: date = Query(default_factory=date.today),
+    user_id: Optional[str] = None,
+    type: Optional[str] = Query(None),
+    counterparty_id: Optional[str] = None,
+    period: str = "day",
+    per_user: bool = False,
+):
+    """
+    Get the number and total amount of transactions in a date range (default: last 30 days),
+    per type and per day, week or month, and optionally per user and role.
+    Takes the same filters as /transactions.
+    Unless filtered by counterparty, it is answered from the daily rollups when they are enabled.
+    """
+    transaction_type = normalize_transaction_type(type)
+    if period not in SUMMARY_PERIODS:
+        raise HTTPException(
+            status_code=HTTP_BAD_REQUEST_CODE,
+            detail="VALIDATION_ERROR"
+        )
 
-    # Apply type filter
-    if transaction_type:
+    if transaction_rollups.loaded and not counterparty_id:
+        _check_transaction_filters(start_date, end_date, user_id, counterparty_id)
         if transaction_type == "cashout":
             transaction_type = "settle"
-            
-        transactions = [
-            t for t in transactions
-            if t.type == transaction_type
-        ]
-    
-    # Convert each transaction to a dictionary for JSON serialization
-    return {
+        summary = transaction_rollups.summarize(start_date, end_date, user_id, transaction_type, period, per_user)
+    else:
+        matches = _matching_transactions(start_date, end_date, user_id, transaction_type, counterparty_id)
+        summary = TransactionSummary.from_transactions((transaction for _, transaction in matches), period, per_user, user_id)
+    return FastJSONResponse({
         "start_date": str(start_date),
         "end_date": str(end_date),
-        "transactions": [transaction.model_dump() for transaction in transactions]
-    }
+        **summary.to_dict()
+    })
 
-@app.post("/debts")
-async def add_debt(request: OweRequest):
-    """Add pint debts between a pair of users."""
+def _validate_owe_request(request: OweRequest) -> tuple[str, str, DebtEntry]:
+    """Check a debt can be added, returning the debtor and creditor IDs and the entry to add.
 
-    data = load_debts()
+    Raises:
+        HTTPException: with the error detail if the debt is invalid.
+    """
     debtor_id = str(request.debtor)
     creditor_id = str(request.creditor)
     # Check if valid target to owe
@@ -125,86 +273,160 @@ async def add_debt(request: OweRequest):
     if config.QUANTIZE_OWING_DEBTS:
         fraction_functions.check_quantization(amount)
 
-    # Get or create the debtor's data
-    if debtor_id not in data.debtors:
-        data.debtors[debtor_id] = UserDebts()
-    debtor = data.debtors[debtor_id]
-
-    # Add the debt
-    if creditor_id not in debtor.creditors:
-        debtor.creditors[creditor_id] = []
-
+    # Validate the entry before touching the ledger so a rejected debt leaves no trace in memory
     try:
-        {
-            debtor.creditors[creditor_id].append(
-                DebtEntry(
-                    amount=amount,
-                    reason=request.reason,
-                    timestamp=current_timestamp()
-                )
-            )
-        }
+        entry = DebtEntry(
+            amount=amount,
+            reason=request.reason,
+            timestamp=current_timestamp()
+        )
     except ValueError as exc:
         raise HTTPException(status_code=HTTP_BAD_REQUEST_CODE, detail="EXCEEDS_MAXIMUM") from exc
-    # Save the updated data
-    save_debts(data)
+    return debtor_id, creditor_id, entry
 
-    transaction_entry= TransactionEntry(
+def _owe_transaction(debtor_id: str, creditor_id: str, entry: DebtEntry) -> TransactionEntry:
+    return TransactionEntry(
         type = "owe",
         debtor = debtor_id,
         creditor = creditor_id,
-        amount = amount,
-        reason = request.reason
+        amount = entry.amount,
+        reason = entry.reason
     )
 
-    # Append the transaction entry
-    append_transaction(transaction_entry)
+def _add_owe_entry(debtor_id: str, creditor_id: str, entry: DebtEntry) -> list[TransactionEntry]:
+    """Add a validated debt to the ledger, returning the transactions to record for it."""
+    debt_store.add_entry(debtor_id, creditor_id, LedgerEntry.from_debt_entry(entry))
+    transactions = [_owe_transaction(debtor_id, creditor_id, entry)]
+    if config.CANCEL_DEBT_CYCLES:
+        transactions.extend(_cancel_debt_cycles(debtor_id, creditor_id))
+    return transactions
+
+def _cancel_debt_cycles(debtor_id: str, creditor_id: str) -> list[TransactionEntry]:
+    """Settle the debts around every cycle the debt from debtor to creditor closes, up to DEBT_CYCLE_MAX_LENGTH long."""
+    transactions = []
+    while True:
+        cycle = find_cycle(debt_store.data, debtor_id, creditor_id, config.DEBT_CYCLE_MAX_LENGTH)
+        if cycle is None:
+            return transactions
+
+        pairs = list(zip(cycle, cycle[1:] + cycle[:1]))
+        # Settling the smallest debt in the cycle around it clears at least one pair, so this ends
+        ticks = min(sum_ticks(debt_store.data.debtors[debtor].creditors[creditor]) for debtor, creditor in pairs)
+        for debtor, creditor in pairs:
+            entries = debt_store.data.debtors[debtor].creditors[creditor]
+            updated_entries, settled_ticks = settle_debts_between_users(entries, ticks)
+            debt_store.replace_entries(debtor, creditor, updated_entries)
+            transactions.append(TransactionEntry(
+                type="settle",
+                debtor=debtor,
+                creditor=creditor,
+                amount=from_ticks(settled_ticks),
+                reason=CYCLE_CANCELLATION_REASON
+            ))
+
+@app.post("/debts")
+async def add_debt(request: OweRequest):
+    """Add pint debts between a pair of users."""
+    debtor_id, creditor_id, entry = _validate_owe_request(request)
+
+    # Add the debt, cancelling any cycle it closes if enabled
+    transactions = _add_owe_entry(debtor_id, creditor_id, entry)
+
+    # Save the updated data
+    await debt_store.commit()
+
+    # Append the transaction entries
+    append_transactions(transactions)
 
     return {
-        "amount": str(amount),
+        "amount": str(entry.amount),
         "reason": request.reason,
         "timestamp": current_timestamp()
     }
 
+@app.post("/debts/batch")
+async def add_debts_batch(request: OweBatchRequest):
+    """
+    Add several pint debts at once, e.g. to split a round between a group.
+    Every debt is checked before any is added, so either all of them are added with a single
+    save or, if any is invalid, none are. Both responses give a result for each debt, in order.
+    """
+    if len(request.debts) > config.MAXIMUM_DEBTS_PER_BATCH:
+        raise HTTPException(status_code=HTTP_BAD_REQUEST_CODE, detail="VALIDATION_ERROR")
+
+    validated = []
+    results = []
+    for index, owe_request in enumerate(request.debts):
+        try:
+            validated.append(_validate_owe_request(owe_request))
+            results.append({"index": index, "status": "ok"})
+        except HTTPException as exc:
+            results.append({"index": index, "status": "error", "detail": exc.detail})
+
+    failed = [result for result in results if result["status"] == "error"]
+    if failed:
+        # The first failure is the detail so clients can report it like any other error
+        return FastJSONResponse(
+            {"detail": f"{failed[0]['detail']}: debt {failed[0]['index']}", "results": results},
+            status_code=HTTP_BAD_REQUEST_CODE
+        )
+
+    transactions = []
+    for debtor_id, creditor_id, entry in validated:
+        transactions.extend(_add_owe_entry(debtor_id, creditor_id, entry))
+    await debt_store.commit()
+    append_transactions(transactions)
+
+    return {
+        "results": [
+            {
+                **result,
+                "debtor": debtor_id,
+                "creditor": creditor_id,
+                "amount": str(entry.amount),
+                "reason": entry.reason,
+                "timestamp": entry.timestamp
+            }
+            for result, (debtor_id, creditor_id, entry) in zip(results, validated)
+        ]
+    }
+
 @app.get("/users/{user_id}/debts")
-async def get_debts(user_id: str):
+async def get_debts(user_id: str, request: Request):
     """See a user's current pint debts."""
-    data = load_debts()
+    etag = make_etag(debt_store.etag_version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return _cached_json_response(user_debts_key(user_id), lambda: _build_user_debts(user_id), etag)
+
+def _build_user_debts(user_id: str) -> dict:
+    data = debt_store.data
 
     owed_by_you, total_owed_by_you = debts_owed_by(data, user_id)
-    owed_to_you, total_owed_to_you = debts_owed_to(data, user_id)
+    owed_to_you, total_owed_to_you = debts_owed_to(data, user_id, debt_store.debtors_of(user_id))
 
     if not owed_by_you and not owed_to_you:
         return {"message": NO_DEBTS_MESSAGE}
 
     return {
         "owed_by_you": owed_by_you,
-        "total_owed_by_you": str(total_owed_by_you),
+        "total_owed_by_you": format_ticks(total_owed_by_you),
         "owed_to_you": owed_to_you,
-        "total_owed_to_you": str(total_owed_to_you),
+        "total_owed_to_you": format_ticks(total_owed_to_you),
     }
 
 @app.get("/debts")
-async def get_all_debts():
+async def get_all_debts(request: Request):
     """See all current debts."""
-    debts_data = load_debts()
-
-    result = {}
-    total_in_circulation = Fraction(0)
-    summary = {}
-
-    for debtor_id, debtor_data in debts_data.debtors.items():
-        for creditor_id, entries in debtor_data.creditors.items():
-            amount = sum(entry.amount for entry in entries)
-            total_in_circulation += amount
+    etag = make_etag(debt_store.etag_version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return _cached_json_response(ALL_DEBTS_KEY, _build_all_debts, etag)
 
-            # Update debtor's "owes"
-            summary.setdefault(debtor_id, {"owes": Fraction(0), "is_owed": Fraction(0)})
-            summary[debtor_id]["owes"] += amount
-
-            # Update creditor's "is_owed"
-            summary.setdefault(creditor_id, {"owes": Fraction(0), "is_owed": Fraction(0)})
-            summary[creditor_id]["is_owed"] += amount
+def _build_all_debts() -> dict:
+    # Served straight from the running totals kept by the debt store
+    summary = debt_store.user_totals
+    total_in_circulation = debt_store.total_in_circulation
 
     # Sort by default in config
     if config.SORT_OWES_FIRST:
@@ -220,18 +442,102 @@ async def get_all_debts():
 
     result = {
         user_id: {
-            "owes": str(summary_data["owes"]),
-            "is_owed": str(summary_data["is_owed"]),
+            "owes": format_ticks(summary_data["owes"]),
+            "is_owed": format_ticks(summary_data["is_owed"]),
         }
         for user_id, summary_data in sorted_items
     }
-    result["total_in_circulation"] = str(total_in_circulation)
+    result["total_in_circulation"] = format_ticks(total_in_circulation)
     return result
 
+@app.get("/debts/simplified")
+async def get_simplified_debts(request: Request):
+    """
+    Preview the fewest debts that would leave everyone owing and owed the same overall.
+    Nothing is changed; POST /debts/simplify applies it.
+    """
+    etag = make_etag(debt_store.etag_version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return _cached_json_response(SIMPLIFIED_DEBTS_KEY, _build_simplified_debts, etag)
+
+def _format_simplified_debts(debts: list[tuple[str, str, int]], current_count: int) -> dict:
+    return {
+        "debts": [
+            {"debtor": debtor_id, "creditor": creditor_id, "amount": format_ticks(ticks)}
+            for debtor_id, creditor_id, ticks in debts
+        ],
+        "current_count": current_count,
+        "simplified_count": len(debts),
+    }
+
+def _build_simplified_debts() -> dict:
+    debts = simplify_balances(net_balances(debt_store.user_totals))
+    current_count = sum(len(debtor.creditors) for debtor in debt_store.data.debtors.values())
+    return _format_simplified_debts(debts, current_count)
+
+def _plan_simplification(ledger: Ledger, debts: list[tuple[str, str, Ticks]]):
+    # Runs in a worker thread on a copy of the ledger, which it goes on to change
+    changes, transactions = plan_simplification(ledger, debts, SIMPLIFICATION_REASON, current_timestamp())
+    previous = ledger.replace_pairs(changes)
+    return DebtStore.from_ledger(ledger), previous, transactions
+
+@app.post("/debts/simplify")
+async def simplify_debts():
+    """
+    Replace the current debts with the fewest debts that leave everyone owing and owed the same overall.
+    Each pair whose debt changes is recorded as one settle or owe transaction.
+
+    The new ledger is worked out from a copy in a worker thread so other requests are still
+    served meanwhile, then swapped in. If the ledger changes in the meantime it is worked out
+    again, up to SIMPLIFY_ATTEMPTS times.
+    """
+    for _ in range(SIMPLIFY_ATTEMPTS):
+        version = debt_store.version
+        current_count = sum(len(debtor.creditors) for debtor in debt_store.data.debtors.values())
+        debts = simplify_balances(net_balances(debt_store.user_totals))
+        simplified, previous, transactions = await asyncio.to_thread(
+            _plan_simplification, debt_store.data.copy_structure(), debts
+        )
+        if debt_store.version == version:
+            break
+    else:
+        raise HTTPException(status_code=HTTP_CONFLICT_CODE, detail="LEDGER_CHANGED")
+
+    if transactions:
+        debt_store.take_over(simplified, previous)
+        await debt_store.commit()
+        # A simplification can change every pair, so let other requests in between chunks
+        for start in range(0, len(transactions), SIMPLIFY_RECORD_CHUNK):
+            append_transactions(transactions[start:start + SIMPLIFY_RECORD_CHUNK])
+            await asyncio.sleep(0)
+
+    return _format_simplified_debts(debts, current_count)
+
+@app.get("/admin/cache/stats")
+async def response_cache_stats():
+    """Report hit, miss and size counters for the read endpoint response cache."""
+    return response_cache.stats()
+
+@app.get("/admin/ledger/verify")
+async def verify_ledger():
+    """Recompute the ledger's running totals and indexes from scratch and report any drift."""
+    return debt_store.verify()
+
 @app.get("/debts/between")
-async def debts_with_user(requester_id: str, target_id: str):
+async def debts_with_user(requester_id: str, target_id: str, request: Request):
     """See current debts between the requester and one other user."""
-    data = load_debts()
+    etag = make_etag(debt_store.etag_version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return _cached_json_response(
+        debts_between_key(requester_id, target_id),
+        lambda: _build_debts_between(requester_id, target_id),
+        etag
+    )
+
+def _build_debts_between(requester_id: str, target_id: str) -> dict:
+    data = debt_store.data
 
     debts = debts_between(data, requester_id, target_id)
 
@@ -240,15 +546,15 @@ async def debts_with_user(requester_id: str, target_id: str):
         return {"message": NO_DEBTS_MESSAGE}
 
     # Convert totals back to strings for the response
-    debts["total_owed_by_you"] = str(debts["total_owed_by_you"])
-    debts["total_owed_to_you"] = str(debts["total_owed_to_you"])
+    debts["total_owed_by_you"] = format_ticks(debts["total_owed_by_you"])
+    debts["total_owed_to_you"] = format_ticks(debts["total_owed_to_you"])
 
     return debts
 
 @app.patch("/debts")
 async def settle_debt(request: SettleRequest):
     """Settle debt between a pair of users."""
-    data = load_debts()
+    data = debt_store.data
     debtor_id = str(request.debtor)
     creditor_id = str(request.creditor)
 
@@ -273,20 +579,14 @@ async def settle_debt(request: SettleRequest):
     creditor_entries = debtor.creditors[creditor_id]
 
     # Settle debts
-    updated_entries, settled_amount = settle_debts_between_users(creditor_entries, amount)
+    updated_entries, settled_ticks = settle_debts_between_users(creditor_entries, to_ticks(amount))
+    settled_amount = from_ticks(settled_ticks)
 
     # Update debts
-    if updated_entries:
-        debtor.creditors[creditor_id] = updated_entries
-    else:
-        del debtor.creditors[creditor_id]
-
-    if not debtor.creditors:
-        # Remove debtor if no debts remain
-        del data.debtors[debtor_id]
+    debt_store.replace_entries(debtor_id, creditor_id, updated_entries)
 
     # Save the updated data
-    save_debts(data)
+    await debt_store.commit()
 
     transaction_entry= TransactionEntry(
         type = "settle",
@@ -300,11 +600,11 @@ async def settle_debt(request: SettleRequest):
     append_transaction(transaction_entry)
 
     # Calculate the total remaining debt for the creditor
-    total_remaining_debt = sum(entry.amount for entry in updated_entries)
+    total_remaining_debt = sum_ticks(updated_entries)
 
     return {
         "settled_amount": str(settled_amount),
-        "remaining_amount": str(total_remaining_debt),
+        "remaining_amount": format_ticks(total_remaining_debt),
         "reason": request.reason,
         "timestamp": current_timestamp()
     }
@@ -312,40 +612,41 @@ async def settle_debt(request: SettleRequest):
 @app.get("/users/{user_id}/unicode_preference")
 async def get_unicode_preference(user_id: str) -> bool:
     """Get a user's preference on whether they want fractions to be displayed in Unicode format."""
-    all_preferences = load_preferences()
+    user_preferences = get_user_preferences(user_id)
 
     # Check if the user exists in the data
-    if user_id not in all_preferences.users:
+    if user_preferences is None:
         return False  # Default value if the user does not exist
 
-    # Retrieve the user's Unicode preference or return the default value
-    user_preferences = all_preferences.users[user_id]
-
     return user_preferences.use_unicode
 
 @app.post("/users/{user_id}/unicode_preference")
 async def set_unicode_preference(user_id: str, request: SetUnicodePreferenceRequest):
     """Set a user's preference on whether they want fractions to be displayed in Unicode format."""
-    all_preferences = load_preferences()
-
-    if user_id not in all_preferences.users:
-        all_preferences.users[user_id] = UserPreferences()
+    user_preferences = get_user_preferences(user_id) or UserPreferences()
 
     unicode_preference = request.use_unicode
-    all_preferences.users[user_id].use_unicode = unicode_preference
-    save_preferences(all_preferences)
+    user_preferences.use_unicode = unicode_preference
+    save_user_preferences(user_id, user_preferences)
 
     return {"message": f"Preference for Unicode fractions set to {unicode_preference}."}
 
 @app.get("/settings")
-async def get_settings():
+async def get_settings(request: Request, response: Response):
     """Get current bot settings."""
     # You can customize which config values to expose
-    return {
+    settings = {
         "MAXIMUM_DEBT_CHARACTER_LIMIT": config.MAXIMUM_DEBT_CHARACTER_LIMIT,
         "MAXIMUM_PER_DEBT": config.MAXIMUM_PER_DEBT,
         "SMALLEST_UNIT": str(config.SMALLEST_UNIT),
         "QUANTIZE_SETTLING_DEBTS": config.QUANTIZE_SETTLING_DEBTS,
         "QUANTIZE_OWING_DEBTS": config.QUANTIZE_OWING_DEBTS,
         "SORT_OWES_FIRST": config.SORT_OWES_FIRST
-    }
\ No newline at end of file
+    }
+
+    # Settings only change on restart, so their ETag is a hash of their content
+    etag = make_etag(hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:16])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return settings
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""Module for caching read endpoint responses between ledger changes."""
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+import api.config as config
+
+ALL_DEBTS_KEY = ("all_debts",)
+SIMPLIFIED_DEBTS_KEY = ("simplified_debts",)
+
+def user_debts_key(user_id: str) -> tuple:
+    """Cache key for GET /users/{user_id}/debts."""
+    return ("user_debts", user_id)
+
+def debts_between_key(requester_id: str, target_id: str) -> tuple:
+    """Cache key for GET /debts/between."""
+    return ("debts_between", requester_id, target_id)
+
+class ResponseCache:
+    """A size-capped LRU cache of response bodies keyed by endpoint and parameters."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the cached response for the key, building and caching it on a miss.
+
+        Cached responses are shared between requests, so they must not be mutated.
+        """
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        response = build()
+        if self.max_size > 0:
+            self._entries[key] = response
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return response
+
+    def invalidate(self, *keys: Hashable):
+        """Drop the given keys from the cache."""
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_pair(self, debtor_id: str, creditor_id: str):
+        """Drop every response that depends on the debts between two users."""
+        self.invalidate(
+            ALL_DEBTS_KEY,
+            SIMPLIFIED_DEBTS_KEY,
+            user_debts_key(debtor_id),
+            user_debts_key(creditor_id),
+            debts_between_key(debtor_id, creditor_id),
+            debts_between_key(creditor_id, debtor_id),
+        )
+
+    def clear(self):
+        """Drop every cached response."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit, miss and size counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+        }
+
+response_cache = ResponseCache(config.RESPONSE_CACHE_SIZE)
@@ -0,0 +1,92 @@
+"""Helpers for reading and writing the files used by the JSON storage backend."""
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterator
+from pydantic import ValidationError
+from models import TransactionEntry
+
+logger = logging.getLogger(__name__)
+
+def write_atomically(file_path: Path, text: str, durable: bool = True):
+    """Replace a file's contents so that a crash leaves either the old or the new version on disk.
+
+    The text is written to a temporary file in the same directory and renamed over the original.
+    When `durable` is set the data and the rename are also flushed to disk before returning.
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_descriptor, temp_name = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as temp_file:
+            temp_file.write(text)
+            if durable:
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+        os.replace(temp_name, file_path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    if durable:
+        sync_directory(file_path.parent)
+
+def sync_directory(directory: Path):
+    """Flush a directory entry to disk so a rename inside it survives a crash."""
+    if os.name != "posix":
+        return
+    directory_descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(directory_descriptor)
+    finally:
+        os.close(directory_descriptor)
+
+def append_lines(file_path: Path, text: str):
+    """Append complete lines to a log, first dropping any partial line a crash left at its end.
+
+    Without this the first new line would be glued onto the partial one and skipped on read.
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with file_path.open("a+b") as log:
+        end = log.seek(0, os.SEEK_END)
+        if end:
+            log.seek(end - 1)
+            if log.read(1) != b"\n":
+                keep = _end_of_last_line(log, end)
+                logger.warning("Dropping partial final line in %s", file_path.name)
+                log.truncate(keep)
+        log.write(text.encode("utf-8"))
+
+def _end_of_last_line(log, end: int, chunk_size: int = 4096) -> int:
+    """Offset just after the last newline in the file, or 0 if it has none."""
+    position = end
+    while position > 0:
+        start = max(0, position - chunk_size)
+        log.seek(start)
+        newline = log.read(position - start).rfind(b"\n")
+        if newline != -1:
+            return start + newline + 1
+        position = start
+    return 0
+
+def format_transaction_line(entry: TransactionEntry) -> str:
+    """Serialize a transaction as one line of a JSONL log."""
+    return entry.model_dump_json() + "\n"
+
+def read_transaction_lines(file_path: Path) -> Iterator[TransactionEntry]:
+    """Yield every transaction in a JSONL log in the order it was written."""
+    if not file_path.exists():
+        return
+
+    with file_path.open(encoding="utf-8") as log:
+        for line_number, line in enumerate(log, start=1):
+            if not line.strip():
+                continue
+            try:
+                transaction = TransactionEntry.model_validate_json(line)
+            except ValidationError as exc:
+                if exc.errors()[0]["type"] != "json_invalid":
+                    raise
+                # A crash mid-append can leave a partial final line behind
+                logger.warning("Skipping unreadable line %d in %s", line_number, file_path.name)
+                continue
+            yield transaction
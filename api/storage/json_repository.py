@@ -0,0 +1,189 @@
+"""Storage backend that keeps everything in JSON files."""
+from collections import Counter
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import api.config as config
+from api.ledger import Ledger
+from api.storage.files import append_lines, format_transaction_line, read_transaction_lines, write_atomically
+from api.storage.repository import Repository
+from api.storage.transaction_segments import TransactionSegments
+from api.utilities.json_helpers import dump_model, dumps, loads
+from api.utilities.transaction_helpers import transaction_matches
+from models import (
+    TransactionsData,
+    TransactionEntry,
+    PreferencesData,
+    UserPreferences,
+)
+
+MIGRATED_SUFFIX = ".migrated"
+
+logger = logging.getLogger(__name__)
+
+def load_data(file_path: Path, model, fallback):
+    """Generic loader for JSON files with fallback."""
+    if not file_path.exists():
+        return model(**fallback)
+    return model.model_validate_json(file_path.read_bytes())
+
+def save_data(file_path: Path, data):
+    """Generic saver for JSON files."""
+    write_atomically(file_path, dump_model(data))
+
+def missing_transactions(transactions: Iterable[TransactionEntry], stored: Iterable[TransactionEntry]) -> list[TransactionEntry]:
+    """The transactions not already stored, matching identical transactions one for one."""
+    counts = Counter(_transaction_key(entry) for entry in stored)
+    missing = []
+    for entry in transactions:
+        key = _transaction_key(entry)
+        if counts[key]:
+            counts[key] -= 1
+        else:
+            missing.append(entry)
+    return missing
+
+def _transaction_key(entry: TransactionEntry) -> tuple:
+    return entry.type, entry.debtor, entry.creditor, entry.amount, entry.reason, entry.timestamp
+
+class JsonRepository(Repository):
+    """Debts, transactions and preferences stored as JSON files in one directory."""
+
+    def __init__(self, data_directory: Path):
+        self.data_directory = data_directory
+        self.debts_file = data_directory / "debts.json"
+        self.transactions_file = data_directory / "transactions.json"
+        self.transactions_log_file = data_directory / "transactions.jsonl"
+        self.transactions_directory = data_directory / "transactions"
+        self.preferences_file = data_directory / "preferences.json"
+        self._segments: Optional[TransactionSegments] = None
+
+    # --- Debts ---
+    def load_debts(self) -> Ledger:
+        if not self.debts_file.exists():
+            return Ledger()
+        return Ledger.from_dict(loads(self.debts_file.read_bytes()))
+
+    def save_debts(self, data: Ledger):
+        write_atomically(self.debts_file, dumps(data.to_dict()))
+
+    # --- Transactions ---
+    @property
+    def segments(self) -> TransactionSegments:
+        """The time-partitioned transaction segments used in "segmented" mode."""
+        if self._segments is None:
+            self._segments = TransactionSegments(self.transactions_directory, config.TRANSACTIONS_SEGMENT_PERIOD)
+        return self._segments
+
+    def migrate_transactions(self):
+        """One-time migration of older transaction files into the configured storage mode.
+
+        The new storage is written in full and moved into place before the older files are set
+        aside, so an interrupted migration is simply redone on the next call. If the new storage
+        already exists, only the transactions it is missing are added to it, such as ones recorded
+        after switching back to an older mode.
+        """
+        mode = config.TRANSACTIONS_STORAGE_MODE
+        if mode == "jsonl":
+            sources = [self.transactions_file]
+            already_migrated = self.transactions_log_file.exists()
+        elif mode == "segmented":
+            sources = [self.transactions_file, self.transactions_log_file]
+            already_migrated = self.segments.exists()
+        else:
+            return
+
+        sources = [source for source in sources if source.exists()]
+        if not sources:
+            return
+
+        transactions = self.load_transactions().transactions
+        if mode == "segmented":
+            transactions += list(read_transaction_lines(self.transactions_log_file))
+
+        if already_migrated:
+            stored = read_transaction_lines(self.transactions_log_file) if mode == "jsonl" else self.segments.iter_transactions()
+            missing = missing_transactions(transactions, stored)
+            if missing:
+                if mode == "jsonl":
+                    append_lines(self.transactions_log_file, "".join(format_transaction_line(entry) for entry in missing))
+                else:
+                    self.segments.extend(missing)
+                logger.warning("Added %d transactions missing from %s storage", len(missing), mode)
+        else:
+            if mode == "jsonl":
+                write_atomically(
+                    self.transactions_log_file,
+                    "".join(format_transaction_line(entry) for entry in transactions)
+                )
+            else:
+                self.segments.create(transactions)
+            logger.info("Migrated %d transactions to %s storage", len(transactions), mode)
+
+        for source in sources:
+            source.replace(source.with_name(source.name + MIGRATED_SUFFIX))
+
+    def iter_stored_transactions(self) -> Iterator[TransactionEntry]:
+        """Yield every transaction in the legacy file, the log and the segments, without migrating anything."""
+        yield from self.load_transactions().transactions
+        yield from read_transaction_lines(self.transactions_log_file)
+        if self.segments.exists():
+            yield from self.segments.iter_transactions()
+
+    def load_transactions(self) -> TransactionsData:
+        """Load the legacy transactions.json file."""
+        fallback = {"transactions": []}
+        return load_data(self.transactions_file, TransactionsData, fallback)
+
+    def append_transactions(self, entries: list[TransactionEntry]):
+        mode = config.TRANSACTIONS_STORAGE_MODE
+        if mode == "json":
+            transactions_data = self.load_transactions()
+            transactions_data.transactions.extend(entries)
+            save_data(self.transactions_file, transactions_data)
+            return
+
+        self.migrate_transactions()
+        if mode == "segmented":
+            self.segments.extend(entries)
+            return
+
+        append_lines(self.transactions_log_file, "".join(format_transaction_line(entry) for entry in entries))
+
+    def iter_transactions(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_id: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        counterparty_id: Optional[str] = None,
+    ) -> Iterator[TransactionEntry]:
+        mode = config.TRANSACTIONS_STORAGE_MODE
+        self.migrate_transactions()
+        if mode == "segmented":
+            yield from self.segments.iter_transactions(start, end, user_id, transaction_type, counterparty_id)
+            return
+
+        if mode == "jsonl":
+            transactions = read_transaction_lines(self.transactions_log_file)
+        else:
+            transactions = self.load_transactions().transactions
+
+        for transaction in transactions:
+            if transaction_matches(transaction, start, end, user_id, transaction_type, counterparty_id):
+                yield transaction
+
+    # --- Preferences ---
+    def load_preferences(self) -> PreferencesData:
+        """Load every user's preferences."""
+        fallback = {"users": {}}
+        return load_data(self.preferences_file, PreferencesData, fallback)
+
+    def get_user_preferences(self, user_id: str) -> Optional[UserPreferences]:
+        return self.load_preferences().users.get(user_id)
+
+    def save_user_preferences(self, user_id: str, preferences: UserPreferences):
+        all_preferences = self.load_preferences()
+        all_preferences.users[user_id] = preferences
+        save_data(self.preferences_file, all_preferences)
@@ -0,0 +1,67 @@
+"""Interface that every storage backend implements."""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+from api.ledger import Ledger
+from models import (
+    TransactionEntry,
+    UserPreferences,
+)
+
+class Repository(ABC):
+    """Storage for debts, transactions and user preferences."""
+
+    # Whether save_debt_pairs only writes the pairs it is given, so it can be passed just those pairs
+    writes_debt_pairs: bool = False
+
+    # --- Debts ---
+    @abstractmethod
+    def load_debts(self) -> Ledger:
+        """Load the whole debt ledger."""
+
+    @abstractmethod
+    def save_debts(self, data: Ledger):
+        """Replace the stored debt ledger."""
+
+    def save_debt_pairs(self, data: Ledger, pairs: Iterable[tuple[str, str]]):
+        """Store the debts of the given (debtor ID, creditor ID) pairs as they are in the ledger,
+        removing any pair it no longer has. Backends that can only store the whole ledger replace it.
+        """
+        self.save_debts(data)
+
+    # --- Transactions ---
+    def append_transaction(self, entry: TransactionEntry):
+        """Record a new transaction."""
+        self.append_transactions([entry])
+
+    @abstractmethod
+    def append_transactions(self, entries: list[TransactionEntry]):
+        """Record several new transactions, in order, with a single write."""
+
+    @abstractmethod
+    def iter_transactions(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_id: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        counterparty_id: Optional[str] = None,
+    ) -> Iterator[TransactionEntry]:
+        """Yield transactions in the order they were recorded, optionally filtered.
+
+        `start` and `end` are inclusive, timezone-aware bounds. Transactions with naive
+        timestamps are treated as UTC. `counterparty_id` narrows a `user_id` filter to the
+        transactions between those two users.
+        """
+
+    # --- Preferences ---
+    @abstractmethod
+    def get_user_preferences(self, user_id: str) -> Optional[UserPreferences]:
+        """Get a user's preferences, or None if they have never set any."""
+
+    @abstractmethod
+    def save_user_preferences(self, user_id: str, preferences: UserPreferences):
+        """Store a user's preferences."""
+
+    def close(self):
+        """Release any resources held by the backend."""
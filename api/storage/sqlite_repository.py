@@ -0,0 +1,239 @@
+"""Storage backend that keeps everything in a SQLite database running in WAL mode."""
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import api.config as config
+from api.ledger import Ledger, LedgerDebtor, LedgerEntry
+from api.storage.json_repository import JsonRepository
+from api.storage.repository import Repository
+from api.utilities.tick_helpers import format_ticks, parse_ticks
+from api.utilities.transaction_helpers import datetime_to_epoch, timestamp_to_epoch
+from models import (
+    TransactionEntry,
+    UserPreferences,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS debt_entries (
+    id INTEGER PRIMARY KEY,
+    debtor TEXT NOT NULL,
+    creditor TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    reason TEXT NOT NULL DEFAULT '',
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_debt_entries_debtor ON debt_entries (debtor, creditor);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    debtor TEXT NOT NULL,
+    creditor TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    reason TEXT NOT NULL DEFAULT '',
+    timestamp TEXT NOT NULL,
+    epoch INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_epoch ON transactions (epoch);
+CREATE INDEX IF NOT EXISTS idx_transactions_debtor ON transactions (debtor, epoch);
+CREATE INDEX IF NOT EXISTS idx_transactions_creditor ON transactions (creditor, epoch);
+CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions (type, epoch);
+
+CREATE TABLE IF NOT EXISTS preferences (
+    user_id TEXT PRIMARY KEY,
+    use_unicode INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+TRANSACTION_COLUMNS = "type, debtor, creditor, amount, reason, timestamp"
+INSERT_DEBT_ENTRY = "INSERT INTO debt_entries (debtor, creditor, amount, reason, timestamp) VALUES (?, ?, ?, ?, ?)"
+INSERT_TRANSACTION = f"INSERT INTO transactions ({TRANSACTION_COLUMNS}, epoch) VALUES (?, ?, ?, ?, ?, ?, ?)"
+UPSERT_PREFERENCES = (
+    "INSERT INTO preferences (user_id, use_unicode) VALUES (?, ?) "
+    "ON CONFLICT(user_id) DO UPDATE SET use_unicode = excluded.use_unicode"
+)
+
+logger = logging.getLogger(__name__)
+
+def debt_rows(data: Ledger) -> Iterator[tuple]:
+    """Rows of the debt_entries table for every entry in the ledger."""
+    for debtor_id, debtor in data.debtors.items():
+        for creditor_id, entries in debtor.creditors.items():
+            for entry in entries:
+                yield debtor_id, creditor_id, format_ticks(entry.ticks), entry.reason, entry.timestamp
+
+def transaction_rows(entries: Iterable[TransactionEntry]) -> Iterator[tuple]:
+    """Rows of the transactions table for the given transactions."""
+    for entry in entries:
+        yield (
+            entry.type,
+            entry.debtor,
+            entry.creditor,
+            str(entry.amount),
+            entry.reason,
+            entry.timestamp,
+            timestamp_to_epoch(entry.timestamp),
+        )
+
+class SqliteRepository(Repository):
+    """Debts, transactions and preferences stored in indexed SQLite tables."""
+
+    writes_debt_pairs = True
+
+    def __init__(self, database_file: Path):
+        database_file.parent.mkdir(parents=True, exist_ok=True)
+        self.database_file = database_file
+        # The connection is shared between the event loop and the background flusher thread
+        self._connection = sqlite3.connect(database_file, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            # NORMAL can lose the last commits on power loss in WAL mode, which "sync" durability rules out
+            synchronous = "FULL" if config.DEBTS_DURABILITY_MODE == "sync" else "NORMAL"
+            self._connection.execute(f"PRAGMA synchronous={synchronous}")
+            self._connection.executescript(SCHEMA)
+
+    # --- Debts ---
+    def load_debts(self) -> Ledger:
+        data = Ledger()
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT debtor, creditor, amount, reason, timestamp FROM debt_entries ORDER BY id"
+            ).fetchall()
+        for debtor_id, creditor_id, amount, reason, timestamp in rows:
+            debtor = data.debtors.setdefault(debtor_id, LedgerDebtor())
+            debtor.creditors.setdefault(creditor_id, []).append(
+                LedgerEntry(parse_ticks(amount), reason, timestamp)
+            )
+        return data
+
+    def save_debts(self, data: Ledger):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM debt_entries")
+            self._connection.executemany(INSERT_DEBT_ENTRY, debt_rows(data))
+
+    def save_debt_pairs(self, data: Ledger, pairs: Iterable[tuple[str, str]]):
+        with self._lock, self._connection:
+            for debtor_id, creditor_id in pairs:
+                self._connection.execute(
+                    "DELETE FROM debt_entries WHERE debtor = ? AND creditor = ?", (debtor_id, creditor_id)
+                )
+                debtor = data.debtors.get(debtor_id)
+                entries = [] if debtor is None else debtor.creditors.get(creditor_id, [])
+                self._connection.executemany(INSERT_DEBT_ENTRY, [
+                    (debtor_id, creditor_id, format_ticks(entry.ticks), entry.reason, entry.timestamp)
+                    for entry in entries
+                ])
+
+    # --- Transactions ---
+    def append_transactions(self, entries: list[TransactionEntry]):
+        with self._lock, self._connection:
+            self._connection.executemany(INSERT_TRANSACTION, transaction_rows(entries))
+
+    def iter_transactions(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_id: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        counterparty_id: Optional[str] = None,
+    ) -> Iterator[TransactionEntry]:
+        conditions = []
+        parameters = []
+        if start is not None:
+            conditions.append("epoch >= ?")
+            parameters.append(datetime_to_epoch(start))
+        if end is not None:
+            conditions.append("epoch <= ?")
+            parameters.append(datetime_to_epoch(end))
+        if transaction_type:
+            conditions.append("type = ?")
+            parameters.append(transaction_type)
+
+        query = f"SELECT {TRANSACTION_COLUMNS} FROM transactions"
+        if user_id:
+            # A union of the two indexed lookups is much cheaper than an OR across both columns
+            branches = []
+            branch_parameters = []
+            for user_column, other_column in (("debtor", "creditor"), ("creditor", "debtor")):
+                branch_conditions = conditions + [f"{user_column} = ?"]
+                branch_parameters += parameters + [user_id]
+                if counterparty_id:
+                    branch_conditions.append(f"{other_column} = ?")
+                    branch_parameters.append(counterparty_id)
+                branches.append(f"SELECT id, {TRANSACTION_COLUMNS} FROM transactions WHERE {' AND '.join(branch_conditions)}")
+            query = " UNION ".join(branches) + " ORDER BY id"
+            parameters = branch_parameters
+        else:
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            query += " ORDER BY id"
+
+        # Rows are streamed from a connection of their own, so the shared one isn't held while the
+        # caller works through them. In WAL mode it reads a consistent snapshot while writes carry on
+        connection = sqlite3.connect(self.database_file, check_same_thread=False)
+        try:
+            for row in connection.execute(query, parameters):
+                if user_id:
+                    row = row[1:]
+                transaction_type_value, debtor, creditor, amount, reason, timestamp = row
+                yield TransactionEntry(
+                    type=transaction_type_value,
+                    debtor=debtor,
+                    creditor=creditor,
+                    amount=amount,
+                    reason=reason,
+                    timestamp=timestamp
+                )
+        finally:
+            connection.close()
+
+    # --- Preferences ---
+    def get_user_preferences(self, user_id: str) -> Optional[UserPreferences]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT use_unicode FROM preferences WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return UserPreferences(use_unicode=bool(row[0]))
+
+    def save_user_preferences(self, user_id: str, preferences: UserPreferences):
+        with self._lock, self._connection:
+            self._connection.execute(UPSERT_PREFERENCES, (user_id, int(preferences.use_unicode)))
+
+    # --- Migration ---
+    def import_json(self, source: JsonRepository) -> bool:
+        """One-time import of the debts, transactions and preferences kept by the JSON backend.
+
+        Only runs while the database is empty, and in a single SQL transaction, so an interrupted
+        import is simply redone on the next start. The JSON files are left untouched.
+        """
+        with self._lock:
+            if any(
+                self._connection.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone()
+                for table in ("debt_entries", "transactions", "preferences")
+            ):
+                return False
+
+            with self._connection:
+                self._connection.executemany(INSERT_DEBT_ENTRY, debt_rows(source.load_debts()))
+                self._connection.executemany(INSERT_TRANSACTION, transaction_rows(source.iter_stored_transactions()))
+                self._connection.executemany(UPSERT_PREFERENCES, [
+                    (user_id, int(preferences.use_unicode))
+                    for user_id, preferences in source.load_preferences().users.items()
+                ])
+                counts = [
+                    self._connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in ("debt_entries", "transactions", "preferences")
+                ]
+        if any(counts):
+            logger.info("Imported %d debts, %d transactions and %d preferences from JSON files", *counts)
+        return any(counts)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,175 @@
+"""Time-partitioned storage for the transaction history.
+
+Transactions are appended to one JSONL segment per period (a month by default). A small
+manifest records the earliest and latest timestamp in every segment, so a date range query
+only opens the segments that overlap it.
+"""
+import logging
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+from api.storage.files import append_lines, format_transaction_line, read_transaction_lines, sync_directory, write_atomically
+from api.utilities.json_helpers import dumps, loads
+from api.utilities.transaction_helpers import (
+    PERIODS,
+    datetime_to_epoch,
+    epoch_to_datetime,
+    period_name,
+    timestamp_to_epoch,
+    transaction_matches
+)
+from models import TransactionEntry
+
+SEGMENT_PERIODS = PERIODS
+MANIFEST_NAME = "segments.json"
+SEGMENT_SUFFIX = ".jsonl"
+
+logger = logging.getLogger(__name__)
+
+def segment_name(epoch: int, period: str) -> str:
+    """Name of the segment a transaction at the given epoch (in microseconds) belongs to."""
+    return period_name(epoch_to_datetime(epoch), period)
+
+class TransactionSegments:
+    """A directory of time-partitioned transaction logs plus their min/max timestamp manifest."""
+
+    def __init__(self, directory: Path, period: str):
+        self.directory = directory
+        self.manifest_file = directory / MANIFEST_NAME
+        self.period = period
+        self._segments: Optional[dict[str, dict]] = None
+
+    def exists(self) -> bool:
+        """Whether the segment directory has been created."""
+        return self.directory.exists()
+
+    def create(self, entries: Iterable[TransactionEntry]):
+        """Create the segment directory from existing transactions in one step.
+
+        Segments are built in a temporary directory that is renamed into place, so an
+        interrupted migration leaves nothing behind.
+        """
+        temp_directory = self.directory.with_name(self.directory.name + ".tmp")
+        shutil.rmtree(temp_directory, ignore_errors=True)
+        temp_directory.mkdir(parents=True)
+
+        staged = TransactionSegments(temp_directory, self.period)
+        staged._segments = {}
+        grouped: dict[str, list[TransactionEntry]] = {}
+        for entry in entries:
+            grouped.setdefault(segment_name(timestamp_to_epoch(entry.timestamp), self.period), []).append(entry)
+        for name, segment_entries in grouped.items():
+            write_atomically(
+                staged.segment_file(name),
+                "".join(format_transaction_line(entry) for entry in segment_entries),
+                durable=False
+            )
+            staged._segments[name] = staged._scan_segment(name)
+        staged._write_manifest()
+
+        temp_directory.replace(self.directory)
+        sync_directory(self.directory.parent)
+        self._segments = None
+
+    def segment_file(self, name: str) -> Path:
+        """Path of the JSONL file holding the named segment."""
+        return self.directory / f"{name}{SEGMENT_SUFFIX}"
+
+    def append(self, entry: TransactionEntry):
+        """Append a transaction to the segment for its timestamp."""
+        self.extend([entry])
+
+    def extend(self, entries: list[TransactionEntry]):
+        """Append transactions to the segments for their timestamps, writing the manifest once."""
+        segments = self._load_manifest()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # Group by segment so each segment file is opened once, keeping the order within each
+        lines_by_segment: dict[str, list[str]] = {}
+        for entry in entries:
+            epoch = timestamp_to_epoch(entry.timestamp)
+            name = segment_name(epoch, self.period)
+            lines_by_segment.setdefault(name, []).append(format_transaction_line(entry))
+
+            metadata = segments.get(name)
+            if metadata is None:
+                metadata = segments[name] = {"min_epoch": epoch, "max_epoch": epoch, "count": 0}
+            metadata["min_epoch"] = min(metadata["min_epoch"], epoch)
+            metadata["max_epoch"] = max(metadata["max_epoch"], epoch)
+            metadata["count"] += 1
+
+        for name, lines in lines_by_segment.items():
+            segment_file = self.segment_file(name)
+            append_lines(segment_file, "".join(lines))
+            segments[name]["size"] = segment_file.stat().st_size
+        self._write_manifest()
+
+    def iter_transactions(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_id: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        counterparty_id: Optional[str] = None,
+    ) -> Iterator[TransactionEntry]:
+        """Yield matching transactions, skipping every segment outside the date range."""
+        start_epoch = None if start is None else datetime_to_epoch(start)
+        end_epoch = None if end is None else datetime_to_epoch(end)
+        segments = self._load_manifest()
+
+        for name, metadata in sorted(segments.items(), key=lambda item: (item[1]["min_epoch"], item[0])):
+            if start_epoch is not None and metadata["max_epoch"] < start_epoch:
+                continue
+            if end_epoch is not None and metadata["min_epoch"] > end_epoch:
+                continue
+
+            # Segments entirely inside the range need no per-row timestamp parsing
+            fully_inside = (
+                (start_epoch is None or metadata["min_epoch"] >= start_epoch)
+                and (end_epoch is None or metadata["max_epoch"] <= end_epoch)
+            )
+            for transaction in read_transaction_lines(self.segment_file(name)):
+                if fully_inside:
+                    if transaction_matches(transaction, None, None, user_id, transaction_type, counterparty_id):
+                        yield transaction
+                elif transaction_matches(transaction, start, end, user_id, transaction_type, counterparty_id):
+                    yield transaction
+
+    def _load_manifest(self) -> dict[str, dict]:
+        if self._segments is not None:
+            return self._segments
+
+        manifest = {}
+        if self.manifest_file.exists():
+            manifest = loads(self.manifest_file.read_bytes())
+            self.period = manifest.get("period", self.period)
+
+        # The manifest is written without fsync, so any segment whose size no longer matches it is rescanned
+        segments = {}
+        recorded = manifest.get("segments", {})
+        for segment_file in self.directory.glob(f"*{SEGMENT_SUFFIX}"):
+            name = segment_file.name[:-len(SEGMENT_SUFFIX)]
+            metadata = recorded.get(name)
+            if metadata is None or metadata.get("size") != segment_file.stat().st_size:
+                logger.info("Rebuilding metadata for transaction segment %s", name)
+                metadata = self._scan_segment(name)
+            if metadata["count"]:
+                segments[name] = metadata
+
+        self._segments = segments
+        return segments
+
+    def _scan_segment(self, name: str) -> dict:
+        segment_file = self.segment_file(name)
+        epochs = [timestamp_to_epoch(entry.timestamp) for entry in read_transaction_lines(segment_file)]
+        return {
+            "min_epoch": min(epochs, default=0),
+            "max_epoch": max(epochs, default=0),
+            "count": len(epochs),
+            "size": segment_file.stat().st_size,
+        }
+
+    def _write_manifest(self):
+        manifest = {"period": self.period, "segments": self._segments}
+        write_atomically(self.manifest_file, dumps(manifest), durable=False)
@@ -0,0 +1,223 @@
+"""Module for the in-memory index over the transaction history."""
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from fractions import Fraction
+from heapq import merge
+import sys
+from typing import Iterable, Iterator, NamedTuple, Optional
+from api.utilities.transaction_helpers import datetime_to_epoch, timestamp_to_epoch
+from models import TransactionEntry
+
+# Typecode of the arrays holding epochs and positions: signed 64-bit integers
+INT64 = "q"
+
+class IndexedTransaction(NamedTuple):
+    """A transaction held by the index: a plain tuple with the same fields as TransactionEntry,
+    so it costs a fraction of the memory of the pydantic model. User IDs and types are interned."""
+    type: str
+    debtor: str
+    creditor: str
+    amount: Fraction
+    reason: str
+    timestamp: str
+
+    @classmethod
+    def from_entry(cls, entry: TransactionEntry, amounts: dict[Fraction, Fraction]) -> "IndexedTransaction":
+        """Convert a recorded transaction, sharing equal amounts through the `amounts` dict."""
+        return cls(
+            sys.intern(entry.type),
+            sys.intern(entry.debtor),
+            sys.intern(entry.creditor),
+            amounts.setdefault(entry.amount, entry.amount),
+            sys.intern(entry.reason),
+            entry.timestamp,
+        )
+
+    def to_entry(self) -> TransactionEntry:
+        """The transaction as a TransactionEntry. The fields were validated when it was recorded."""
+        return TransactionEntry.model_construct(**self._asdict())
+
+class TransactionIndex:
+    """Every recorded transaction held in memory with timestamp, user, pair and type indexes.
+
+    Timestamps are parsed once, when a transaction is added, into epoch microseconds. Range
+    queries bisect that sorted array instead of parsing every stored timestamp per request,
+    and user, pair and type filters start from a direct lookup rather than a full scan.
+    Transactions are kept as IndexedTransaction tuples and every position and epoch in packed
+    integer arrays, and only the transactions a query returns are turned back into models.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        # Transactions in the order they were recorded; a transaction's position is its index here
+        self.transactions: list[IndexedTransaction] = []
+        # Every distinct amount, so the many transactions of the same amount share one Fraction
+        self._amounts: dict[Fraction, Fraction] = {}
+        self._epochs = array(INT64)
+        # Parallel arrays sorted by timestamp, then position
+        self._sorted_epochs = array(INT64)
+        self._sorted_positions = array(INT64)
+        # Whether every transaction was recorded in timestamp order, so _sorted_positions[i] == i
+        self._in_order = True
+        # Secondary indexes from a key to the ascending positions of its transactions
+        self._by_user: dict[str, array] = {}
+        self._by_pair: dict[tuple[str, str], array] = {}
+        self._by_type: dict[str, array] = {}
+
+    def build(self, transactions: Iterable[TransactionEntry]):
+        """Rebuild every index from the full transaction history."""
+        self.transactions = []
+        self._amounts = {}
+        self._epochs = array(INT64)
+        self._by_user = {}
+        self._by_pair = {}
+        self._by_type = {}
+        for transaction in transactions:
+            self._add_to_secondary_indexes(transaction)
+
+        order = sorted(range(len(self._epochs)), key=self._epochs.__getitem__)
+        self._sorted_epochs = array(INT64, (self._epochs[position] for position in order))
+        self._sorted_positions = array(INT64, order)
+        self._in_order = all(position == expected for expected, position in enumerate(order))
+        self.loaded = True
+
+    def add(self, transaction: TransactionEntry):
+        """Add a newly recorded transaction to every index."""
+        position = len(self.transactions)
+        epoch = self._add_to_secondary_indexes(transaction)
+
+        if not self._sorted_epochs or epoch >= self._sorted_epochs[-1]:
+            self._sorted_epochs.append(epoch)
+            self._sorted_positions.append(position)
+        else:
+            # Only happens for out of order timestamps, e.g. after a clock change
+            self._in_order = False
+            insert_at = bisect_right(self._sorted_epochs, epoch)
+            self._sorted_epochs.insert(insert_at, epoch)
+            self._sorted_positions.insert(insert_at, position)
+
+    def _add_to_secondary_indexes(self, transaction: TransactionEntry) -> int:
+        position = len(self.transactions)
+        epoch = timestamp_to_epoch(transaction.timestamp)
+        transaction = IndexedTransaction.from_entry(transaction, self._amounts)
+        self.transactions.append(transaction)
+        self._epochs.append(epoch)
+
+        _append_position(self._by_user, transaction.debtor, position)
+        if transaction.creditor != transaction.debtor:
+            _append_position(self._by_user, transaction.creditor, position)
+        _append_position(self._by_pair, (transaction.debtor, transaction.creditor), position)
+        _append_position(self._by_type, transaction.type, position)
+        return epoch
+
+    def positions_between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> list[int]:
+        """Positions of the transactions with start <= timestamp <= end, in the order they were recorded."""
+        low, high = self._sorted_range(start, end)
+        return sorted(self._sorted_positions[low:high])
+
+    def _sorted_range(self, start: Optional[datetime], end: Optional[datetime]) -> tuple[int, int]:
+        low = 0 if start is None else bisect_left(self._sorted_epochs, datetime_to_epoch(start))
+        high = len(self._sorted_epochs) if end is None else bisect_right(self._sorted_epochs, datetime_to_epoch(end))
+        return low, high
+
+    def user_positions(self, user_id: str) -> Iterable[int]:
+        """Positions of every transaction involving the user."""
+        return self._by_user.get(user_id, ())
+
+    def pair_positions(self, user_id: str, counterparty_id: str) -> list[int]:
+        """Positions of every transaction between two users, in either direction."""
+        return list(merge(
+            self._by_pair.get((user_id, counterparty_id), ()),
+            self._by_pair.get((counterparty_id, user_id), ())
+        ))
+
+    def query(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_id: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        counterparty_id: Optional[str] = None,
+    ) -> list[TransactionEntry]:
+        """Transactions matching the /transactions filters, in the order they were recorded."""
+        return [
+            transaction
+            for _, transaction in self.iter_matches(start, end, user_id, transaction_type, counterparty_id)
+        ]
+
+    def iter_matches(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_id: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        counterparty_id: Optional[str] = None,
+        after: int = -1,
+    ) -> Iterator[tuple[int, TransactionEntry]]:
+        """Lazily yield (position, transaction) for the transactions matching the /transactions
+        filters that were recorded after position `after`, in the order they were recorded.
+
+        The candidate positions come from whichever index is most selective for the filters
+        given, starting from `after` by bisection, so a page of results costs the same however
+        far into the matches it is. The remaining filters are then checked against each candidate.
+        """
+        low, high = self._sorted_range(start, end)
+        candidates = [(high - low, "date")]
+        if user_id and counterparty_id:
+            pair_count = (
+                len(self._by_pair.get((user_id, counterparty_id), ()))
+                + len(self._by_pair.get((counterparty_id, user_id), ()))
+            )
+            candidates.append((pair_count, "pair"))
+        elif user_id:
+            candidates.append((len(self.user_positions(user_id)), "user"))
+        if transaction_type:
+            candidates.append((len(self._by_type.get(transaction_type, ())), "type"))
+        _, source = min(candidates)
+
+        if source == "pair":
+            positions = merge(
+                _positions_after(self._by_pair.get((user_id, counterparty_id), ()), after),
+                _positions_after(self._by_pair.get((counterparty_id, user_id), ()), after)
+            )
+        elif source == "user":
+            positions = _positions_after(self.user_positions(user_id), after)
+        elif source == "type":
+            positions = _positions_after(self._by_type.get(transaction_type, ()), after)
+        elif self._in_order:
+            # Positions in timestamp order are the positions themselves, so the range is contiguous
+            positions = range(max(low, after + 1), high)
+        else:
+            positions = _positions_after(sorted(self._sorted_positions[low:high]), after)
+
+        start_epoch = None if start is None or source == "date" else datetime_to_epoch(start)
+        end_epoch = None if end is None or source == "date" else datetime_to_epoch(end)
+
+        for position in positions:
+            if start_epoch is not None and self._epochs[position] < start_epoch:
+                continue
+            if end_epoch is not None and self._epochs[position] > end_epoch:
+                continue
+            transaction = self.transactions[position]
+            if user_id and transaction.debtor != user_id and transaction.creditor != user_id:
+                continue
+            if counterparty_id and transaction.debtor != counterparty_id and transaction.creditor != counterparty_id:
+                continue
+            if transaction_type and transaction.type != transaction_type:
+                continue
+            yield position, transaction.to_entry()
+
+def _positions_after(positions, after: int) -> Iterator[int]:
+    """The ascending positions greater than `after`, found by bisection rather than a scan."""
+    first = bisect_right(positions, after)
+    return (positions[i] for i in range(first, len(positions)))
+
+def _append_position(index: dict, key, position: int):
+    # Cheaper than setdefault, which would build a new array for every call
+    positions = index.get(key)
+    if positions is None:
+        positions = index[key] = array(INT64)
+    positions.append(position)
+
+transaction_index = TransactionIndex()
@@ -0,0 +1,100 @@
+"""Module for the daily rollups of transaction counts and amounts."""
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Iterable, Optional
+from api.transaction_summary import ROLES, TransactionSummary, accumulate, transaction_day
+from api.utilities.tick_helpers import to_ticks
+from models import TransactionEntry
+
+# Counts every transaction involving a user once, even one where they are both debtor and creditor
+INVOLVED = "involved"
+
+class TransactionRollups:
+    """The number and total amount of transactions per day and type, overall and per user and role.
+
+    Rollups are kept up to date as transactions are recorded and can always be rebuilt from the
+    transaction history, so they are never stored. Summaries over a date range then cost one
+    lookup per day in the range rather than one per transaction.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        # Every day with at least one transaction, in order
+        self._days: list[date] = []
+        # day -> type -> [count, ticks]
+        self.daily: dict[date, dict[str, list]] = {}
+        # user -> day -> type -> role or INVOLVED -> [count, ticks]
+        self.daily_by_user: dict[str, dict[date, dict[str, dict[str, list]]]] = {}
+
+    def build(self, transactions: Iterable[TransactionEntry]):
+        """Rebuild every rollup from the full transaction history."""
+        self._days = []
+        self.daily = {}
+        self.daily_by_user = {}
+        for transaction in transactions:
+            self.add(transaction)
+        self.loaded = True
+
+    def add(self, transaction: TransactionEntry):
+        """Count a newly recorded transaction towards its day's rollups."""
+        day = transaction_day(transaction)
+        ticks = to_ticks(transaction.amount)
+        if day not in self.daily:
+            insort(self._days, day)
+            self.daily[day] = {}
+        accumulate(self.daily[day], transaction.type, 1, ticks)
+        for user_id, role in zip((transaction.debtor, transaction.creditor), ROLES):
+            counters = self.daily_by_user.setdefault(user_id, {}).setdefault(day, {}).setdefault(transaction.type, {})
+            accumulate(counters, role, 1, ticks)
+            if role == "debtor" or transaction.creditor != transaction.debtor:
+                accumulate(counters, INVOLVED, 1, ticks)
+
+    def days_between(self, start: date, end: date) -> list[date]:
+        """Days with transactions from start to end inclusive."""
+        return self._days[bisect_left(self._days, start):bisect_right(self._days, end)]
+
+    def summarize(
+        self,
+        start: date,
+        end: date,
+        user_id: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        period: str = "day",
+        per_user: bool = False,
+    ) -> TransactionSummary:
+        """The same summary TransactionSummary.from_transactions gives for the transactions matching
+        the /transactions filters, other than counterparty, built from the rollups."""
+        summary = TransactionSummary(period, per_user, user_id)
+        days = self.days_between(start, end)
+        if user_id:
+            user_days = self.daily_by_user.get(user_id, {})
+            for day in days:
+                for type_, counters in user_days.get(day, {}).items():
+                    if transaction_type and type_ != transaction_type:
+                        continue
+                    count, ticks = counters[INVOLVED]
+                    summary.add_totals(day, type_, ticks, count)
+                    if per_user:
+                        self._add_roles(summary, user_id, type_, counters)
+            return summary
+
+        for day in days:
+            for type_, (count, ticks) in self.daily[day].items():
+                if not transaction_type or type_ == transaction_type:
+                    summary.add_totals(day, type_, ticks, count)
+        if per_user:
+            for other_id, user_days in self.daily_by_user.items():
+                for day in days:
+                    for type_, counters in user_days.get(day, {}).items():
+                        if not transaction_type or type_ == transaction_type:
+                            self._add_roles(summary, other_id, type_, counters)
+        return summary
+
+    @staticmethod
+    def _add_roles(summary: TransactionSummary, user_id: str, transaction_type: str, counters: dict[str, list]):
+        for role in ROLES:
+            if role in counters:
+                count, ticks = counters[role]
+                summary.add_user(user_id, transaction_type, role, ticks, count)
+
+transaction_rollups = TransactionRollups()
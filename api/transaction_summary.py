@@ -0,0 +1,102 @@
+"""Module for aggregating transactions into totals per period, type and user."""
+from datetime import date
+from typing import Iterable, Optional
+from api.utilities.tick_helpers import Ticks, format_ticks, normalize_ticks, to_ticks
+from api.utilities.transaction_helpers import epoch_to_datetime, period_name, timestamp_to_epoch
+from models import TransactionEntry
+
+SUMMARY_PERIODS = ("day", "week", "month")
+ROLES = ("debtor", "creditor")
+
+def accumulate(totals: dict[str, list], key: str, count: int, ticks: Ticks):
+    counter = totals.setdefault(key, [0, 0])
+    counter[0] += count
+    counter[1] = normalize_ticks(counter[1] + ticks)
+
+def _format(counter: list) -> dict:
+    return {"count": counter[0], "amount": format_ticks(counter[1])}
+
+def transaction_day(transaction: TransactionEntry) -> date:
+    """The UTC date a transaction was recorded on."""
+    return epoch_to_datetime(timestamp_to_epoch(transaction.timestamp)).date()
+
+class TransactionSummary:
+    """Counts and amounts of transactions, bucketed by period and type, and optionally by user and role.
+
+    When the transactions were filtered to one user, pass it as `user_id` so the per user
+    breakdown only covers them rather than everyone they dealt with.
+    Amounts are kept in ticks and only formatted by `to_dict()`.
+    """
+
+    def __init__(self, period: str = "day", per_user: bool = False, user_id: Optional[str] = None):
+        self.period = period
+        self.per_user = per_user
+        self.user_id = user_id
+        # type -> [count, ticks]
+        self.totals: dict[str, list] = {}
+        # period name -> type -> [count, ticks]
+        self.buckets: dict[str, dict[str, list]] = {}
+        # user -> type -> role -> [count, ticks]
+        self.users: dict[str, dict[str, dict[str, list]]] = {}
+
+    def add(self, day: date, transaction_type: str, debtor_id: str, creditor_id: str, ticks: Ticks, count: int = 1):
+        """Count transactions of one type between a pair of users on a day."""
+        self.add_totals(day, transaction_type, ticks, count)
+        if self.per_user:
+            self.add_user(debtor_id, transaction_type, "debtor", ticks, count)
+            self.add_user(creditor_id, transaction_type, "creditor", ticks, count)
+
+    def add_totals(self, day: date, transaction_type: str, ticks: Ticks, count: int = 1):
+        """Count transactions of one type on a day towards the overall and period totals."""
+        accumulate(self.totals, transaction_type, count, ticks)
+        accumulate(self.buckets.setdefault(period_name(day, self.period), {}), transaction_type, count, ticks)
+
+    def add_user(self, user_id: str, transaction_type: str, role: str, ticks: Ticks, count: int = 1):
+        """Count transactions of one type that a user took part in as the debtor or creditor."""
+        if self.user_id is not None and user_id != self.user_id:
+            return
+        accumulate(self.users.setdefault(user_id, {}).setdefault(transaction_type, {}), role, count, ticks)
+
+    def add_transaction(self, transaction: TransactionEntry):
+        """Count a single transaction."""
+        self.add(
+            transaction_day(transaction),
+            transaction.type,
+            transaction.debtor,
+            transaction.creditor,
+            to_ticks(transaction.amount)
+        )
+
+    @classmethod
+    def from_transactions(
+        cls,
+        transactions: Iterable[TransactionEntry],
+        period: str = "day",
+        per_user: bool = False,
+        user_id: Optional[str] = None
+    ) -> "TransactionSummary":
+        """Summarise transactions in a single pass without keeping them."""
+        summary = cls(period, per_user, user_id)
+        for transaction in transactions:
+            summary.add_transaction(transaction)
+        return summary
+
+    def to_dict(self) -> dict:
+        """The response form of the summary, with buckets in date order."""
+        result = {
+            "period": self.period,
+            "totals": {transaction_type: _format(counter) for transaction_type, counter in sorted(self.totals.items())},
+            "buckets": {
+                name: {transaction_type: _format(counter) for transaction_type, counter in sorted(bucket.items())}
+                for name, bucket in sorted(self.buckets.items())
+            },
+        }
+        if self.per_user:
+            result["users"] = {
+                user_id: {
+                    transaction_type: {role: _format(roles[role]) for role in ROLES if role in roles}
+                    for transaction_type, roles in sorted(types.items())
+                }
+                for user_id, types in sorted(self.users.items())
+            }
+        return result
@@ -1,78 +1,78 @@
 from datetime import datetime
 from fractions import Fraction
-from models import DebtEntry
+from typing import Iterable, Optional
+from api.ledger import LedgerEntry
+from api.utilities.tick_helpers import Ticks, format_ticks, from_ticks, normalize_ticks
 
 DATE_FORMAT = "%d-%m-%Y"
 
-def serialize_debt_entry(entry: DebtEntry) -> dict:
-    """Serialize a DebtEntry object to a dictionary."""
+def serialize_debt_entry(entry: LedgerEntry) -> dict:
+    """Serialize a LedgerEntry object to a dictionary."""
     return {
-        "amount": str(entry.amount),
+        "amount": format_ticks(entry.ticks),
         "reason": entry.reason,
         "timestamp": entry.timestamp,
     }
 
-def sum_debts(entries: list[DebtEntry]) -> Fraction:
+def sum_debts(entries: list[LedgerEntry]) -> Fraction:
     """Sum the amounts of all debt entries."""
-    return sum(Fraction(entry.amount) for entry in entries)
+    return from_ticks(sum_ticks(entries))
+
+def sum_ticks(entries: list[LedgerEntry]) -> Ticks:
+    """Sum the amounts of all debt entries in ticks."""
+    return normalize_ticks(sum(entry.ticks for entry in entries))
 
 def current_timestamp() -> str:
     """Get the current timestamp in the specified format."""
     return datetime.now().strftime(DATE_FORMAT)
 
-def build_debt_summary(entries: list[DebtEntry]) -> tuple[list[dict], Fraction]:
-    """Returns serialized debt entries and their total sum."""
+def build_debt_summary(entries: list[LedgerEntry]) -> tuple[list[dict], Ticks]:
+    """Returns serialized debt entries and their total sum in ticks."""
     serialized = [serialize_debt_entry(e) for e in entries]
-    total = sum_debts(entries)
+    total = sum_ticks(entries)
     return serialized, total
 
+def _sorted_by_subtotal(summaries: dict[str, tuple[list[dict], Ticks]]) -> dict[str, list[dict]]:
+    # Sort users by total owed (descending by default)
+    return {
+        user_id: serialized
+        for user_id, (serialized, _) in sorted(summaries.items(), key=lambda item: item[1][1], reverse=True)
+    }
+
 def debts_owed_by(data, user_id: str):
-    """Returns a summary of debts the user owes."""
+    """Returns a summary of debts the user owes, with the total in ticks."""
     owes = {}
-    total = Fraction(0)
+    total = 0
     if user_id in data.debtors:
         for creditor_id, entries in data.debtors[user_id].creditors.items():
-            serialized, subtotal = build_debt_summary(entries)
-            owes[creditor_id] = serialized
-            total += subtotal
-
-    # Sort creditors by total owed (descending by default)
-    sorted_owes = dict(
-        sorted(
-            owes.items(),
-            key=lambda item: sum(Fraction(e["amount"]) for e in item[1]),
-            reverse=True
-        )
-    )
-
-    return sorted_owes, total
-
-def debts_owed_to(data, user_id: str):
-    """Returns a summary of debts owed to the user."""
+            owes[creditor_id] = build_debt_summary(entries)
+            total += owes[creditor_id][1]
+
+    return _sorted_by_subtotal(owes), normalize_ticks(total)
+
+def debts_owed_to(data, user_id: str, debtor_ids: Optional[Iterable[str]] = None):
+    """Returns a summary of debts owed to the user, with the total in ticks.
+
+    When the debtors who owe the user are already known, pass them as `debtor_ids` to avoid
+    checking every debtor in the ledger.
+    """
     owed = {}
-    total = Fraction(0)
-    for debtor_id, user in data.debtors.items():
+    total = 0
+    if debtor_ids is None:
+        debtors = data.debtors.items()
+    else:
+        debtors = ((debtor_id, data.debtors[debtor_id]) for debtor_id in debtor_ids)
+    for debtor_id, user in debtors:
         if user_id in user.creditors:
-            serialized, subtotal = build_debt_summary(user.creditors[user_id])
-            if debtor_id not in owed:
-                owed[debtor_id] = []
-            owed[debtor_id].extend(serialized)
-            total += subtotal
-
-    # Sort debtors by total owed (descending by default)
-    sorted_owed = dict(
-        sorted(
-            owed.items(),
-            key=lambda item: sum(Fraction(e["amount"]) for e in item[1]),
-            reverse=True
-        )
-    )
-    return sorted_owed, total
+            owed[debtor_id] = build_debt_summary(user.creditors[user_id])
+            total += owed[debtor_id][1]
+
+    return _sorted_by_subtotal(owed), normalize_ticks(total)
 
 def debts_to(data, from_user_id: str, to_user_id: str):
-    """Returns debts from one user to another."""
+    """Returns debts from one user to another, with the total in ticks."""
     owed = {}
-    total = Fraction(0)
+    total = 0
 
     if from_user_id in data.debtors:
         requesters_debts = data.debtors[from_user_id].creditors
@@ -83,7 +83,7 @@ def debts_to(data, from_user_id: str, to_user_id: str):
     return owed, total
 
 def debts_between(data, user_id1: str, user_id2: str):
-    """Returns a summary of debts between two users."""
+    """Returns a summary of debts between two users, with totals in ticks."""
     owed_by_you, total_owed_by_you = debts_to(data, user_id1, user_id2)
     owed_to_you, total_owed_to_you = debts_to(data, user_id2, user_id1)
 
@@ -96,10 +96,10 @@ def debts_between(data, user_id1: str, user_id2: str):
 
     return result
 
-def settle_debts_between_users(entries: list[DebtEntry], amount_to_settle: Fraction) -> tuple[list[DebtEntry], Fraction]:
-    """Settle debts in FIFO order. Returns updated entries and settled amount."""
-    remaining = amount_to_settle
-    settled = Fraction(0)
+def settle_debts_between_users(entries: list[LedgerEntry], ticks_to_settle: Ticks) -> tuple[list[LedgerEntry], Ticks]:
+    """Settle debts in FIFO order. Returns updated entries and the settled amount in ticks."""
+    remaining = ticks_to_settle
+    settled = 0
     updated_entries = []
 
     for entry in entries:
@@ -107,18 +107,14 @@ def settle_debts_between_users(entries: list[DebtEntry], amount_to_settle: Fract
             updated_entries.append(entry)
             continue
 
-        if entry.amount <= remaining:
+        if entry.ticks <= remaining:
             # Fully settle this entry
-            settled += entry.amount
-            remaining -= entry.amount
+            settled += entry.ticks
+            remaining -= entry.ticks
         else:
             # Partially settle this entry
             settled += remaining
-            updated_entries.append(DebtEntry(
-                amount=entry.amount - remaining,
-                reason=entry.reason,
-                timestamp=entry.timestamp
-            ))
+            updated_entries.append(LedgerEntry(normalize_ticks(entry.ticks - remaining), entry.reason, entry.timestamp))
             remaining = 0
 
-    return updated_entries, settled
+    return updated_entries, normalize_ticks(settled)
@@ -0,0 +1,18 @@
+from fastapi import Request, Response
+
+def make_etag(version: str) -> str:
+    """Format a version string as a strong ETag."""
+    return f'"{version}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match header already names the current ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+def not_modified(etag: str) -> Response:
+    """A bodiless 304 Not Modified response carrying the current ETag."""
+    return Response(status_code=304, headers={"ETag": etag})
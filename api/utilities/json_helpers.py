@@ -0,0 +1,58 @@
+"""Module for encoding and decoding JSON data files and responses.
+
+In JSON_FAST_MODE data files are written without indentation, pydantic models are encoded
+and decoded natively, and orjson is used for plain data when it is installed.
+"""
+import json
+from typing import Any, Union
+from fastapi.responses import Response
+from pydantic import BaseModel
+import api.config as config
+
+try:
+    import orjson
+except ImportError:
+    # orjson is an optional speed-up; the standard library is used without it
+    orjson = None
+
+def _use_orjson() -> bool:
+    return orjson is not None and config.JSON_FAST_MODE
+
+def dumps(data: Any) -> str:
+    """Encode plain data for a data file, indented unless JSON_FAST_MODE is on."""
+    if not config.JSON_FAST_MODE:
+        return json.dumps(data, indent=2)
+    if _use_orjson():
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data, separators=(",", ":"))
+
+def dump_model(model: BaseModel) -> str:
+    """Encode a pydantic model for a data file, indented unless JSON_FAST_MODE is on."""
+    if not config.JSON_FAST_MODE:
+        return json.dumps(model.model_dump(), indent=2)
+    return model.model_dump_json()
+
+def loads(text: Union[str, bytes]) -> Any:
+    """Decode JSON text into plain data."""
+    if _use_orjson():
+        return orjson.loads(text)
+    return json.loads(text)
+
+def encode_response(content: Any) -> bytes:
+    """Encode plain response data exactly as FastAPI's JSONResponse would, only faster with orjson."""
+    if _use_orjson():
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(Response):
+    """A JSON response for plain data made of dicts, lists and strings.
+
+    Returning it from an endpoint skips FastAPI's jsonable_encoder pass over the content.
+    Passing already encoded bytes sends them as they are.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return encode_response(content)
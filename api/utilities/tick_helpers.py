@@ -0,0 +1,46 @@
+"""Module for converting amounts to and from whole SMALLEST_UNIT ticks.
+
+Amounts are held as plain integer tick counts internally so sums and comparisons avoid
+Fraction arithmetic. Fraction strings are only produced at the API boundary.
+"""
+from fractions import Fraction
+from typing import Union
+import api.config as config
+
+# A whole number of ticks, or a Fraction of ticks for legacy amounts that were never quantised
+Ticks = Union[int, Fraction]
+
+def _ratio_to_ticks(numerator: int, denominator: int) -> Ticks:
+    unit = config.SMALLEST_UNIT
+    numerator *= unit.denominator
+    denominator *= unit.numerator
+    if numerator % denominator == 0:
+        return numerator // denominator
+    return Fraction(numerator, denominator)
+
+def to_ticks(amount: Fraction) -> Ticks:
+    """Convert an amount to a count of SMALLEST_UNIT ticks, falling back to a Fraction if it isn't quantised."""
+    return _ratio_to_ticks(amount.numerator, amount.denominator)
+
+def parse_ticks(text: str) -> Ticks:
+    """Convert a stored fraction string such as "3/2" to ticks without building a Fraction first."""
+    numerator, _, denominator = text.partition("/")
+    try:
+        return _ratio_to_ticks(int(numerator), int(denominator) if denominator else 1)
+    except ValueError:
+        # Anything else Fraction accepts, such as decimals
+        return to_ticks(Fraction(text))
+
+def from_ticks(ticks: Ticks) -> Fraction:
+    """Convert a count of ticks back to an amount."""
+    return Fraction(ticks) * config.SMALLEST_UNIT
+
+def format_ticks(ticks: Ticks) -> str:
+    """Format a count of ticks as the fraction string the API returns."""
+    return str(from_ticks(ticks))
+
+def normalize_ticks(ticks: Ticks) -> Ticks:
+    """Collapse a whole Fraction of ticks back to an int once the unquantised part has cancelled out."""
+    if isinstance(ticks, Fraction) and ticks.denominator == 1:
+        return ticks.numerator
+    return ticks
@@ -1,13 +1,81 @@
 from fastapi import Query, HTTPException
-from datetime import datetime, timezone
-from typing import Optional
+import base64
+import binascii
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import islice
+import json
+from typing import Iterable, Optional, TypeVar
+from dateutil.parser import isoparse
 import api.config as config
 
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+PERIODS = ("day", "week", "month", "year")
+
+K = TypeVar("K")
+T = TypeVar("T")
+
 def ensure_aware_utc(dt: datetime) -> datetime:
     if dt.tzinfo is None:
         return dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(timezone.utc)
 
+def datetime_to_epoch(dt: datetime) -> int:
+    """Convert a datetime to whole microseconds since the Unix epoch, treating naive values as UTC."""
+    delta = ensure_aware_utc(dt) - EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+# Transactions recorded together share a timestamp, so a small cache saves parsing it for each one
+@lru_cache(maxsize=256)
+def timestamp_to_epoch(timestamp: str) -> int:
+    """Convert a stored ISO 8601 transaction timestamp to microseconds since the Unix epoch."""
+    try:
+        # Much faster than isoparse, and handles the format transactions are recorded in
+        parsed = datetime.fromisoformat(timestamp)
+    except ValueError:
+        parsed = isoparse(timestamp)
+    return datetime_to_epoch(parsed)
+
+def epoch_to_datetime(epoch: int) -> datetime:
+    """Convert microseconds since the Unix epoch back to a UTC datetime."""
+    return EPOCH + timedelta(microseconds=epoch)
+
+def period_name(day: date, period: str) -> str:
+    """Name of the day, ISO week, month or year a date falls in, e.g. 2025-01-31, 2025-W05, 2025-01 or 2025."""
+    if period == "day":
+        return day.strftime("%Y-%m-%d")
+    if period == "week":
+        iso_year, iso_week, _ = day.isocalendar()
+        return f"{iso_year:04d}-W{iso_week:02d}"
+    if period == "month":
+        return day.strftime("%Y-%m")
+    if period == "year":
+        return day.strftime("%Y")
+    raise ValueError(f"Unknown period '{period}'. Must be one of: {', '.join(PERIODS)}")
+
+def transaction_matches(
+    transaction,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[str] = None,
+    transaction_type: Optional[str] = None,
+    counterparty_id: Optional[str] = None,
+) -> bool:
+    """Check a transaction against the optional /transactions filters."""
+    if user_id and transaction.debtor != user_id and transaction.creditor != user_id:
+        return False
+    if counterparty_id and transaction.debtor != counterparty_id and transaction.creditor != counterparty_id:
+        return False
+    if transaction_type and transaction.type != transaction_type:
+        return False
+    if start is not None or end is not None:
+        timestamp = ensure_aware_utc(isoparse(transaction.timestamp))
+        if start is not None and timestamp < start:
+            return False
+        if end is not None and timestamp > end:
+            return False
+    return True
+
 def normalize_transaction_type(type_param: Optional[str]) -> Optional[str]:
     if type_param is None:
         return None
@@ -18,3 +86,34 @@ def normalize_transaction_type(type_param: Optional[str]) -> Optional[str]:
             detail=f"Invalid transaction type '{type_param}'. Must be one of: {', '.join(config.VALID_TRANSACTION_TYPES)}"
         )
     return type_lower
+
+def encode_cursor(state: dict) -> str:
+    """Pack the state needed to fetch the next page into an opaque cursor string."""
+    text = json.dumps(state, separators=(",", ":"))
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    """Unpack a cursor made by encode_cursor.
+
+    Raises:
+        HTTPException: if the cursor wasn't made by encode_cursor.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="INVALID_CURSOR") from exc
+    if not isinstance(state, dict):
+        raise HTTPException(status_code=400, detail="INVALID_CURSOR")
+    return state
+
+def paginate(keyed_items: Iterable[tuple[K, T]], limit: int) -> tuple[list[T], Optional[K]]:
+    """Take one page of (key, item) pairs, returning its items with the key of the last one,
+    which the next page starts after, or None if this was the last page.
+
+    Only one item past the page is read, so generators over storage are never consumed in full.
+    """
+    page = list(islice(keyed_items, limit + 1))
+    if len(page) > limit:
+        return [item for _, item in page[:limit]], page[limit - 1][0]
+    return [item for _, item in page], None
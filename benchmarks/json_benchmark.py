@@ -0,0 +1,44 @@
+"""Compare the pretty and fast JSON paths for data files and responses on a large ledger.
+
+Run from the repository root:
+    python -m benchmarks.json_benchmark [number of entries]
+"""
+import sys
+import time
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+import api.config as config
+import api.utilities.json_helpers as json_helpers
+from api.ledger import Ledger
+from benchmarks.ledger_benchmark import build_raw_ledger
+
+def timed(label: str, function, repeat: int = 5):
+    """Print the best time out of a few runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    print(f"  {label:<28} {best * 1000:8.1f} ms")
+
+def main():
+    entry_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    ledger = Ledger.from_dict(build_raw_ledger(entry_count))
+    stored = ledger.to_dict()
+    print(f"{entry_count} debt entries, orjson {'installed' if json_helpers.orjson else 'not installed'}")
+
+    for fast_mode in (False, True):
+        config.JSON_FAST_MODE = fast_mode
+        text = json_helpers.dumps(stored)
+        print(f"JSON_FAST_MODE={fast_mode} ({len(text) / 1024 / 1024:.1f} MiB data file)")
+        timed("encode ledger", lambda: json_helpers.dumps(ledger.to_dict()))
+        timed("decode ledger", lambda: Ledger.from_dict(json_helpers.loads(text)))
+
+    # A response body the size of a busy user's debt summary
+    content = {"debtors": stored["debtors"]}
+    print("Response encoding")
+    timed("jsonable_encoder + JSONResponse", lambda: JSONResponse(jsonable_encoder(content)))
+    timed("FastJSONResponse", lambda: json_helpers.FastJSONResponse(content))
+
+if __name__ == "__main__":
+    main()
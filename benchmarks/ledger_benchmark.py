@@ -0,0 +1,51 @@
+"""Compare load time and memory of the pydantic debt models against the compact ledger.
+
+Run from the repository root:
+    python -m benchmarks.ledger_benchmark [number of entries]
+"""
+import json
+import random
+import sys
+import time
+import tracemalloc
+from api.ledger import Ledger
+from models import DebtsData
+
+REASONS = ["", "Coffee", "Lost a bet", "Round at the pub", "Birthday"]
+
+def build_raw_ledger(entry_count: int, user_count: int = 200) -> dict:
+    """A stored-form ledger with random pairs, quantised amounts and repeated reasons."""
+    rng = random.Random(0)
+    debtors = {}
+    for _ in range(entry_count):
+        debtor_id, creditor_id = (str(user_id) for user_id in rng.sample(range(user_count), 2))
+        entries = debtors.setdefault(debtor_id, {"creditors": {}})["creditors"].setdefault(creditor_id, [])
+        entries.append({
+            "amount": f"{rng.randint(1, 60)}/6",
+            "reason": rng.choice(REASONS),
+            "timestamp": f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-2025",
+        })
+    return {"debtors": debtors}
+
+def measure(label: str, text: str, load):
+    """Print how long loading takes and how much memory the loaded ledger holds on to."""
+    started = time.perf_counter()
+    load(json.loads(text))
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    ledger = load(json.loads(text))
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del ledger
+    print(f"{label:<10} load {elapsed * 1000:8.1f} ms   retained {retained / 1024 / 1024:7.1f} MiB")
+
+def main():
+    entry_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    text = json.dumps(build_raw_ledger(entry_count))
+    print(f"{entry_count} debt entries, {len(text) / 1024 / 1024:.1f} MiB of JSON")
+    measure("pydantic", text, lambda raw: DebtsData(**raw))
+    measure("compact", text, Ledger.from_dict)
+
+if __name__ == "__main__":
+    main()
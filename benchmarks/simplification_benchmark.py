@@ -0,0 +1,57 @@
+"""Time debt simplification for a large economy.
+
+Applying a simplification works out the new ledger in a worker thread, so only the steps
+marked "event loop" hold up other requests. It records one transaction per changed pair,
+a chunk at a time with other requests let in between.
+
+Run from the repository root:
+    python -m benchmarks.simplification_benchmark [number of users] [number of debt entries]
+"""
+from pathlib import Path
+import sys
+import tempfile
+import time
+import api.config as config
+from api.data_manager import append_transactions, set_repository
+from api.debt_simplification import net_balances, simplify_balances
+from api.debt_store import DebtStore
+from api.ledger import Ledger
+from api.main import SIMPLIFY_RECORD_CHUNK, _plan_simplification
+from api.storage.json_repository import JsonRepository
+from api.transaction_index import transaction_index
+from api.transaction_rollups import transaction_rollups
+from benchmarks.ledger_benchmark import build_raw_ledger
+
+def timed(label: str, action, note: str = ""):
+    started = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<9}{elapsed * 1000:8.1f} ms   {note}".rstrip())
+    return result
+
+def main():
+    user_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    entry_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    store = DebtStore.from_ledger(Ledger.from_dict(build_raw_ledger(entry_count, user_count)))
+    pair_count = sum(len(debtor.creditors) for debtor in store.data.debtors.values())
+    print(f"{user_count} users, {entry_count} debt entries, {pair_count} debtor/creditor pairs")
+
+    debts = timed("preview", lambda: simplify_balances(net_balances(store.user_totals)))
+    print(f"{'':<26}{len(debts)} debts")
+
+    copy = timed("copy", store.data.copy_structure, "(event loop)")
+    simplified, previous, transactions = timed("plan", lambda: _plan_simplification(copy, debts), "(worker thread)")
+    print(f"{'':<26}{len(previous)} changed pairs, {len(transactions)} transactions")
+    timed("swap", lambda: store.take_over(simplified, previous), "(event loop)")
+
+    config.TRANSACTIONS_STORAGE_MODE = "jsonl"
+    with tempfile.TemporaryDirectory() as directory:
+        set_repository(JsonRepository(Path(directory)))
+        transaction_index.build(())
+        transaction_rollups.build(())
+        chunk = transactions[:SIMPLIFY_RECORD_CHUNK]
+        timed("record", lambda: append_transactions(chunk), f"(event loop) per chunk of {len(chunk)} to the log, index and rollups")
+        set_repository(None)
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,220 @@
 """Module for interacting with the API."""
-import requests
+import asyncio
+from collections import OrderedDict
+import json
+import aiohttp
 import bot.config as config
 from typing import Optional, Any, Dict
 
-def add_debt(payload: dict):
+HTTP_NOT_MODIFIED = 304
+HTTP_BAD_REQUEST = 400
+
+# Last response body and ETag for each read request: (url, params) -> (etag, body text)
+_etag_cache: "OrderedDict[tuple, tuple[str, str]]" = OrderedDict()
+
+# One keep-alive connection pool shared by every request
+_session: Optional[aiohttp.ClientSession] = None
+
+# Reads waiting on the API right now, keyed like the ETag cache, resolving to the body text
+_in_flight: Dict[tuple, asyncio.Future] = {}
+_read_stats = {"upstream": 0, "coalesced": 0}
+
+class APIResponseError(Exception):
+    """The API answered with an error status. `body` is the parsed response, if it was JSON."""
+
+    def __init__(self, status: int, body: Any = None):
+        super().__init__(f"API responded with HTTP {status}")
+        self.status = status
+        self.body = body
+
+async def open_session():
+    """Open the shared HTTP session. Called when the bot starts."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=config.API_TIMEOUT),
+            connector=aiohttp.TCPConnector(limit=config.API_MAX_CONNECTIONS),
+        )
+
+async def close_session():
+    """Close the shared HTTP session and its connections. Called when the bot shuts down."""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+async def _request(
+        method: str,
+        path: str,
+        params: Optional[dict] = None,
+        payload: Optional[dict] = None,
+        headers: Optional[dict] = None
+) -> tuple[int, Dict[str, str], str]:
+    """Send a request over the shared session, returning the status, headers and body text."""
+    if _session is None or _session.closed:
+        await open_session()
+    async with _session.request(method, f"{config.API_URL}{path}", params=params, json=payload, headers=headers) as response:
+        return response.status, dict(response.headers), await response.text()
+
+def _raise_for_status(status: int, text: str):
+    """Raise APIResponseError, with the parsed body if it is JSON, for an error status."""
+    if status >= HTTP_BAD_REQUEST:
+        try:
+            body = json.loads(text)
+        except ValueError:
+            body = None
+        raise APIResponseError(status, body)
+
+def _parse(status: int, text: str):
+    """Parse a JSON response body, raising APIResponseError for an error status."""
+    _raise_for_status(status, text)
+    return json.loads(text)
+
+async def _call(method: str, path: str, params: Optional[dict] = None, payload: Optional[dict] = None):
+    status, _, text = await _request(method, path, params=params, payload=payload)
+    return _parse(status, text)
+
+def read_stats() -> dict:
+    """How many reads went to the API and how many shared an identical read already in flight."""
+    total = _read_stats["upstream"] + _read_stats["coalesced"]
+    return {
+        **_read_stats,
+        "in_flight": len(_in_flight),
+        "coalesced_rate": _read_stats["coalesced"] / total if total else 0.0,
+    }
+
+async def _get_with_etag(path: str, params: Optional[dict] = None):
+    """GET a read endpoint, reusing the cached body when the API answers 304 Not Modified.
+
+    Identical reads made while one is already waiting on the API share its response
+    instead of sending their own.
+    """
+    cache_key = (f"{config.API_URL}{path}", tuple(sorted((params or {}).items())))
+    in_flight = _in_flight.get(cache_key) if config.API_COALESCE_READS else None
+    if in_flight is not None:
+        _read_stats["coalesced"] += 1
+        try:
+            # Shielded so one waiter being cancelled can't cancel the read for the others
+            text = await asyncio.shield(in_flight)
+        except asyncio.CancelledError:
+            if not in_flight.cancelled():
+                raise
+            # The request being shared was cancelled rather than this one, so make our own
+            return await _get_with_etag(path, params)
+        # Parse separately for each caller so they can't mutate each other's results
+        return json.loads(text)
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[cache_key] = future
+    _read_stats["upstream"] += 1
+    try:
+        text = await _fetch_with_etag(path, params, cache_key)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        # Mark the exception as seen in case nobody else was waiting for it
+        future.exception()
+        raise
+    else:
+        future.set_result(text)
+    finally:
+        del _in_flight[cache_key]
+    return json.loads(text)
+
+async def _fetch_with_etag(path: str, params: Optional[dict], cache_key: tuple) -> str:
+    """GET a read endpoint and return the body text, from the ETag cache if it hasn't changed."""
+    cached = _etag_cache.get(cache_key)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+
+    status, response_headers, text = await _request("GET", path, params=params, headers=headers)
+    if status == HTTP_NOT_MODIFIED and cached:
+        _etag_cache.move_to_end(cache_key)
+        return cached[1]
+    _raise_for_status(status, text)
+
+    etag = response_headers.get("ETag")
+    if etag:
+        _etag_cache[cache_key] = (etag, text)
+        _etag_cache.move_to_end(cache_key)
+        while len(_etag_cache) > config.API_ETAG_CACHE_SIZE:
+            _etag_cache.popitem(last=False)
+    return text
+
+async def add_debt(payload: dict):
     """Add a debt for a user in the API."""
-    response = requests.post(f"{config.API_URL}/debts", json=payload, timeout=config.API_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+    return await _call("POST", "/debts", payload=payload)
+
+async def add_debts_batch(payload: dict):
+    """Add several debts in the API, all of which are added or none are."""
+    return await _call("POST", "/debts/batch", payload=payload)
 
-def get_debts(user_id: str):
+async def get_debts(user_id: str):
     """Get the debts for a specific user from the API."""
-    response = requests.get(f"{config.API_URL}/users/{user_id}/debts", timeout=config.API_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+    return await _get_with_etag(f"/users/{user_id}/debts")
 
-def get_all_debts():
+async def get_all_debts():
     """Get all debts from the API."""
-    response = requests.get(f"{config.API_URL}/debts", timeout=config.API_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+    return await _get_with_etag("/debts")
 
-def debts_with_user(user_id1: str, user_id2: str):
+async def debts_with_user(user_id1: str, user_id2: str):
     """Get all debts between two users from the API."""
-    response = requests.get(f"{config.API_URL}/debts/between", params={"requester_id": user_id1, "target_id": user_id2}, timeout=config.API_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+    return await _get_with_etag("/debts/between", params={"requester_id": user_id1, "target_id": user_id2})
 
-def settle_debt(payload: dict):
+async def settle_debt(payload: dict):
     """Settle a user's debt in the API."""
-    response = requests.patch(f"{config.API_URL}/debts", json=payload, timeout=config.API_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+    return await _call("PATCH", "/debts", payload=payload)
 
-def get_unicode_preference(user_id: str):
+async def get_unicode_preference(user_id: str):
     """Get the user's Unicode preference from the API."""
-    response = requests.get(f"{config.API_URL}/users/{user_id}/unicode_preference", timeout=config.API_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+    return await _call("GET", f"/users/{user_id}/unicode_preference")
 
-def set_unicode_preference(user_id: str, payload: dict):
+async def set_unicode_preference(user_id: str, payload: dict):
     """Set the user's Unicode preference in the API."""
-    response = requests.post(f"{config.API_URL}/users/{user_id}/unicode_preference", json=payload, timeout=config.API_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+    return await _call("POST", f"/users/{user_id}/unicode_preference", payload=payload)
 
-def get_settings():
+async def get_settings():
     """Get the configuration values which have been set in the API."""
-    response = requests.get(f"{config.API_URL}/settings", timeout=config.API_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+    return await _get_with_etag("/settings")
 
-def get_transactions(
+async def get_transactions(
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         user_id: Optional[int] = None,
-        transaction_type: Optional[str] = None
+        transaction_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
 ) -> Dict[str, Any]:
+    """Get transactions from the API.
+
+    With a limit, one page is returned along with a "next_cursor". Passing that back as the cursor
+    gets the next page with the same filters, so the other arguments can be left out.
+    """
     params = {}
+    if cursor:
+        params["cursor"] = cursor
+    if limit:
+        params["limit"] = limit
+    if start_date:
+        params["start_date"] = start_date
+    if end_date:
+        params["end_date"] = end_date
+    if user_id:
+        params["user_id"] = user_id
+    if transaction_type:
+        params["type"] = transaction_type
+    return await _call("GET", "/transactions", params=params)
+
+async def get_transaction_summary(
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        user_id: Optional[int] = None,
+        transaction_type: Optional[str] = None,
+        period: str = "day"
+) -> Dict[str, Any]:
+    """Get the number and total amount of transactions per type and per day, week or month from the API."""
+    params = {"period": period}
     if start_date:
         params["start_date"] = start_date
     if end_date:
@@ -66,6 +223,4 @@ def get_transactions(
         params["user_id"] = user_id
     if transaction_type:
         params["type"] = transaction_type
-    response = requests.get(f"{config.API_URL}/transactions", params=params, timeout=config.API_TIMEOUT)
-    response.raise_for_status()
-    return response.json()
+    return await _call("GET", "/transactions/summary", params=params)
@@ -1,3 +1,4 @@
+import asyncio
 from fractions import Fraction
 import discord
 from bot import api_client, config
@@ -7,9 +8,10 @@ from bot.utilities.debt_processor import find_net_difference
 from bot.utilities.transactions_processor import process_transaction
 import bot.utilities.send_messages as send_messages
 from bot.utilities.user_preferences import fetch_unicode_preference
-from bot.utilities.user_utils import get_display_name
+from bot.utilities.user_utils import get_display_name, get_display_names
 from bot.utilities.misc_utils import default_unless_included
 from collections import defaultdict
+from datetime import datetime
 from dateutil import parser
 from dateutil.parser import isoparse
 
@@ -29,7 +31,7 @@ async def handle_get_debts(interaction: discord.Interaction,
     await interaction.response.defer()
     # Call the external API to fetch debts
     try:
-        data = api_client.get_debts(user_id)
+        data = await api_client.get_debts(user_id)
     except Exception as e:
         await handle_error(interaction, e, title=f"Error Fetching {config.CURRENCY_NAME} Debts")
         return
@@ -59,7 +61,7 @@ async def handle_get_debts(interaction: discord.Interaction,
                 
         lines.append(f"__**{config.CURRENCY_NAME_PLURAL} {'YOU' if user is None else 'THEY'} OWE:**__ {format_overall_debts(total_owed_by_you,show_conversion_currency,show_emoji_visuals,use_unicode)}")
         for creditor_id, entries in data["owed_by_you"].items():
-            creditor_name = await get_display_name(interaction.client, creditor_id)
+            creditor_name = await get_display_name(interaction.client, creditor_id, guild=interaction.guild)
             entry_lines = format_individual_debt_entries(entries, total_owed_by_you, use_unicode, show_details, show_percentages, show_conversion_currency, show_emoji_visuals_on_details)
             lines.append(f"\n**{creditor_name}:** {entry_lines[0]}")
             lines.extend(entry_lines[1:])
@@ -70,7 +72,7 @@ async def handle_get_debts(interaction: discord.Interaction,
        
         lines.append(f"\n__**{config.CURRENCY_NAME_PLURAL} OWED TO {'YOU' if user is None else 'THEM'}:**__ {format_overall_debts(total_owed_to_you,show_conversion_currency,show_emoji_visuals,use_unicode)}")
         for debtor_id, entries in data["owed_to_you"].items():
-            debtor_name = await get_display_name(interaction.client, debtor_id)
+            debtor_name = await get_display_name(interaction.client, debtor_id, guild=interaction.guild)
             entry_lines = format_individual_debt_entries(entries, total_owed_to_you, use_unicode, show_details, show_percentages, show_conversion_currency, show_emoji_visuals_on_details)
             lines.append(f"\n**{debtor_name}:** {entry_lines[0]}")
             lines.extend(entry_lines[1:])
@@ -107,7 +109,7 @@ async def handle_get_all_debts(
 
     # Call the external API to fetch all debts
     try:
-        data = api_client.get_all_debts()
+        data = await api_client.get_all_debts()
     except Exception as e:
         await handle_error(interaction, e, title=f"Error Fetching {config.CURRENCY_NAME} Debts")
         return
@@ -117,33 +119,21 @@ async def handle_get_all_debts(
         await handle_error(interaction, error_code="NO_DEBTS_IN_ECONOMY")
         return
 
-    use_unicode = await fetch_unicode_preference(interaction, interaction.user.id)
+    # Look up the preference and every user's name at once rather than one at a time
+    total_in_circulation = Fraction(data.pop("total_in_circulation", 0))
+    use_unicode, user_names = await asyncio.gather(
+        fetch_unicode_preference(interaction, interaction.user.id),
+        get_display_names(interaction.client, data, interaction.guild))
 
     # Prepare the data for the table
-    total_in_circulation = Fraction(data.pop("total_in_circulation", 0))
-    table_data = []
-    for user_id, totals in data.items():
-        user_name = await get_display_name(interaction.client, user_id)
-        owes = currency_formatter(totals['owes'], use_unicode)
-        is_owed = currency_formatter(totals['is_owed'], use_unicode)
-
-        if show_conversion_currency:
-            owes = with_conversion_currency(totals['owes'], owes)
-            is_owed = with_conversion_currency(totals['is_owed'], is_owed)
-
-        if show_percentages:
-            owes = with_percentage(totals['owes'], total_in_circulation, owes)
-            is_owed = with_percentage(totals['is_owed'], total_in_circulation, is_owed)
-
-        if show_emoji_visuals:
-            owes = with_emoji_visuals(totals['owes'], owes)
-            is_owed = with_emoji_visuals(totals['is_owed'], is_owed)
-
-        table_data.append({
-            "name": user_name,
-            "Owes": owes,
-            "Is Owed": is_owed
-        })
+    table_data = [
+        {
+            "name": user_names[user_id],
+            "Owes": _format_economy_total(totals['owes'], total_in_circulation, use_unicode, show_conversion_currency, show_percentages, show_emoji_visuals),
+            "Is Owed": _format_economy_total(totals['is_owed'], total_in_circulation, use_unicode, show_conversion_currency, show_percentages, show_emoji_visuals)
+        }
+        for user_id, totals in data.items()
+    ]
 
     # Determine the economy health message
     economy_health_message = max(
@@ -165,6 +155,17 @@ async def handle_get_all_debts(
         table_format=table_format
     )
 
+def _format_economy_total(amount, total_in_circulation, use_unicode, show_conversion_currency, show_percentages, show_emoji_visuals) -> str:
+    """Format one user's owes or is owed total for the economy overview."""
+    formatted = currency_formatter(amount, use_unicode)
+    if show_conversion_currency:
+        formatted = with_conversion_currency(amount, formatted)
+    if show_percentages:
+        formatted = with_percentage(amount, total_in_circulation, formatted)
+    if show_emoji_visuals:
+        formatted = with_emoji_visuals(amount, formatted)
+    return formatted
+
 async def handle_debts_with_user(
     interaction: discord.Interaction,
     user: discord.User,
@@ -184,7 +185,7 @@ async def handle_debts_with_user(
     user_id2 = str(user.id)
 
     try:
-        data = api_client.debts_with_user(user_id1, user_id2)
+        data = await api_client.debts_with_user(user_id1, user_id2)
     except Exception as e:
         await handle_error(interaction, e, title=f"Error Fetching {config.CURRENCY_NAME} Debts")
         return
@@ -257,7 +258,8 @@ async def handle_get_transactions(
     transaction_type: str = None,
     show_conversion_currency: bool = None,
     show_emoji_visuals: bool = None,
-    display_as_settle: bool = True
+    display_as_settle: bool = True,
+    summary_only: bool = None
 ):
     """Fetch and display transactions from the API."""
     await interaction.response.defer()
@@ -265,6 +267,7 @@ async def handle_get_transactions(
     show_conversion_currency = default_unless_included(show_conversion_currency, config.SHOW_CONVERSION_CURRENCY_DEFAULT)
     show_emoji_visuals = default_unless_included(show_emoji_visuals, config.SHOW_EMOJI_VISUALS_DEFAULT)
     display_as_settle = default_unless_included(display_as_settle, config.DISPLAY_TRANSACTIONS_AS_SETTLE_DEFAULT)
+    summary_only = default_unless_included(summary_only, config.SHOW_TRANSACTIONS_SUMMARY_ONLY_DEFAULT)
     
     start_date, end_date = sanitize_dates(start_date, end_date)
     user_id = None if user is None else str(user.id)
@@ -272,12 +275,20 @@ async def handle_get_transactions(
     if transaction_type and transaction_type.strip().lower() == "cashout":
         display_as_settle = False
 
+    if summary_only:
+        await send_transaction_summary(
+            interaction, start_date, end_date, user_id, transaction_type,
+            show_conversion_currency, show_emoji_visuals, display_as_settle
+        )
+        return
+
     try:
-        data = api_client.get_transactions(
+        data = await api_client.get_transactions(
             start_date=start_date,
             end_date=end_date,
             user_id=user_id,
-            transaction_type=transaction_type
+            transaction_type=transaction_type,
+            limit=config.TRANSACTIONS_PAGE_SIZE
         )
     except Exception as e:
         await handle_error(interaction, e, title=f"Error Fetching {config.CURRENCY_NAME} Transactions")
@@ -297,13 +308,12 @@ async def handle_get_transactions(
     total_owed = Fraction(0)
     total_settled = Fraction(0)
     grouped = defaultdict(list)
-    transactions = data["transactions"]
-    for tx in transactions:
+    for tx in data["transactions"]:
         date_str, tx_type, amount, line = await process_transaction(
-        tx, config, interaction,
-        show_conversion_currency, show_emoji_visuals,
-        use_unicode, display_as_settle
-    )
+            tx, config, interaction,
+            show_conversion_currency, show_emoji_visuals,
+            use_unicode, display_as_settle
+        )
 
         if tx_type == "Owe":
             total_owed += amount
@@ -312,6 +322,23 @@ async def handle_get_transactions(
 
         grouped[date_str].append(line)
 
+    # Only the first page is listed, but the totals should still cover the whole period
+    more_transactions = bool(data.get("next_cursor"))
+    if more_transactions:
+        try:
+            summary = await api_client.get_transaction_summary(
+                start_date=data["start_date"],
+                end_date=data["end_date"],
+                user_id=user_id,
+                transaction_type=transaction_type
+            )
+        except Exception as e:
+            await handle_error(interaction, e, title=f"Error Fetching {config.CURRENCY_NAME} Transactions")
+            return
+        totals = summary["totals"]
+        total_owed = Fraction(totals.get("owe", {}).get("amount", "0"))
+        total_settled = Fraction(totals.get("settle", {}).get("amount", "0"))
+
     lines = []
 
     for date, txs in sorted(grouped.items()):
@@ -319,19 +346,95 @@ async def handle_get_transactions(
         lines.extend(txs)
         lines.append("")
 
+    if more_transactions:
+        lines.append(
+            f"*Showing the first {len(data['transactions'])} transactions. "
+            f"Use a shorter date range or summary_only to see the rest.*"
+        )
+        lines.append("")
+
+    lines.extend(transaction_total_lines(
+        total_owed, total_settled, use_unicode,
+        show_conversion_currency, show_emoji_visuals, display_as_settle
+    ))
+    await send_messages.send_info_message(
+        interaction,
+        title=f"{config.CURRENCY_NAME} Transactions from {start_date} until {end_date}",
+        description="\n".join(lines)
+    )
+
+def format_api_date(date_str: str) -> str:
+    """Format a YYYY-MM-DD date from the API, which format_date would read day first."""
+    return datetime.strptime(date_str, "%Y-%m-%d").strftime(config.DATE_FORMAT)
+
+def transaction_total_lines(
+    total_owed: Fraction,
+    total_settled: Fraction,
+    use_unicode: bool,
+    show_conversion_currency: bool,
+    show_emoji_visuals: bool,
+    display_as_settle: bool
+) -> list[str]:
+    """The closing total and net difference lines of a transactions message."""
     owed_str = format_overall_debts(total_owed, show_conversion_currency, show_emoji_visuals, use_unicode)
     settled_str = format_overall_debts(total_settled, show_conversion_currency, show_emoji_visuals, use_unicode)
 
-    lines.append(f"**Total Owed In Period: {owed_str}**")
-    lines.append(f"**Total {'Settled' if display_as_settle else 'Cashed Out'} In Period: {settled_str}**")
-    lines.append(find_net_difference(total_owed,
-                                     total_settled,
-                                     use_unicode,
-                                     show_conversion_currency,
-                                     show_emoji_visuals,
-                                     False))
+    return [
+        f"**Total Owed In Period: {owed_str}**",
+        f"**Total {'Settled' if display_as_settle else 'Cashed Out'} In Period: {settled_str}**",
+        find_net_difference(total_owed,
+                            total_settled,
+                            use_unicode,
+                            show_conversion_currency,
+                            show_emoji_visuals,
+                            False)
+    ]
+
+async def send_transaction_summary(
+    interaction: discord.Interaction,
+    start_date: str,
+    end_date: str,
+    user_id: str,
+    transaction_type: str,
+    show_conversion_currency: bool,
+    show_emoji_visuals: bool,
+    display_as_settle: bool
+):
+    """Display daily transaction totals from the API's summary rather than every transaction."""
+    try:
+        data = await api_client.get_transaction_summary(
+            start_date=start_date,
+            end_date=end_date,
+            user_id=user_id,
+            transaction_type=transaction_type
+        )
+    except Exception as e:
+        await handle_error(interaction, e, title=f"Error Fetching {config.CURRENCY_NAME} Transactions")
+        return
+
+    use_unicode = await fetch_unicode_preference(interaction, str(interaction.user.id))
+    settle_label = "Settled" if display_as_settle else "Cashed Out"
+
+    lines = []
+    for day, totals in data["buckets"].items():
+        parts = []
+        for tx_type, label in (("owe", "Owed"), ("settle", settle_label)):
+            if tx_type in totals:
+                amount = format_overall_debts(
+                    Fraction(totals[tx_type]["amount"]), show_conversion_currency, show_emoji_visuals, use_unicode, False
+                )
+                parts.append(f"{label} {amount} ({totals[tx_type]['count']})")
+        lines.append(f"**{format_api_date(day)}**: {', '.join(parts)}")
+    lines.append("")
+
+    totals = data["totals"]
+    lines.extend(transaction_total_lines(
+        Fraction(totals.get("owe", {}).get("amount", "0")),
+        Fraction(totals.get("settle", {}).get("amount", "0")),
+        use_unicode, show_conversion_currency, show_emoji_visuals, display_as_settle
+    ))
     await send_messages.send_info_message(
         interaction,
-        title=f"{config.CURRENCY_NAME} Transactions from {start_date} until {end_date}",
+        title=f"{config.CURRENCY_NAME} Transaction Summary from {format_api_date(data['start_date'])} until {format_api_date(data['end_date'])}",
         description="\n".join(lines)
     )
\ No newline at end of file
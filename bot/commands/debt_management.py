@@ -5,6 +5,7 @@ from bot.utilities.error_handling import handle_error
 from bot.utilities.formatter import currency_formatter
 import bot.utilities.send_messages as send_messages
 from bot.utilities.user_preferences import fetch_unicode_preference
+from bot.utilities.user_utils import mentioned_user_ids
 from bot.utilities.debt_processor import find_net_difference
 from models.owe_request import OweRequest
 from models.settle_request import SettleRequest
@@ -33,14 +34,14 @@ async def handle_owe(interaction: discord.Interaction, user: discord.User, amoun
             reason=reason
         )
         payload = owe_request.model_dump()
-        data = api_client.add_debt(payload)
+        data = await api_client.add_debt(payload)
     except Exception as e:
         await handle_error(interaction, e, title="Error Adding Debt")
         return
 
     use_unicode = await fetch_unicode_preference(interaction, interaction.user.id)
 
-    debts_remaining = api_client.debts_with_user(debtor, creditor)
+    debts_remaining = await api_client.debts_with_user(debtor, creditor)
     total_owed_by_you = Fraction(debts_remaining['total_owed_by_you'])
     formatted_reason = f" for: *'{data['reason']}'*" if data['reason'] else ""
 
@@ -53,6 +54,47 @@ async def handle_owe(interaction: discord.Interaction, user: discord.User, amoun
             description=message
         )
 
+async def handle_split(interaction: discord.Interaction, users: str, amount: str, *, reason: str = ""):
+    creditor = interaction.user.id
+    debtors = mentioned_user_ids(users)
+
+    # Defer the response to avoid timeout
+    await interaction.response.defer()
+
+    if not debtors:
+        await handle_error(interaction, error_code="NO_USERS_MENTIONED")
+        return
+    elif creditor in debtors:
+        await handle_error(interaction, error_code="CANNOT_OWE_SELF")
+        return
+    elif interaction.client.user.id in debtors:
+        await handle_error(interaction, error_code="CANNOT_OWE_BOT")
+        return
+
+    # Add every debt in one call, so either everyone owes or nobody does
+    try:
+        payload = {
+            "debts": [
+                OweRequest(debtor=debtor, creditor=creditor, amount=amount, reason=reason).model_dump()
+                for debtor in debtors
+            ]
+        }
+        data = await api_client.add_debts_batch(payload)
+    except Exception as e:
+        await handle_error(interaction, e, title="Error Splitting Debt")
+        return
+
+    use_unicode = await fetch_unicode_preference(interaction, interaction.user.id)
+
+    each_amount = data["results"][0]["amount"]
+    mentions = ", ".join(f"<@{debtor}>" for debtor in debtors)
+    formatted_reason = f" for: *'{reason}'*" if reason else ""
+    await send_messages.send_success_message(
+        interaction,
+        title=f"{currency_formatter(each_amount, False)} Each Split Between {len(debtors)} - {config.CURRENCY_NAME} Economy Thriving",
+        description=f"**{mentions} each owe {interaction.user.mention} {currency_formatter(each_amount, use_unicode)}**{formatted_reason}"
+    )
+
 async def handle_settle(interaction: discord.Interaction, user: discord.User, amount: str, reason: str = ""):
     debtor = interaction.user.id
     creditor = user.id
@@ -79,7 +121,7 @@ async def handle_settle(interaction: discord.Interaction, user: discord.User, am
         payload = settle_request.model_dump()
 
         # Send the request to the API
-        data = api_client.settle_debt(payload)
+        data = await api_client.settle_debt(payload)
 
     except Exception as e:
         await handle_error(interaction, e, title="Error Settling Debt")
@@ -120,7 +162,7 @@ async def handle_cashout(interaction: discord.Interaction, user: discord.User, a
         payload = settle_request.model_dump()
 
         # Send the request to the API
-        data = api_client.settle_debt(payload)
+        data = await api_client.settle_debt(payload)
 
     except Exception as e:
         await handle_error(interaction, e, title="Error Cashing Out Debt")
@@ -3,6 +3,7 @@ import discord
 from models.set_unicode_preference_request import SetUnicodePreferenceRequest
 from bot.utilities.error_handling import handle_error
 import bot.utilities.send_messages as send_messages
+from bot.utilities.user_preferences import remember_unicode_preference
 from bot.utilities.user_utils import get_display_name
 
 async def handle_set_unicode_preference(interaction: discord.Interaction, use_unicode: bool):
@@ -15,11 +16,13 @@ async def handle_set_unicode_preference(interaction: discord.Interaction, use_un
         )
         payload = set_unicode_preference_request.model_dump()
 
-        data = api_client.set_unicode_preference(user_id, payload)
+        data = await api_client.set_unicode_preference(user_id, payload)
     except Exception as e:
         await handle_error(interaction, e, title="Error Updating Preference")
         return
 
+    remember_unicode_preference(user_id, use_unicode)
+
     await send_messages.send_success_message(
         interaction,
         title="Preference Updated",
@@ -28,7 +31,7 @@ async def handle_set_unicode_preference(interaction: discord.Interaction, use_un
 async def handle_refresh_name(interaction: discord.Interaction):
     await interaction.response.defer()
     
-    new_name = await get_display_name(interaction.client,interaction.user.id, True)
+    new_name = await get_display_name(interaction.client, interaction.user.id, True, interaction.guild)
     await send_messages.send_success_message(
         interaction,
         title=f"Thanks {new_name} - Name Updated!",
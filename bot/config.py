@@ -9,6 +9,18 @@ import bot.configuration.constants as constants
 # API Connection
 API_URL: str = os.getenv("API_URL", "http://api:8000")
 API_TIMEOUT: int = 10
+API_ETAG_CACHE_SIZE: int = 256 # How many read responses to keep for revalidating with the API's ETags
+API_MAX_CONNECTIONS: int = 20 # How many requests to the API can be in flight at once over the shared connection pool
+API_COALESCE_READS: bool = True # Share one API request between identical reads made while it is in flight
+
+# Caches
+UNICODE_PREFERENCE_CACHE_SIZE: int = 1024 # How many users' Unicode preferences to keep
+UNICODE_PREFERENCE_CACHE_TTL: int = 3600 # Seconds before a cached preference is fetched from the API again
+UNICODE_PREFERENCE_REFRESH_AFTER: int = 600 # Seconds before a cached preference is refreshed in the background, 0 to never
+DISPLAY_NAME_CACHE_SIZE: int = 2048 # How many users' display names to keep
+DISPLAY_NAME_CACHE_TTL: int = 21600 # Seconds before a cached display name is looked up again
+DISPLAY_NAME_LOOKUP_CONCURRENCY: int = 10 # How many display names to look up from Discord at once
+STATS_REPORT_INTERVAL: int = 3600 # Seconds between printing the API read counters, 0 to never
 
 # Discord Constants
 DISCORD_EMBED_TITLE_LIMIT = 256
@@ -48,6 +60,7 @@ CURRENCY_DISPLAY_EMOJI: str = "🍺"
 DATE_FORMAT: str = "%d-%m-%Y" #add %A for day of the week
 TIME_FORMAT: str = "%H:%M" #24 hour time, use "%I:%M %p" instead for 12 hour time"
 DISPLAY_TRANSACTIONS_AS_SETTLE_DEFAULT: bool = False #if false, will display as 'cashout' instead
+SHOW_TRANSACTIONS_SUMMARY_ONLY_DEFAULT: bool = False #if true, only daily totals are shown instead of every transaction
 
 # Display - Conversion Currency
 CONVERSION_CURRENCY: str = "£"
@@ -62,6 +75,8 @@ MAXIMUM_PER_DEBT: int = 10
 SMALLEST_UNIT: Fraction = Fraction(1, 6)
 MAXIMUM_DEBT_CHARACTER_LIMIT: int = 200
 TRANSACTIONS_DEFAULT_TIME_PERIOD: int = 30
+# The most transactions to list in one message; the totals still cover every transaction in the period
+TRANSACTIONS_PAGE_SIZE: int = 200
 
 # Reactions
 REACT_TO_MESSAGES_MENTIONING_CURRENCY: bool = True
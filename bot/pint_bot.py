@@ -1,10 +1,12 @@
 """Module for defining the main bot functionality."""
+import asyncio
 from os import environ
 import random
 import time
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
+from bot import api_client
 import bot.config as config
 from bot.setup.register_commands import register_commands
 from bot.setup.update_settings_from_api import update_settings_from_api
@@ -12,7 +14,36 @@ from bot.setup.update_settings_from_api import update_settings_from_api
 intents = discord.Intents.default()
 intents.message_content = True
 
-bot = commands.Bot("!", intents=intents)
+class PintBot(commands.Bot):
+    """The bot, holding one connection pool to the API for as long as it runs."""
+
+    _stats_task = None
+
+    async def setup_hook(self):
+        await api_client.open_session()
+        if config.STATS_REPORT_INTERVAL:
+            self._stats_task = asyncio.create_task(self._report_stats_periodically())
+
+    async def close(self):
+        if self._stats_task is not None:
+            self._stats_task.cancel()
+        await super().close()
+        await api_client.close_session()
+
+    async def _report_stats_periodically(self):
+        while True:
+            await asyncio.sleep(config.STATS_REPORT_INTERVAL)
+            print(stats_report())
+
+def stats_report() -> str:
+    """One line with the API read counters, for the bot's log."""
+    reads = api_client.read_stats()
+    return (
+        f"API reads: {reads['upstream']} sent, {reads['coalesced']} coalesced "
+        f"({reads['coalesced_rate']:.0%}), {reads['in_flight']} in flight"
+    )
+
+bot = PintBot("!", intents=intents)
 
 @bot.event
 async def on_ready():
@@ -3,7 +3,7 @@ import discord
 from discord import app_commands
 from bot.setup.command import Command
 from bot.commands.debt_display import handle_debts_with_user, handle_get_all_debts, handle_get_debts, handle_get_transactions
-from bot.commands.debt_management import handle_owe, handle_settle, handle_cashout
+from bot.commands.debt_management import handle_owe, handle_settle, handle_cashout, handle_split
 from bot.commands.games import handle_roll
 from bot.commands.support import handle_help_command, handle_repeat_that_command
 from bot.commands.bot_settings import handle_settings
@@ -63,6 +63,13 @@ def define_command_details() -> None:
         category=config.DEBT_TRANSACTIONS_COMMAND_CATEGORY
     )
 
+    Command(
+        key="split",
+        name="split",
+        description=f"Charge a number of {config.CURRENCY_NAME_PLURAL} to each of several people at once.",
+        category=config.DEBT_TRANSACTIONS_COMMAND_CATEGORY
+    )
+
     Command(
         key="settle",
         name="settle",
@@ -141,6 +148,18 @@ def register_commands(bot):
     async def owe(interaction: discord.Interaction, user: discord.User, amount: str, *, reason: str = ""):
         await handle_owe(interaction, user, amount, reason=reason)
 
+    @bot.tree.command(
+        name=Command.get("split").name,
+        description=Command.get("split").description
+    )
+    @app_commands.describe(
+        users="Mention everyone who owes you, e.g. @someone @someone_else",
+        amount=f"How many {config.CURRENCY_NAME_PLURAL} each person owes",
+        reason="Why they owe you (optional)"
+    )
+    async def split(interaction: discord.Interaction, users: str, amount: str, *, reason: str = ""):
+        await handle_split(interaction, users, amount, reason=reason)
+
     @bot.tree.command(
         name=Command.get("get_debts").name,
         description=Command.get("get_debts").description
@@ -247,6 +266,10 @@ def register_commands(bot):
         display_as_settle=(
                 f"Display as 'Settles' rather than 'Cashouts'"
                 f"(Default: {config.DISPLAY_TRANSACTIONS_AS_SETTLE_DEFAULT})"
+        ),
+        summary_only=(
+                f"Only show the totals for each day "
+                f"(Default: {config.SHOW_TRANSACTIONS_SUMMARY_ONLY_DEFAULT})"
         )
     )
     async def transactions_command(
@@ -257,9 +280,10 @@ def register_commands(bot):
         transaction_type: str = None,
         show_conversion_currency: bool = None,
         show_emoji_visuals: bool = None,
-        display_as_settle: bool = None
+        display_as_settle: bool = None,
+        summary_only: bool = None
     ):
-        await handle_get_transactions(interaction, start_date, end_date, user_id, transaction_type, show_conversion_currency, show_emoji_visuals, display_as_settle)
+        await handle_get_transactions(interaction, start_date, end_date, user_id, transaction_type, show_conversion_currency, show_emoji_visuals, display_as_settle, summary_only)
 
                                     
     @bot.tree.command(
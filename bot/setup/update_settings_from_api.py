@@ -4,7 +4,7 @@ from fractions import Fraction
 
 async def update_settings_from_api():
     try:
-        settings = api_client.get_settings()
+        settings = await api_client.get_settings()
         config.MAXIMUM_DEBT_CHARACTER_LIMIT = int(settings.get("MAXIMUM_DEBT_CHARACTER_LIMIT", config.MAXIMUM_DEBT_CHARACTER_LIMIT))
         config.MAXIMUM_PER_DEBT = int(settings.get("MAXIMUM_PER_DEBT", config.MAXIMUM_PER_DEBT))
         config.SMALLEST_UNIT = Fraction(settings.get("SMALLEST_UNIT", config.SMALLEST_UNIT))
@@ -0,0 +1,68 @@
+"""A small in-memory cache for values fetched from the API or Discord."""
+from collections import OrderedDict
+import time
+from typing import Any, Callable, Hashable, Optional
+
+class TTLCache:
+    """A size-capped LRU cache whose entries expire `ttl` seconds after they were stored."""
+
+    def __init__(self, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+        # key -> (value, time stored)
+        self._entries: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()
+
+    def get_with_age(self, key: Hashable) -> Optional[tuple[Any, float]]:
+        """The cached value and how many seconds ago it was stored, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, stored_at = entry
+        age = self._clock() - stored_at
+        if age >= self.ttl:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value, age
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """The cached value, or the default if missing or expired."""
+        entry = self.get_with_age(key)
+        return default if entry is None else entry[0]
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if over the size cap."""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (value, self._clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Drop a cached value if there is one."""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every cached value."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Hit, miss and size counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+        }
@@ -1,8 +1,10 @@
 """Error handling utilities for the bot."""
+import asyncio
+import aiohttp
 import discord
 from pydantic import ValidationError
-import requests
 import bot.config as config
+from bot.api_client import APIResponseError
 from bot.utilities.error_messages import ERROR_MESSAGES
 import bot.utilities.send_messages as send_messages
 
@@ -24,11 +26,11 @@ def get_error_message(error_code: str):
         "description": format_error_message(error["description"])
     }
 
-def parse_api_error(e: requests.exceptions.HTTPError):
+def parse_api_error(e: APIResponseError):
     """Parses the API error response and returns a formatted error message."""
     try:
         # Extract the "detail" field from the response
-        error_details = e.response.json().get("detail", "UNKNOWN_ERROR")
+        error_details = e.body.get("detail", "UNKNOWN_ERROR")
         if isinstance(error_details, str):
             error_code = error_details.split(":")[0]
 
@@ -44,11 +46,11 @@ async def handle_error(interaction: discord.Interaction, error=None, error_code:
     """Handles errors and sends appropriate error messages."""
     if error_code:
         error_message = get_error_message(error_code)
-    elif isinstance(error, requests.exceptions.HTTPError):
+    elif isinstance(error, APIResponseError):
         error_message = parse_api_error(error)
     elif isinstance(error, ValidationError):
         error_message = get_error_message("VALIDATION_ERROR")
-    elif isinstance(error, requests.exceptions.RequestException):
+    elif isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError)):
         error_message = get_error_message("REQUEST_ERROR")
     else:
         error_message = get_error_message("UNKNOWN_ERROR")
@@ -8,6 +8,10 @@ ERROR_MESSAGES = {
         "title": "Cannot Owe Bot",
         "description": "You can't owe a bot {CURRENCY_PLURAL}. That's just not how the {CURRENCY} economy works. Bots are here to help you free of charge."
     },
+    "NO_USERS_MENTIONED": {
+        "title": "Nobody To Split With",
+        "description": "Mention everyone who should owe you {CURRENCY_PLURAL}, e.g. @someone @someone_else."
+    },
     "CANNOT_SETTLE_SELF": {
         "title": "Illegal {CURRENCY} Activities Detected",
         "description": "You can't have {CURRENCY} debts with yourself. You have the power to buy yourself a {CURRENCY} without the need for this bot."
@@ -30,8 +30,8 @@ async def process_transaction(tx, config, interaction, show_conversion_currency,
     fraction_amount = Fraction(tx['amount'])
 
     amount = format_overall_debts(fraction_amount, show_conversion_currency, show_emoji_visuals, use_unicode, False)
-    debtor = await get_display_name(interaction.client, tx['debtor'])
-    creditor = await get_display_name(interaction.client, tx['creditor'])
+    debtor = await get_display_name(interaction.client, tx['debtor'], guild=interaction.guild)
+    creditor = await get_display_name(interaction.client, tx['creditor'], guild=interaction.guild)
 
     line = build_transaction_line(tx, time_str, amount, debtor, creditor, tx_type, display_as_settle)
     return date_str, tx_type, fraction_amount, line
\ No newline at end of file
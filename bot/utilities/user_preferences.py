@@ -1,10 +1,43 @@
+import asyncio
 from bot import api_client
+import bot.config as config
+from bot.utilities.cache import TTLCache
 from bot.utilities.error_handling import handle_error
 
+# User ID -> whether they want Unicode fractions
+_unicode_preferences = TTLCache(config.UNICODE_PREFERENCE_CACHE_SIZE, config.UNICODE_PREFERENCE_CACHE_TTL)
+# Background refreshes in progress, by user ID
+_refreshing: dict[str, asyncio.Task] = {}
+
 async def fetch_unicode_preference(interaction, user_id) -> bool:
-    """Fetch the user's Unicode preference from the API."""
+    """Fetch the user's Unicode preference, from the cache if it was fetched or set recently."""
+    key = str(user_id)
+    cached = _unicode_preferences.get_with_age(key)
+    if cached is not None:
+        use_unicode, age = cached
+        refresh_after = config.UNICODE_PREFERENCE_REFRESH_AFTER
+        if refresh_after and age >= refresh_after and key not in _refreshing:
+            # Answer from the cache now and fetch a fresh value for next time
+            _refreshing[key] = asyncio.create_task(_refresh_unicode_preference(key))
+        return use_unicode
+
     try:
-        return api_client.get_unicode_preference(user_id)
+        use_unicode = await api_client.get_unicode_preference(key)
     except Exception as e:
         await handle_error(interaction, e, title="Error Fetching Unicode Preference")
         return False
+    _unicode_preferences.set(key, use_unicode)
+    return use_unicode
+
+async def _refresh_unicode_preference(user_id: str):
+    try:
+        _unicode_preferences.set(user_id, await api_client.get_unicode_preference(user_id))
+    except Exception as e:
+        # The cached value stays until it expires, when the next command fetches it again
+        print(f"Failed to refresh Unicode preference for {user_id}: {e}")
+    finally:
+        _refreshing.pop(user_id, None)
+
+def remember_unicode_preference(user_id, use_unicode: bool):
+    """Update the cached preference after it has been saved to the API."""
+    _unicode_preferences.set(str(user_id), use_unicode)
@@ -1,14 +1,67 @@
+import asyncio
+import re
+from typing import Iterable, Optional
 import discord
+import bot.config as config
+from bot.utilities.cache import TTLCache
 
-_user_display_name_cache = {}
+# (guild ID or None, user ID) -> display name; members can have a different nickname in each server
+_display_names = TTLCache(config.DISPLAY_NAME_CACHE_SIZE, config.DISPLAY_NAME_CACHE_TTL)
+_MENTION_PATTERN = re.compile(r"<@!?(\d+)>")
 
-async def get_display_name(client: discord.Client, user_id: str, force_refresh: bool = False) -> str:
-    if not force_refresh and user_id in _user_display_name_cache:
-        return _user_display_name_cache[user_id]
-    try:
-        user = await client.fetch_user(int(user_id))
+def mentioned_user_ids(text: str) -> list[int]:
+    """The IDs of every user mentioned in the text, in order and without repeats."""
+    return list(dict.fromkeys(int(user_id) for user_id in _MENTION_PATTERN.findall(text)))
+
+async def get_display_name(client: discord.Client, user_id: str, force_refresh: bool = False, guild: Optional[discord.Guild] = None) -> str:
+    user_id = str(user_id)
+    if not force_refresh:
+        display_name = _display_names.get(_cache_key(user_id, guild))
+        if display_name is not None:
+            return display_name
+    return await _resolve_display_name(client, user_id, guild)
+
+async def get_display_names(client: discord.Client, user_ids: Iterable[str], guild: Optional[discord.Guild] = None) -> dict[str, str]:
+    """Display names for many users, keyed by user ID as a string and in the order given.
+
+    Names that aren't cached are looked up concurrently, at most
+    DISPLAY_NAME_LOOKUP_CONCURRENCY at a time.
+    """
+    user_ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+    names = {}
+    missing = []
+    for user_id in user_ids:
+        display_name = _display_names.get(_cache_key(user_id, guild))
+        if display_name is None:
+            missing.append(user_id)
+        else:
+            names[user_id] = display_name
+
+    if missing:
+        limit = asyncio.Semaphore(config.DISPLAY_NAME_LOOKUP_CONCURRENCY)
+
+        async def resolve(user_id):
+            async with limit:
+                return await _resolve_display_name(client, user_id, guild)
+
+        names.update(zip(missing, await asyncio.gather(*(resolve(user_id) for user_id in missing))))
+    return {user_id: names[user_id] for user_id in user_ids}
+
+async def _resolve_display_name(client: discord.Client, user_id: str, guild: Optional[discord.Guild]) -> str:
+    # The gateway keeps members and users up to date, so only ask Discord's API when neither has them
+    user = guild.get_member(int(user_id)) if guild is not None else None
+    if user is None:
+        user = client.get_user(int(user_id))
+    if user is not None:
         display_name = user.display_name
-    except discord.NotFound:
-        display_name = f"Unknown User ({user_id})"
-    _user_display_name_cache[user_id] = display_name
-    return display_name
\ No newline at end of file
+    else:
+        try:
+            user = await client.fetch_user(int(user_id))
+            display_name = user.display_name
+        except discord.NotFound:
+            display_name = f"Unknown User ({user_id})"
+    _display_names.set(_cache_key(user_id, guild), display_name)
+    return display_name
+
+def _cache_key(user_id: str, guild: Optional[discord.Guild]) -> tuple[Optional[int], str]:
+    return (guild.id if guild is not None else None, user_id)
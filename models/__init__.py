@@ -1,6 +1,7 @@
 from .debt_entry import DebtEntry
 from .debts_data import DebtsData
 from .owe_request import OweRequest
+from .owe_batch_request import OweBatchRequest
 from .set_unicode_preference_request import SetUnicodePreferenceRequest
 from .settle_request import SettleRequest
 from .user_debts import UserDebts
@@ -14,6 +15,7 @@ __all__ = [
     "DebtEntry",
     "DebtsData",
     "OweRequest",
+    "OweBatchRequest",
     "SetUnicodePreferenceRequest",
     "SettleRequest",
     "UserDebts",
@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+from .owe_request import OweRequest
+
+class OweBatchRequest(BaseModel):
+    """Represents a request to add several debts at once, all or none of which are added."""
+    debts: list[OweRequest] = Field(min_length=1)
@@ -82,6 +82,7 @@ class DummyInteraction:
     def __init__(self, user, bot):
         self.user = user
         self.client = bot
+        self.guild = None
         self.response = DummyResponse()
         self.followup = DummyFollowup()
         self.send_info_message_calls = []
@@ -108,6 +109,9 @@ class DummyBot:
     def id(self):
         return self.user.id
 
+    def get_user(self, user_id):
+        return None
+
     async def fetch_user(self, user_id):
         return DummyUser(user_id)
 
@@ -120,7 +124,7 @@ class FakeAPI:
         self.shared = shared
         self.calls = {}
 
-    def add_debt(self, payload):
+    async def add_debt(self, payload):
         self.calls['add_debt'] = payload
         return {
             'amount': payload['amount'],
@@ -128,23 +132,36 @@ class FakeAPI:
             'timestamp': '2025-01-01T00:00:00Z'
         }
 
-    def get_debts(self, user_id):
+    async def add_debts_batch(self, payload):
+        self.calls['add_debts_batch'] = payload
+        return {
+            'results': [
+                {'index': index, 'status': 'ok', **debt, 'timestamp': '2025-01-01T00:00:00Z'}
+                for index, debt in enumerate(payload['debts'])
+            ]
+        }
+
+    async def get_debts(self, user_id):
         return self.shared.debts_response
 
-    def get_all_debts(self):
+    async def get_all_debts(self):
         return self.shared.all_debts_response
 
-    def debts_with_user(self, user_id1, user_id2):
+    async def debts_with_user(self, user_id1, user_id2):
         return self.shared.debts_response
     
-    def get_transactions(self, *args, **kwargs):
+    async def get_transactions(self, *args, **kwargs):
         return self.shared.transactions_response
 
-    def settle_debt(self, payload):
+    async def get_transaction_summary(self, *args, **kwargs):
+        self.calls['get_transaction_summary'] = kwargs
+        return self.shared.transaction_summary_response
+
+    async def settle_debt(self, payload):
         self.calls['settle_debt'] = payload
         return {'settled_amount': payload['amount'], 'remaining_amount': '0'}
 
-    def set_unicode_preference(self, user_id, payload):
+    async def set_unicode_preference(self, user_id, payload):
         self.calls['set_unicode_preference'] = {
             'user_id': user_id,
             'use_unicode': payload['use_unicode']
@@ -162,6 +179,7 @@ def shared():
     shared.debts_response = {'message': 'No debts'}
     shared.all_debts_response = {}
     shared.transactions_response = {}
+    shared.transaction_summary_response = {}
     shared.fake_api = FakeAPI(shared)
     return shared
 
@@ -178,6 +196,8 @@ def mock_bot_dependencies(monkeypatch, shared):
         interaction.error = {'args': args, 'kwargs': kwargs}
 
     monkeypatch.setattr(user_preferences, 'fetch_unicode_preference', fake_fetch_unicode)
+    monkeypatch.setattr(debt_management, 'fetch_unicode_preference', fake_fetch_unicode)
+    monkeypatch.setattr(debt_display, 'fetch_unicode_preference', fake_fetch_unicode)
     monkeypatch.setattr(debt_management, 'handle_error', fake_handle_error)
     monkeypatch.setattr(debt_display, 'handle_error', fake_handle_error)
     monkeypatch.setattr(debt_display, 'currency_formatter', lambda amount, use_unicode: str(amount))
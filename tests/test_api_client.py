@@ -0,0 +1,200 @@
+import asyncio
+import aiohttp
+import pytest
+from bot import api_client
+
+class FakeResponse:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+@pytest.fixture
+def fake_request(monkeypatch):
+    api_client._etag_cache.clear()
+    calls = []
+    responses = []
+
+    async def request(method, path, params=None, payload=None, headers=None):
+        calls.append({"method": method, "path": path, "params": params, "payload": payload, "headers": headers})
+        response = responses.pop(0)
+        return response.status_code, response.headers, response.text
+
+    monkeypatch.setattr(api_client, "_request", request)
+    yield calls, responses
+    api_client._etag_cache.clear()
+
+class TestEtagRevalidation:
+    @pytest.mark.asyncio
+    async def test_not_modified_reuses_cached_body(self, fake_request):
+        calls, responses = fake_request
+        responses.append(FakeResponse(200, '{"total_in_circulation": "3"}', {"ETag": '"a-1"'}))
+        responses.append(FakeResponse(304, headers={"ETag": '"a-1"'}))
+
+        first = await api_client.get_all_debts()
+        first.pop("total_in_circulation")
+        second = await api_client.get_all_debts()
+
+        assert calls[0]["headers"] == {}
+        assert calls[1]["headers"] == {"If-None-Match": '"a-1"'}
+        assert second == {"total_in_circulation": "3"}
+
+    @pytest.mark.asyncio
+    async def test_changed_response_replaces_cache(self, fake_request):
+        calls, responses = fake_request
+        responses.append(FakeResponse(200, '{"message": "none"}', {"ETag": '"a-1"'}))
+        responses.append(FakeResponse(200, '{"owed_by_you": {}}', {"ETag": '"a-2"'}))
+        responses.append(FakeResponse(304))
+
+        await api_client.get_debts("1")
+        assert await api_client.get_debts("1") == {"owed_by_you": {}}
+        assert await api_client.get_debts("1") == {"owed_by_you": {}}
+        assert calls[2]["headers"] == {"If-None-Match": '"a-2"'}
+
+    @pytest.mark.asyncio
+    async def test_cache_is_keyed_by_params(self, fake_request):
+        calls, responses = fake_request
+        responses.append(FakeResponse(200, '{"a": 1}', {"ETag": '"a-1"'}))
+        responses.append(FakeResponse(200, '{"b": 2}', {"ETag": '"a-1"'}))
+
+        await api_client.debts_with_user("1", "2")
+        await api_client.debts_with_user("1", "3")
+        assert calls[1]["headers"] == {}
+
+class TestErrors:
+    @pytest.mark.asyncio
+    async def test_error_status_raises_with_detail(self, fake_request):
+        _, responses = fake_request
+        responses.append(FakeResponse(400, '{"detail": "EXCEEDS_MAXIMUM"}'))
+
+        with pytest.raises(api_client.APIResponseError) as error:
+            await api_client.add_debt({"debtor": 1, "creditor": 2, "amount": "11"})
+        assert error.value.status == 400
+        assert error.value.body == {"detail": "EXCEEDS_MAXIMUM"}
+
+    @pytest.mark.asyncio
+    async def test_error_without_json_body(self, fake_request):
+        _, responses = fake_request
+        responses.append(FakeResponse(502, "Bad Gateway"))
+
+        with pytest.raises(api_client.APIResponseError) as error:
+            await api_client.get_all_debts()
+        assert error.value.body is None
+        assert not api_client._etag_cache
+
+class TestSession:
+    @pytest.mark.asyncio
+    async def test_requests_run_concurrently_over_one_session(self, monkeypatch):
+        """Slow responses overlap instead of queueing behind each other."""
+        in_flight = 0
+        most_in_flight = 0
+
+        class FakeContext:
+            async def __aenter__(self):
+                nonlocal in_flight, most_in_flight
+                in_flight += 1
+                most_in_flight = max(most_in_flight, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return self
+            async def __aexit__(self, *args):
+                return False
+            status = 200
+            headers = {}
+            async def text(self):
+                return "true"
+
+        monkeypatch.setattr(aiohttp.ClientSession, "request", lambda *args, **kwargs: FakeContext())
+        await api_client.open_session()
+        session = api_client._session
+        try:
+            results = await asyncio.gather(*(api_client.get_unicode_preference(str(user_id)) for user_id in range(10)))
+        finally:
+            await api_client.close_session()
+
+        assert results == [True] * 10
+        assert most_in_flight == 10
+        assert session.closed and api_client._session is None
+
+class TestCoalescing:
+    @pytest.fixture
+    def slow_request(self, monkeypatch):
+        api_client._etag_cache.clear()
+        api_client._read_stats.update(upstream=0, coalesced=0)
+        calls = []
+        release = asyncio.Event()
+        outcome = {"status": 200, "text": '{"total_in_circulation": "3"}'}
+
+        async def request(method, path, params=None, payload=None, headers=None):
+            calls.append({"path": path, "params": params})
+            await release.wait()
+            return outcome["status"], {}, outcome["text"]
+
+        monkeypatch.setattr(api_client, "_request", request)
+        yield calls, release, outcome
+        api_client._etag_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_identical_reads_share_one_request(self, slow_request):
+        calls, release, _ = slow_request
+        reads = [asyncio.create_task(api_client.get_all_debts()) for _ in range(5)]
+        other = asyncio.create_task(api_client.debts_with_user("1", "2"))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*reads, other)
+
+        assert len(calls) == 2
+        assert all(result == {"total_in_circulation": "3"} for result in results)
+        # Every caller gets its own copy
+        results[0]["total_in_circulation"] = "changed"
+        assert results[1]["total_in_circulation"] == "3"
+        assert api_client.read_stats() == {"upstream": 2, "coalesced": 4, "in_flight": 0, "coalesced_rate": 4 / 6}
+
+    @pytest.mark.asyncio
+    async def test_reads_after_completion_go_upstream(self, slow_request):
+        calls, release, _ = slow_request
+        release.set()
+        await api_client.get_all_debts()
+        await api_client.get_all_debts()
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_error_is_shared_by_every_waiter(self, slow_request):
+        calls, release, outcome = slow_request
+        outcome.update(status=500, text='{"detail": "UNKNOWN_ERROR"}')
+        reads = [asyncio.create_task(api_client.get_all_debts()) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*reads, return_exceptions=True)
+
+        assert len(calls) == 1
+        assert all(isinstance(result, api_client.APIResponseError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_the_read(self, slow_request):
+        calls, release, _ = slow_request
+        leader = asyncio.create_task(api_client.get_all_debts())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(api_client.get_all_debts())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+
+        assert await leader == {"total_in_circulation": "3"}
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_waiters_retry_when_the_shared_read_is_cancelled(self, slow_request):
+        calls, release, _ = slow_request
+        leader = asyncio.create_task(api_client.get_all_debts())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(api_client.get_all_debts())
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await waiter == {"total_in_circulation": "3"}
+        assert len(calls) == 2
@@ -0,0 +1,261 @@
+from fractions import Fraction
+import pytest
+from fastapi.testclient import TestClient
+import api.data_manager as data_manager
+import api.main as main
+from api.main import CYCLE_CANCELLATION_REASON, SIMPLIFICATION_REASON, app
+from api.storage.json_repository import JsonRepository
+from api.transaction_index import transaction_index
+from api.utilities.transaction_helpers import decode_cursor
+from models import TransactionEntry
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    monkeypatch.setattr("api.config.TRANSACTIONS_STORAGE_MODE", "jsonl")
+    monkeypatch.setattr("api.config.DEBTS_GROUP_COMMIT_WINDOW_MS", 0)
+    # Startup only builds the index when it is enabled, so drop one left by an earlier test
+    monkeypatch.setattr(transaction_index, "loaded", False)
+    repository = JsonRepository(tmp_path)
+    data_manager.set_repository(repository)
+    yield repository
+    data_manager.set_repository(None)
+
+@pytest.fixture
+def client(repository):
+    with TestClient(app) as client:
+        yield client
+
+def make_transaction(debtor, creditor, day, type="owe"):
+    return TransactionEntry(type=type, debtor=debtor, creditor=creditor, amount="1", timestamp=f"2025-01-{day:02d}T12:00:00Z")
+
+def page_through(client, **params):
+    response = client.get("/transactions", params={**params, "limit": 3}).json()
+    pages = [response["transactions"]]
+    while response["next_cursor"] is not None:
+        response = client.get("/transactions", params={"cursor": response["next_cursor"]}).json()
+        pages.append(response["transactions"])
+    return pages
+
+class TestTransactionPages:
+    @pytest.mark.parametrize("index_enabled", [True, False], ids=["index", "storage"])
+    @pytest.mark.parametrize("filters", [
+        {},
+        {"user_id": "1"},
+        {"user_id": "1", "counterparty_id": "2"},
+        {"type": "settle"},
+        {"start_date": "2025-01-05", "end_date": "2025-01-20"},
+    ], ids=["all", "user", "pair", "type", "range"])
+    def test_pages_cover_every_match_once(self, repository, monkeypatch, index_enabled, filters):
+        monkeypatch.setattr("api.config.TRANSACTIONS_INDEX_ENABLED", index_enabled)
+        # Day 3 is recorded last, out of timestamp order
+        days = [day for day in range(1, 29) if day != 3] + [3]
+        repository.append_transactions([
+            make_transaction(str(day % 3), str((day + 1) % 4), day, "settle" if day % 5 == 0 else "owe")
+            for day in days
+        ])
+        params = {"start_date": "2025-01-01", "end_date": "2025-01-31", **filters}
+
+        with TestClient(app) as client:
+            expected = client.get("/transactions", params=params).json()["transactions"]
+            pages = page_through(client, **params)
+
+        assert expected
+        assert all(len(page) == 3 for page in pages[:-1])
+        assert [transaction for page in pages for transaction in page] == expected
+
+    def test_cursor_records_where_the_page_ended(self, repository):
+        repository.append_transactions([make_transaction("1", "2", day) for day in range(1, 6)])
+        with TestClient(app) as client:
+            response = client.get("/transactions", params={"start_date": "2025-01-01", "end_date": "2025-01-31", "limit": 2}).json()
+        assert decode_cursor(response["next_cursor"])["after"] == 1
+
+    def test_invalid_cursor(self, client):
+        assert client.get("/transactions", params={"cursor": "nonsense"}).status_code == 400
+
+def ledger_state(client, repository):
+    """Everything a debt changes: the ledger, the stored and indexed history and the rollups."""
+    return {
+        "debts": client.get("/debts").json(),
+        "transactions": client.get("/transactions").json()["transactions"],
+        "summary": client.get("/transactions/summary").json(),
+        "stored": [transaction.model_dump() for transaction in repository.iter_transactions()],
+        "saved_ledger": repository.load_debts().to_dict(),
+    }
+
+class TestFailedCommits:
+    def fail_writes(self, repository, monkeypatch):
+        def failing_save(data):
+            raise OSError("disk full")
+        monkeypatch.setattr(repository, "save_debts", failing_save)
+
+    @pytest.mark.parametrize("method, path, body", [
+        ("POST", "/debts", {"debtor": 3, "creditor": 1, "amount": "2"}),
+        ("POST", "/debts/batch", {"debts": [{"debtor": 3, "creditor": 1, "amount": "2"}, {"debtor": 1, "creditor": 2, "amount": "1"}]}),
+        ("PATCH", "/debts", {"debtor": 2, "creditor": 3, "amount": "1"}),
+    ], ids=["owe", "batch", "settle"])
+    def test_change_is_undone_and_not_logged(self, client, repository, monkeypatch, method, path, body):
+        # 3 -> 1 closes the cycle 1 -> 2 -> 3 -> 1, so its cancellation is undone as well
+        monkeypatch.setattr("api.config.CANCEL_DEBT_CYCLES", True)
+        client.post("/debts", json={"debtor": 1, "creditor": 2, "amount": "3"})
+        client.post("/debts", json={"debtor": 2, "creditor": 3, "amount": "2"})
+        before = ledger_state(client, repository)
+        self.fail_writes(repository, monkeypatch)
+
+        with pytest.raises(OSError):
+            client.request(method, path, json=body)
+
+        assert ledger_state(client, repository) == before
+        assert client.get("/admin/ledger/verify").json()["ok"]
+
+    def test_simplification_is_undone_and_not_logged(self, client, repository, monkeypatch):
+        client.post("/debts", json={"debtor": 1, "creditor": 2, "amount": "1"})
+        client.post("/debts", json={"debtor": 2, "creditor": 3, "amount": "1"})
+        before = ledger_state(client, repository)
+        self.fail_writes(repository, monkeypatch)
+
+        with pytest.raises(OSError):
+            client.post("/debts/simplify")
+
+        assert ledger_state(client, repository) == before
+        assert client.get("/admin/ledger/verify").json()["ok"]
+
+class TestDebtsBatch:
+    def test_adds_every_debt_with_per_item_results(self, client, repository):
+        response = client.post("/debts/batch", json={"debts": [
+            {"debtor": 2, "creditor": 1, "amount": "1"},
+            {"debtor": 3, "creditor": 1, "amount": "1 1/2", "reason": "Round"},
+        ]})
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [{key: result[key] for key in ("index", "status", "debtor", "creditor", "amount", "reason")} for result in results] == [
+            {"index": 0, "status": "ok", "debtor": "2", "creditor": "1", "amount": "1", "reason": ""},
+            {"index": 1, "status": "ok", "debtor": "3", "creditor": "1", "amount": "3/2", "reason": "Round"},
+        ]
+        assert all(result["timestamp"] for result in results)
+
+        state = ledger_state(client, repository)
+        assert state["debts"]["1"] == {"owes": "0", "is_owed": "5/2"}
+        assert [(t["debtor"], t["amount"]) for t in state["stored"]] == [("2", "1"), ("3", "3/2")]
+        assert state["transactions"] == state["stored"]
+        assert state["summary"]["totals"] == {"owe": {"count": 2, "amount": "5/2"}}
+        assert state["saved_ledger"]["debtors"].keys() == {"2", "3"}
+        assert client.get("/admin/ledger/verify").json()["ok"]
+
+    def test_failing_debt_changes_nothing(self, client, repository):
+        client.post("/debts", json={"debtor": 2, "creditor": 1, "amount": "1"})
+        before = ledger_state(client, repository)
+
+        response = client.post("/debts/batch", json={"debts": [
+            {"debtor": 2, "creditor": 1, "amount": "1"},
+            {"debtor": 1, "creditor": 1, "amount": "1"},
+            {"debtor": 4, "creditor": 1, "amount": "11"},
+        ]})
+
+        assert response.status_code == 400
+        assert response.json() == {
+            "detail": "CANNOT_OWE_SELF: debt 1",
+            "results": [
+                {"index": 0, "status": "ok"},
+                {"index": 1, "status": "error", "detail": "CANNOT_OWE_SELF"},
+                {"index": 2, "status": "error", "detail": "EXCEEDS_MAXIMUM"},
+            ],
+        }
+        assert ledger_state(client, repository) == before
+
+    def test_rejects_oversized_and_empty_batches(self, client, monkeypatch):
+        monkeypatch.setattr("api.config.MAXIMUM_DEBTS_PER_BATCH", 2)
+        debt = {"debtor": 2, "creditor": 1, "amount": "1"}
+        assert client.post("/debts/batch", json={"debts": [debt] * 3}).status_code == 400
+        assert client.post("/debts/batch", json={"debts": []}).status_code == 422
+        assert client.get("/debts").json() == {"total_in_circulation": "0"}
+
+class TestDebtCycles:
+    def test_closing_a_cycle_cancels_its_smallest_debt(self, client, repository, monkeypatch):
+        monkeypatch.setattr("api.config.CANCEL_DEBT_CYCLES", True)
+        for debtor, creditor, amount in [(1, 2, "3"), (2, 3, "2"), (3, 1, "5")]:
+            assert client.post("/debts", json={"debtor": debtor, "creditor": creditor, "amount": amount}).status_code == 200
+
+        state = ledger_state(client, repository)
+        # 2 is taken off every debt around 1 -> 2 -> 3 -> 1, clearing 2 -> 3
+        assert state["debts"] == {
+            "1": {"owes": "1", "is_owed": "3"},
+            "2": {"owes": "0", "is_owed": "1"},
+            "3": {"owes": "3", "is_owed": "0"},
+            "total_in_circulation": "4",
+        }
+        assert [(t["type"], t["debtor"], t["creditor"], t["amount"], t["reason"]) for t in state["stored"]] == [
+            ("owe", "1", "2", "3", ""),
+            ("owe", "2", "3", "2", ""),
+            ("owe", "3", "1", "5", ""),
+            ("settle", "3", "1", "2", CYCLE_CANCELLATION_REASON),
+            ("settle", "1", "2", "2", CYCLE_CANCELLATION_REASON),
+            ("settle", "2", "3", "2", CYCLE_CANCELLATION_REASON),
+        ]
+        assert state["transactions"] == state["stored"]
+        assert state["summary"]["totals"] == {"owe": {"count": 3, "amount": "10"}, "settle": {"count": 3, "amount": "6"}}
+        assert state["saved_ledger"]["debtors"].keys() == {"1", "3"}
+        assert client.get("/admin/ledger/verify").json() == {"ok": True, "drift": []}
+
+    def test_cycles_are_kept_when_disabled(self, client, repository, monkeypatch):
+        monkeypatch.setattr("api.config.CANCEL_DEBT_CYCLES", False)
+        for debtor, creditor, amount in [(1, 2, "3"), (2, 3, "2"), (3, 1, "5")]:
+            client.post("/debts", json={"debtor": debtor, "creditor": creditor, "amount": amount})
+        assert client.get("/debts").json()["total_in_circulation"] == "10"
+        assert len(client.get("/transactions").json()["transactions"]) == 3
+
+def net_balances_of(debts):
+    return {user_id: Fraction(totals["is_owed"]) - Fraction(totals["owes"]) for user_id, totals in debts.items() if user_id != "total_in_circulation"}
+
+class TestSimplifyDebts:
+    def test_apply_keeps_balances_and_records_transactions(self, client, repository):
+        posted = [(1, 2, "5"), (2, 3, "5"), (3, 1, "2"), (4, 1, "5"), (4, 1, "5"), (4, 2, "4 1/2"), (5, 3, "1/2")]
+        for debtor, creditor, amount in posted:
+            assert client.post("/debts", json={"debtor": debtor, "creditor": creditor, "amount": amount}).status_code == 200
+        before = client.get("/debts").json()
+        preview = client.get("/debts/simplified").json()
+
+        response = client.post("/debts/simplify")
+
+        assert response.status_code == 200
+        assert response.json() == preview
+        after = client.get("/debts").json()
+        assert {user_id: balance for user_id, balance in net_balances_of(after).items() if balance} == \
+            {user_id: balance for user_id, balance in net_balances_of(before).items() if balance}
+        assert Fraction(after["total_in_circulation"]) < Fraction(before["total_in_circulation"])
+
+        recorded = client.get("/transactions").json()["transactions"][len(posted):]
+        assert recorded
+        assert {transaction["reason"] for transaction in recorded} == {SIMPLIFICATION_REASON}
+        assert {transaction["type"] for transaction in recorded} <= {"owe", "settle"}
+        # Replaying the simplification's transactions over the old balances gives the new ones
+        balances = net_balances_of(before)
+        for transaction in recorded:
+            sign = 1 if transaction["type"] == "owe" else -1
+            balances[transaction["creditor"]] += sign * Fraction(transaction["amount"])
+            balances[transaction["debtor"]] -= sign * Fraction(transaction["amount"])
+        assert balances == net_balances_of(before)
+
+        pairs = sum(len(debtor["creditors"]) for debtor in repository.load_debts().to_dict()["debtors"].values())
+        assert pairs == preview["simplified_count"]
+        assert client.get("/admin/ledger/verify").json() == {"ok": True, "drift": []}
+
+        # Already as simple as it gets
+        assert client.post("/debts/simplify").json()["current_count"] == preview["simplified_count"]
+        assert len(client.get("/transactions").json()["transactions"]) == len(posted) + len(recorded)
+
+    def test_gives_up_while_the_ledger_keeps_changing(self, client, monkeypatch):
+        client.post("/debts", json={"debtor": 1, "creditor": 2, "amount": "1"})
+        client.post("/debts", json={"debtor": 2, "creditor": 3, "amount": "1"})
+        before = client.get("/debts").json()
+        plan = main._plan_simplification
+        def plan_while_changing(ledger, debts):
+            main.debt_store.version += 1
+            return plan(ledger, debts)
+        monkeypatch.setattr(main, "_plan_simplification", plan_while_changing)
+
+        response = client.post("/debts/simplify")
+
+        assert response.status_code == 409
+        assert response.json() == {"detail": "LEDGER_CHANGED"}
+        assert client.get("/debts").json() == before
@@ -0,0 +1,51 @@
+from bot.utilities.cache import TTLCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestTTLCache:
+    def test_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = TTLCache(10, 60, clock)
+        cache.set("a", 1)
+        clock.now = 59
+        assert cache.get_with_age("a") == (1, 59)
+        clock.now = 60
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(2, 60, FakeClock())
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_set_restarts_age(self):
+        clock = FakeClock()
+        cache = TTLCache(10, 60, clock)
+        cache.set("a", 1)
+        clock.now = 50
+        cache.set("a", 2)
+        clock.now = 100
+        assert cache.get_with_age("a") == (2, 50)
+
+    def test_invalidate_and_stats(self):
+        cache = TTLCache(10, 60, FakeClock())
+        cache.set("a", False)
+        assert cache.get("a", True) is False
+        cache.invalidate("a")
+        assert cache.get("a", True) is True
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "size": 0, "max_size": 10}
+
+    def test_zero_size_stores_nothing(self):
+        cache = TTLCache(0, 60, FakeClock())
+        cache.set("a", 1)
+        assert cache.get("a") is None
@@ -3,6 +3,7 @@ import pytest
 from datetime import datetime
 
 from bot import config
+from bot.commands import debt_display
 from tests.conftest import DummyInteraction, DummyUser
 from fractions import Fraction
 
@@ -127,6 +128,29 @@ class TestGetAllDebtsCommand:
             description = table_calls[0]['kwargs']['description']
             assert health_msg in description
 
+    @pytest.mark.asyncio
+    async def test_resolves_names_in_one_batch(self, bot, shared, monkeypatch):
+        from bot.commands import debt_display
+        lookups = []
+        async def fake_get_display_names(client, user_ids, guild=None):
+            lookups.append(list(user_ids))
+            return {user_id: f"Name{user_id}" for user_id in user_ids}
+        monkeypatch.setattr(debt_display, 'get_display_names', fake_get_display_names)
+
+        interaction = DummyInteraction(DummyUser(1), bot)
+        shared.all_debts_response = {
+            'total_in_circulation': '3',
+            '2': {'owes': '1', 'is_owed': '2'},
+            '1': {'owes': '2', 'is_owed': '1'}
+        }
+        await bot.tree.commands[config.GET_ALL_DEBTS_COMMAND](interaction)
+
+        assert lookups == [['2', '1']]
+        rows = interaction.send_two_column_table_message_calls[0]['kwargs']['data']
+        assert [row['name'] for row in rows] == ['Name2', 'Name1']
+        assert rows[0]['Owes'] == '1'
+        assert rows[0]['Is Owed'] == '2'
+
 class TestDebtsWithUserCommand:
     @pytest.mark.asyncio
     async def test_no_debts_message(self, bot, shared):
@@ -183,7 +207,7 @@ class TestDebtsWithUserCommand:
     @patch("bot.commands.debt_display.handle_error")
     @pytest.mark.asyncio
     async def test_error_handling(self, mock_handle_error, bot, monkeypatch):
-        def broken_api_call(_):
+        async def broken_api_call(*_):
             raise Exception("Boom")
 
         monkeypatch.setattr("bot.commands.debt_display.api_client.debts_with_user", broken_api_call)
@@ -242,3 +266,53 @@ class TestTransactionsCommand:
         assert "Repayment" in description
         assert "Total Owed In Period" in description
         assert "Total Cashed Out In Period" in description
+
+    @pytest.mark.asyncio
+    async def test_transactions_command_lists_first_page(self, bot, shared, monkeypatch):
+        def transaction(reason):
+            return {"type": "owe", "debtor": "1", "creditor": "2", "amount": "1", "reason": reason, "timestamp": "2025-01-02T12:00:00"}
+
+        requested = []
+        async def get_transactions(**kwargs):
+            requested.append(kwargs)
+            return {"start_date": "2025-01-01", "end_date": "2025-01-31", "transactions": [transaction("Lunch")], "next_cursor": "page-2"}
+        monkeypatch.setattr(shared.fake_api, "get_transactions", get_transactions)
+        summaries = []
+        async def get_transaction_summary(**kwargs):
+            summaries.append(kwargs)
+            return {"totals": {"owe": {"count": 7, "amount": "7"}}}
+        monkeypatch.setattr(shared.fake_api, "get_transaction_summary", get_transaction_summary)
+        monkeypatch.setattr(debt_display, "format_overall_debts", lambda amount, *args: str(amount))
+
+        interaction = DummyInteraction(DummyUser(1), bot)
+        await bot.tree.commands["transactions"](interaction)
+
+        assert len(requested) == 1
+        assert summaries[0]["start_date"] == "2025-01-01"
+        description = interaction.send_info_message_calls[0]['kwargs']['description']
+        assert "Lunch" in description
+        assert "Showing the first 1 transactions" in description
+        assert "Total Owed In Period: 7" in description
+
+    @pytest.mark.asyncio
+    async def test_transactions_command_summary_only(self, bot, shared):
+        shared.transaction_summary_response = {
+            "start_date": "2025-01-01",
+            "end_date": "2025-01-31",
+            "period": "day",
+            "totals": {"owe": {"count": 3, "amount": "5"}, "settle": {"count": 1, "amount": "3"}},
+            "buckets": {
+                "2025-01-02": {"owe": {"count": 2, "amount": "4"}},
+                "2025-01-03": {"owe": {"count": 1, "amount": "1"}, "settle": {"count": 1, "amount": "3"}},
+            }
+        }
+
+        interaction = DummyInteraction(DummyUser(1), bot)
+        await bot.tree.commands["transactions"](interaction, summary_only=True)
+
+        title = interaction.send_info_message_calls[0]['kwargs']['title']
+        description = interaction.send_info_message_calls[0]['kwargs']['description']
+        assert "Summary from 01-01-2025 until 31-01-2025" in title
+        assert "**02-01-2025**: Owed" in description
+        assert "Cashed Out" in description
+        assert "Total Owed In Period" in description
@@ -64,4 +64,33 @@ class TestSettleCommand:
         }
         calls = interaction.send_success_message_calls
         assert calls
-        assert 'Settled 5 testcoins with <@2>' in calls[0]['kwargs']['description']
\ No newline at end of file
+        assert 'Settled 5 testcoins with <@2>' in calls[0]['kwargs']['description']
+
+
+class TestSplitCommand:
+    @pytest.mark.parametrize(
+        "users, error_code", [
+            ("everyone", "NO_USERS_MENTIONED"),
+            ("<@2> <@1>", "CANNOT_OWE_SELF"),
+            ("<@2> <@0>", "CANNOT_OWE_BOT"),
+        ],
+        ids=["no_mentions", "cant_owe_self", "cant_owe_bot"]
+    )
+    @pytest.mark.asyncio
+    async def test_split_errors(self, bot, users, error_code):
+        interaction = DummyInteraction(DummyUser(1), bot)
+        await bot.tree.commands['split'](interaction, users, '1')
+        assert interaction.error is not None
+        assert interaction.error['kwargs']['error_code'] == error_code
+
+    @pytest.mark.asyncio
+    async def test_split_adds_every_debt_in_one_call(self, bot, shared):
+        interaction = DummyInteraction(DummyUser(1), bot)
+        await bot.tree.commands['split'](interaction, '<@2> <@!3> and <@2>', '1/2', reason='Round')
+        assert interaction.response.deferred
+        assert shared.fake_api.calls['add_debts_batch'] == {'debts': [
+            {'debtor': 2, 'creditor': 1, 'amount': '1/2', 'reason': 'Round'},
+            {'debtor': 3, 'creditor': 1, 'amount': '1/2', 'reason': 'Round'},
+        ]}
+        description = interaction.send_success_message_calls[0]['kwargs']['description']
+        assert '<@2>, <@3>' in description
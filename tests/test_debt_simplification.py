@@ -0,0 +1,118 @@
+from fractions import Fraction
+import random
+import pytest
+from api.debt_simplification import find_cycle, net_balances, pair_totals, plan_simplification, simplify_balances
+from api.debt_store import DebtStore
+from api.ledger import LedgerEntry
+
+def random_store(pair_count, user_count=50, seed=0):
+    rng = random.Random(seed)
+    store = DebtStore()
+    for _ in range(pair_count):
+        debtor_id, creditor_id = (str(user_id) for user_id in rng.sample(range(user_count), 2))
+        store.add_entry(debtor_id, creditor_id, LedgerEntry(rng.randint(1, 60), "", "01-01-2025"))
+    return store
+
+def balances_after(debts):
+    balances = {}
+    for debtor_id, creditor_id, ticks in debts:
+        balances[debtor_id] = balances.get(debtor_id, 0) - ticks
+        balances[creditor_id] = balances.get(creditor_id, 0) + ticks
+    return {user_id: balance for user_id, balance in balances.items() if balance}
+
+class TestSimplifyBalances:
+    @pytest.mark.parametrize("seed", range(5))
+    def test_keeps_every_balance_with_fewer_debts(self, seed):
+        store = random_store(400, seed=seed)
+        balances = net_balances(store.user_totals)
+        debts = simplify_balances(balances)
+
+        assert balances_after(debts) == balances
+        assert len(debts) < len(balances)
+        assert all(ticks > 0 for _, _, ticks in debts)
+        # Nobody both pays and receives
+        assert not {debtor_id for debtor_id, _, _ in debts} & {creditor_id for _, creditor_id, _ in debts}
+
+    def test_cycle_simplifies_to_nothing(self):
+        store = DebtStore()
+        for debtor_id, creditor_id in (("1", "2"), ("2", "3"), ("3", "1")):
+            store.add_entry(debtor_id, creditor_id, LedgerEntry(6, "", "01-01-2025"))
+        assert net_balances(store.user_totals) == {}
+        assert simplify_balances({}) == []
+
+    def test_chain_becomes_one_debt(self):
+        assert simplify_balances({"1": -6, "2": 0, "3": 6}) == [("1", "3", 6)]
+
+    def test_exact_with_unquantised_ticks(self):
+        balances = {"1": Fraction(-1, 3), "2": Fraction(-2, 3), "3": 1}
+        assert balances_after(simplify_balances(balances)) == balances
+
+    def test_result_is_deterministic(self):
+        balances = {"a": -3, "b": -3, "c": 3, "d": 3}
+        assert simplify_balances(balances) == simplify_balances(dict(reversed(balances.items())))
+
+def store_with(*pairs):
+    store = DebtStore()
+    for debtor_id, creditor_id in pairs:
+        store.add_entry(debtor_id, creditor_id, LedgerEntry(6, "", "01-01-2025"))
+    return store
+
+class TestFindCycle:
+    def test_finds_cycle_closed_by_new_debt(self):
+        store = store_with(("B", "C"), ("C", "A"), ("A", "B"))
+        assert find_cycle(store.data, "A", "B", 4) == ["A", "B", "C"]
+
+    def test_finds_shortest_cycle(self):
+        store = store_with(("B", "C"), ("C", "D"), ("D", "A"), ("B", "A"), ("A", "B"))
+        assert find_cycle(store.data, "A", "B", 4) == ["A", "B"]
+
+    def test_respects_max_length(self):
+        store = store_with(("B", "C"), ("C", "D"), ("D", "A"), ("A", "B"))
+        assert find_cycle(store.data, "A", "B", 3) is None
+        assert find_cycle(store.data, "A", "B", 4) == ["A", "B", "C", "D"]
+
+    def test_no_cycle_or_missing_debt(self):
+        store = store_with(("A", "B"), ("B", "C"))
+        assert find_cycle(store.data, "A", "B", 4) is None
+        assert find_cycle(store.data, "C", "A", 4) is None
+
+class TestPlanSimplification:
+    def test_one_transaction_per_changed_pair(self):
+        store = store_with(("1", "2"), ("2", "3"), ("1", "3"))
+        store.add_entry("1", "3", LedgerEntry(6, "", "02-01-2025"))
+        debts = simplify_balances(net_balances(store.user_totals))
+
+        changes, transactions = plan_simplification(store.data, debts, "Simplified", "03-01-2025")
+
+        # 1 owes 3 a total of 18 and 2 is square, so only 1 -> 3 is left
+        assert changes == {("1", "2"): [], ("2", "3"): [], ("1", "3"): store.data.debtors["1"].creditors["3"] + [LedgerEntry(6, "Simplified", "03-01-2025")]}
+        assert [(t.type, t.debtor, t.creditor, t.amount) for t in transactions] == [
+            ("settle", "1", "2", 1), ("settle", "2", "3", 1), ("owe", "1", "3", 1),
+        ]
+        assert {t.reason for t in transactions} == {"Simplified"}
+
+    def test_leaves_simplest_ledger_alone(self):
+        store = store_with(("1", "2"), ("3", "4"))
+        debts = simplify_balances(net_balances(store.user_totals))
+        assert plan_simplification(store.data, debts, "Simplified", "03-01-2025") == ({}, [])
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_applied_plan_matches_the_simplified_debts(self, seed):
+        store = random_store(300, seed=seed)
+        debts = simplify_balances(net_balances(store.user_totals))
+        ledger = store.data.copy_structure()
+        changes, transactions = plan_simplification(ledger, debts, "Simplified", "03-01-2025")
+        ledger.replace_pairs(changes)
+
+        assert pair_totals(ledger) == {(debtor_id, creditor_id): ticks for debtor_id, creditor_id, ticks in debts}
+        assert len(transactions) == len(changes)
+        # The store the copy came from is untouched
+        assert DebtStore.from_ledger(store.data).user_totals == store.user_totals
+        assert pair_totals(store.data) != pair_totals(ledger)
+
+class TestHelpers:
+    def test_pair_totals(self):
+        store = random_store(100)
+        totals = pair_totals(store.data)
+        assert sum(totals.values()) == store.total_in_circulation
+        assert len(totals) == sum(len(debtor.creditors) for debtor in store.data.debtors.values())
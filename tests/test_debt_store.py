@@ -0,0 +1,265 @@
+import asyncio
+import json
+import random
+import pytest
+import api.data_manager as data_manager
+from api.debt_store import DebtStore
+from api.storage.json_repository import JsonRepository
+from api.storage.sqlite_repository import SqliteRepository
+from api.utilities.debt_helpers import settle_debts_between_users
+from api.utilities.tick_helpers import from_ticks
+from api.ledger import LedgerEntry
+
+@pytest.fixture
+def debts_file(tmp_path):
+    data_manager.set_repository(JsonRepository(tmp_path))
+    yield tmp_path / "debts.json"
+    data_manager.set_repository(None)
+
+def add_entry(store, debtor="1", creditor="2", amount="1"):
+    store.add_entry(debtor, creditor, LedgerEntry.from_dict({"amount": amount, "timestamp": "01-01-2025"}))
+
+class TestDebtStore:
+    def test_load_reads_existing_ledger(self, debts_file):
+        debts_file.write_text(json.dumps({"debtors": {"1": {"creditors": {"2": [
+            {"amount": "1/2", "reason": "", "timestamp": "01-01-2025"}
+        ]}}}}))
+        store = DebtStore()
+        store.load()
+        assert str(store.data.debtors["1"].creditors["2"][0].amount) == "1/2"
+
+    @pytest.mark.asyncio
+    async def test_sync_mode_writes_on_commit(self, debts_file, monkeypatch):
+        monkeypatch.setattr("api.debt_store.config.DEBTS_DURABILITY_MODE", "sync")
+        store = DebtStore()
+        add_entry(store)
+        await store.commit()
+        assert not store.dirty
+        assert "1" in json.loads(debts_file.read_text())["debtors"]
+
+    @pytest.mark.asyncio
+    async def test_batched_mode_writes_in_background(self, debts_file, monkeypatch):
+        monkeypatch.setattr("api.debt_store.config.DEBTS_DURABILITY_MODE", "batched")
+        monkeypatch.setattr("api.debt_store.config.DEBTS_FLUSH_INTERVAL_MS", 10)
+        store = DebtStore()
+        await store.start()
+        add_entry(store)
+        await store.commit()
+        assert store.dirty
+        await asyncio.sleep(0.1)
+        assert not store.dirty
+        assert debts_file.exists()
+        await store.stop()
+
+    @pytest.mark.asyncio
+    async def test_shutdown_mode_writes_on_stop(self, debts_file, monkeypatch):
+        monkeypatch.setattr("api.debt_store.config.DEBTS_DURABILITY_MODE", "shutdown")
+        store = DebtStore()
+        await store.start()
+        add_entry(store)
+        await store.commit()
+        assert not debts_file.exists()
+        await store.stop()
+        assert "1" in json.loads(debts_file.read_text())["debtors"]
+
+    @pytest.mark.asyncio
+    async def test_sync_mode_groups_concurrent_commits(self, debts_file, monkeypatch):
+        monkeypatch.setattr("api.debt_store.config.DEBTS_DURABILITY_MODE", "sync")
+        monkeypatch.setattr("api.debt_store.config.DEBTS_GROUP_COMMIT_WINDOW_MS", 10)
+        writes = []
+        monkeypatch.setattr("api.debt_store.save_debt_pairs", lambda data, pairs: writes.append(data))
+        store = DebtStore()
+
+        async def owe(creditor):
+            add_entry(store, creditor=creditor)
+            await store.commit()
+
+        await asyncio.gather(*(owe(str(creditor)) for creditor in range(2, 52)))
+
+        assert len(writes) == 1
+        assert len(writes[0].debtors["1"].creditors) == 50
+
+    @pytest.mark.asyncio
+    async def test_sync_mode_undoes_changes_whose_write_failed(self, debts_file, monkeypatch):
+        monkeypatch.setattr("api.debt_store.config.DEBTS_DURABILITY_MODE", "sync")
+        monkeypatch.setattr("api.debt_store.config.DEBTS_GROUP_COMMIT_WINDOW_MS", 0)
+        store = DebtStore()
+        add_entry(store)
+        add_entry(store, debtor="3")
+        await store.commit()
+        written = store.data.to_dict()
+
+        def failing_save(data, pairs):
+            raise OSError("disk full")
+        monkeypatch.setattr("api.debt_store.save_debt_pairs", failing_save)
+        add_entry(store, amount="2")
+        store.replace_entries("3", "2", [])
+        with pytest.raises(OSError):
+            await store.commit()
+
+        assert store.data.to_dict() == written
+        assert store.user_totals == DebtStore.from_ledger(store.data).user_totals
+        assert store.verify()["ok"]
+        assert not store.dirty
+
+    @pytest.mark.asyncio
+    async def test_failed_write_also_fails_the_next_group(self, debts_file, monkeypatch):
+        monkeypatch.setattr("api.debt_store.config.DEBTS_DURABILITY_MODE", "sync")
+        monkeypatch.setattr("api.debt_store.config.DEBTS_GROUP_COMMIT_WINDOW_MS", 0)
+        store = DebtStore()
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_failing_flush():
+            started.set()
+            await release.wait()
+            raise OSError("disk full")
+        monkeypatch.setattr(store, "flush", slow_failing_flush)
+
+        add_entry(store)
+        first = asyncio.create_task(store.commit())
+        await started.wait()
+        add_entry(store, creditor="3")
+        second = asyncio.create_task(store.commit())
+        await asyncio.sleep(0)
+        release.set()
+
+        results = await asyncio.gather(first, second, return_exceptions=True)
+        assert [type(result) for result in results] == [OSError, OSError]
+        assert store.data.debtors == {}
+        assert store.total_in_circulation == 0
+
+    @pytest.mark.asyncio
+    async def test_sqlite_flush_only_writes_changed_pairs(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("api.debt_store.config.DEBTS_DURABILITY_MODE", "shutdown")
+        repository = SqliteRepository(tmp_path / "test.db")
+        data_manager.set_repository(repository)
+        try:
+            store = DebtStore()
+            add_entry(store, creditor="2")
+            add_entry(store, creditor="3")
+            add_entry(store, debtor="3", creditor="1")
+            await store.commit()
+            await store.flush()
+
+            written = []
+            save_debt_pairs = repository.save_debt_pairs
+            def recording_save(data, pairs):
+                written.append((data.to_dict(), set(pairs)))
+                save_debt_pairs(data, pairs)
+            monkeypatch.setattr(repository, "save_debt_pairs", recording_save)
+
+            add_entry(store, creditor="2", amount="2")
+            store.replace_entries("3", "1", [])
+            await store.commit()
+            await store.flush()
+
+            assert [pairs for _, pairs in written] == [{("1", "2"), ("3", "1")}]
+            assert list(written[0][0]["debtors"]) == ["1"]
+            assert repository.load_debts().to_dict() == store.data.to_dict()
+        finally:
+            data_manager.set_repository(None)
+            repository.close()
+
+    @pytest.mark.asyncio
+    async def test_take_over_writes_only_changed_pairs(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("api.debt_store.config.DEBTS_DURABILITY_MODE", "shutdown")
+        written = []
+        monkeypatch.setattr("api.debt_store.writes_debt_pairs", lambda: True)
+        monkeypatch.setattr("api.debt_store.save_debt_pairs", lambda data, pairs: written.append((data.to_dict(), set(pairs))))
+        store = DebtStore()
+        add_entry(store, creditor="2")
+        add_entry(store, creditor="3")
+        await store.commit()
+        await store.flush()
+        resets = []
+        store.add_reset_listener(lambda: resets.append(store.version))
+        version = store.version
+
+        ledger = store.data.copy_structure()
+        previous = ledger.replace_pairs({("1", "2"): [], ("2", "3"): [LedgerEntry(6, "", "03-01-2025")]})
+        store.take_over(DebtStore.from_ledger(ledger), previous)
+        await store.commit()
+        await store.flush()
+
+        assert resets == [version + 1]
+        assert written[1:] == [({"debtors": {"2": {"creditors": {"3": [{"amount": "1", "reason": "", "timestamp": "03-01-2025"}]}}}}, {("1", "2"), ("2", "3")})]
+        assert store.debtors_of("2") == []
+        assert store.verify()["ok"]
+
+class TestDebtorsByCreditorIndex:
+    def expected_index(self, store):
+        index = {}
+        for debtor_id, debtor in store.data.debtors.items():
+            for creditor_id in debtor.creditors:
+                index.setdefault(creditor_id, set()).add(debtor_id)
+        return index
+
+    def actual_index(self, store):
+        return {creditor_id: set(debtors) for creditor_id, debtors in store.debtors_by_creditor.items()}
+
+    def test_index_follows_owe_and_settle(self):
+        store = DebtStore()
+        entry = LedgerEntry(6, "", "01-01-2025")
+        store.add_entry("1", "3", entry)
+        store.add_entry("2", "3", entry)
+        store.add_entry("2", "1", entry)
+        assert store.debtors_of("3") == ["1", "2"]
+        assert self.actual_index(store) == self.expected_index(store)
+
+        store.replace_entries("1", "3", [])
+        assert store.debtors_of("3") == ["2"]
+        assert "1" not in store.data.debtors
+        store.replace_entries("2", "3", [entry])
+        store.replace_entries("2", "1", [])
+        assert store.debtors_of("1") == []
+        assert self.actual_index(store) == self.expected_index(store)
+
+    def test_load_rebuilds_index(self, debts_file):
+        debts_file.write_text(json.dumps({"debtors": {
+            "1": {"creditors": {"2": [{"amount": "1", "reason": "", "timestamp": "01-01-2025"}]}},
+            "3": {"creditors": {"2": [{"amount": "1", "reason": "", "timestamp": "01-01-2025"}]}},
+        }}))
+        store = DebtStore()
+        store.load()
+        assert store.debtors_of("2") == ["1", "3"]
+
+class TestRunningTotals:
+    def test_totals_stay_in_sync_with_ledger(self):
+        rng = random.Random(7)
+        store = DebtStore()
+        for _ in range(300):
+            debtor, creditor = rng.sample(["1", "2", "3", "4", "5"], 2)
+            pair = store.data.debtors.get(debtor)
+            if pair and creditor in pair.creditors and rng.random() < 0.4:
+                updated, _ = settle_debts_between_users(pair.creditors[creditor], rng.randint(1, 12))
+                store.replace_entries(debtor, creditor, updated)
+            else:
+                add_entry(store, debtor, creditor, amount=f"{rng.randint(1, 60)}/6")
+
+        assert store.verify() == {"ok": True, "drift": []}
+        expected_circulation = sum(
+            entry.amount
+            for debtor in store.data.debtors.values()
+            for entries in debtor.creditors.values()
+            for entry in entries
+        )
+        assert from_ticks(store.total_in_circulation) == expected_circulation
+
+    def test_settled_users_drop_out_of_totals(self):
+        store = DebtStore()
+        add_entry(store, "1", "2", "2")
+        store.replace_entries("1", "2", [])
+        assert store.user_totals == {}
+        assert store.total_in_circulation == 0
+
+    def test_verify_reports_drift(self):
+        store = DebtStore()
+        add_entry(store, "1", "2", "2")
+        store.user_totals["1"]["owes"] = 18
+        store.debtors_by_creditor["2"] = {}
+
+        report = store.verify()
+        assert not report["ok"]
+        assert {"field": "owes", "user_id": "1", "expected": "2", "actual": "3"} in report["drift"]
+        assert {"field": "debtors_by_creditor", "user_id": "2", "expected": ["1"], "actual": []} in report["drift"]
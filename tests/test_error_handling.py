@@ -1,6 +1,6 @@
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, patch
 import pytest
-import requests
+from bot.api_client import APIResponseError
 from bot.utilities.error_handling import format_error_message, get_error_message, handle_error, parse_api_error
 
 class TestFormatErrorMessage:
@@ -20,9 +20,7 @@ class TestGetErrorMessage:
 
 class TestParseApiError:
     def test_parse_api_error_string_code(self):
-        mock_response = MagicMock()
-        mock_response.json.return_value = {"detail": "VALIDATION_ERROR: Invalid input"}
-        exception = requests.exceptions.HTTPError(response=mock_response)
+        exception = APIResponseError(400, {"detail": "VALIDATION_ERROR: Invalid input"})
 
         with patch("bot.utilities.error_handling.get_error_message") as mock_get_error_message:
             mock_get_error_message.return_value = {"title": "Some Error", "description": "desc"}
@@ -30,9 +28,7 @@ class TestParseApiError:
             assert result["title"] == "Some Error"
 
     def test_parse_api_error_json_structure_unexpected(self):
-        mock_response = MagicMock()
-        mock_response.json.return_value = {"detail": {"not": "a string"}}
-        exception = requests.exceptions.HTTPError(response=mock_response)
+        exception = APIResponseError(400, {"detail": {"not": "a string"}})
 
         with patch("bot.utilities.error_handling.get_error_message") as mock_get_error_message:
             mock_get_error_message.return_value = {"title": "Fallback", "description": "desc"}
@@ -40,9 +36,8 @@ class TestParseApiError:
             assert result["title"] == "Fallback"
 
     def test_parse_api_error_json_raises(self):
-        mock_response = MagicMock()
-        mock_response.json.side_effect = Exception("fail")
-        exception = requests.exceptions.HTTPError(response=mock_response)
+        # The response body was not JSON
+        exception = APIResponseError(502, None)
 
         with patch("bot.utilities.error_handling.get_error_message") as mock_get_error_message:
             mock_get_error_message.return_value = {"title": "Parser failed", "description": "desc"}
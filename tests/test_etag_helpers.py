@@ -0,0 +1,24 @@
+import pytest
+from api.utilities.etag_helpers import etag_matches, make_etag, not_modified
+
+class FakeRequest:
+    def __init__(self, headers):
+        self.headers = headers
+
+class TestEtagMatches:
+    @pytest.mark.parametrize("header, expected", [
+        (None, False),
+        ('"abc-1"', True),
+        ('"abc-2"', False),
+        ('"abc-0", W/"abc-1"', True),
+        ("*", True),
+    ], ids=["missing", "exact", "stale", "list_with_weak", "wildcard"])
+    def test_etag_matches(self, header, expected):
+        headers = {} if header is None else {"if-none-match": header}
+        assert etag_matches(FakeRequest(headers), make_etag("abc-1")) is expected
+
+    def test_not_modified_has_no_body(self):
+        response = not_modified('"abc-1"')
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == '"abc-1"'
@@ -1,7 +1,8 @@
+import asyncio
 from unittest.mock import patch, AsyncMock, MagicMock, PropertyMock
 import pytest
 from discord import Message
-from bot.pint_bot import bot, on_message
+from bot.pint_bot import bot, on_message, stats_report
 
 class TestOnMessage:
     @pytest.mark.asyncio
@@ -32,3 +33,18 @@ class TestOnMessage:
             mock_message.add_reaction.assert_not_called()
         else:
             mock_message.add_reaction.assert_called_once_with(expected_reaction)
+
+class TestStatsReport:
+    def test_reports_api_read_counters(self):
+        with patch("bot.pint_bot.api_client.read_stats", return_value={"upstream": 3, "coalesced": 1, "in_flight": 0, "coalesced_rate": 0.25}):
+            assert stats_report() == "API reads: 3 sent, 1 coalesced (25%), 0 in flight"
+
+    @pytest.mark.asyncio
+    async def test_prints_the_report_every_interval(self, monkeypatch, capsys):
+        monkeypatch.setattr("bot.config.STATS_REPORT_INTERVAL", 0.01)
+        task = asyncio.create_task(bot._report_stats_periodically())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert "API reads:" in capsys.readouterr().out
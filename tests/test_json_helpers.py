@@ -0,0 +1,48 @@
+import json
+import pytest
+from fastapi.responses import JSONResponse
+import api.utilities.json_helpers as json_helpers
+from api.ledger import Ledger
+from api.storage.json_repository import JsonRepository
+from models import UserPreferences
+
+CONTENT = {"1": {"owes": "7/6", "is_owed": "0"}, "name": "Zoë", "entries": [{"reason": ""}]}
+
+@pytest.fixture(params=[True, False], ids=["fast", "pretty"])
+def fast_mode(request, monkeypatch):
+    monkeypatch.setattr("api.utilities.json_helpers.config.JSON_FAST_MODE", request.param)
+    return request.param
+
+class TestJsonHelpers:
+    def test_data_files_are_indented_only_when_not_fast(self, fast_mode):
+        text = json_helpers.dumps(CONTENT)
+        assert json.loads(text) == CONTENT
+        assert ("\n" in text) is not fast_mode
+
+    def test_models_are_indented_only_when_not_fast(self, fast_mode):
+        text = json_helpers.dump_model(UserPreferences(use_unicode=True))
+        assert json.loads(text) == {"use_unicode": True}
+        assert ("\n" in text) is not fast_mode
+
+    def test_response_matches_json_response(self, fast_mode):
+        assert json.loads(json_helpers.encode_response(CONTENT)) == CONTENT
+        if json_helpers.orjson is None:
+            assert json_helpers.encode_response(CONTENT) == JSONResponse(CONTENT).body
+
+    def test_fast_response_passes_encoded_bytes_through(self):
+        body = json_helpers.encode_response(CONTENT)
+        response = json_helpers.FastJSONResponse(body)
+        assert response.body == body
+        assert response.headers["content-type"] == "application/json"
+
+    def test_repository_round_trips_in_both_modes(self, fast_mode, tmp_path):
+        repository = JsonRepository(tmp_path)
+        ledger = Ledger.from_dict({"debtors": {"1": {"creditors": {"2": [
+            {"amount": "1/2", "reason": "Coffee", "timestamp": "01-01-2025"}
+        ]}}}})
+        repository.save_debts(ledger)
+        repository.save_user_preferences("1", UserPreferences(use_unicode=True))
+
+        assert repository.load_debts().to_dict() == ledger.to_dict()
+        assert repository.get_user_preferences("1").use_unicode is True
+        assert ("\n" in (tmp_path / "debts.json").read_text()) is not fast_mode
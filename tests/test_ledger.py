@@ -0,0 +1,45 @@
+from api.ledger import Ledger, LedgerEntry
+
+RAW = {"debtors": {
+    "1": {"creditors": {"2": [
+        {"amount": "1/2", "reason": "Coffee", "timestamp": "01-01-2025"},
+        {"amount": "2", "reason": "", "timestamp": "02-01-2025"},
+    ]}},
+    "3": {"creditors": {"2": [{"amount": "1/6", "reason": "Coffee", "timestamp": "01-01-2025"}]}},
+}}
+
+class TestLedger:
+    def test_round_trips_stored_form(self):
+        assert Ledger.from_dict(RAW).to_dict() == RAW
+
+    def test_entries_hold_ticks(self):
+        entries = Ledger.from_dict(RAW).debtors["1"].creditors["2"]
+        assert [entry.ticks for entry in entries] == [3, 12]
+
+    def test_reasons_are_interned(self):
+        ledger = Ledger.from_dict(RAW)
+        first = ledger.debtors["1"].creditors["2"][0]
+        second = ledger.debtors["3"].creditors["2"][0]
+        assert first.reason is second.reason
+
+    def test_entries_have_no_instance_dict(self):
+        assert not hasattr(LedgerEntry(1, "", "01-01-2025"), "__dict__")
+
+    def test_snapshot_is_unaffected_by_later_changes(self):
+        ledger = Ledger.from_dict(RAW)
+        snapshot = ledger.snapshot()
+        ledger.debtors["1"].creditors["2"].append(LedgerEntry(1, "", "03-01-2025"))
+        del ledger.debtors["3"]
+        assert snapshot.to_dict() == RAW
+
+    def test_copy_structure_shares_entry_lists(self):
+        ledger = Ledger.from_dict(RAW)
+        copy = ledger.copy_structure()
+        assert copy.debtors["1"].creditors["2"] is ledger.debtors["1"].creditors["2"]
+        previous = copy.replace_pairs({("1", "2"): [], ("3", "2"): [LedgerEntry(6, "", "03-01-2025")], ("4", "1"): [LedgerEntry(1, "", "03-01-2025")]})
+        assert previous == {("1", "2"): ledger.debtors["1"].creditors["2"], ("3", "2"): ledger.debtors["3"].creditors["2"], ("4", "1"): None}
+        assert ledger.to_dict() == RAW
+        assert copy.to_dict() == {"debtors": {
+            "3": {"creditors": {"2": [{"amount": "1", "reason": "", "timestamp": "03-01-2025"}]}},
+            "4": {"creditors": {"1": [{"amount": "1/6", "reason": "", "timestamp": "03-01-2025"}]}},
+        }}
@@ -5,6 +5,7 @@ class TestRegistration:
             'help',
             'repeat_that',
             'owe',
+            'split',
             config.GET_DEBTS_COMMAND,
             config.GET_ALL_DEBTS_COMMAND,
             config.DEBTS_WITH_USER_COMMAND,
@@ -0,0 +1,80 @@
+from api.debt_store import DebtStore
+from api.response_cache import ALL_DEBTS_KEY, ResponseCache, debts_between_key, user_debts_key
+from api.ledger import LedgerEntry
+
+def build_counter():
+    calls = []
+    def build():
+        calls.append(None)
+        return {"call": len(calls)}
+    return build, calls
+
+class TestResponseCache:
+    def test_hit_reuses_built_response(self):
+        cache = ResponseCache(max_size=4)
+        build, calls = build_counter()
+        assert cache.get_or_build(ALL_DEBTS_KEY, build) == {"call": 1}
+        assert cache.get_or_build(ALL_DEBTS_KEY, build) == {"call": 1}
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(max_size=2)
+        build, calls = build_counter()
+        cache.get_or_build("a", build)
+        cache.get_or_build("b", build)
+        cache.get_or_build("a", build)
+        cache.get_or_build("c", build)
+        cache.get_or_build("a", build)
+        cache.get_or_build("b", build)
+        assert len(calls) == 4
+        assert cache.stats()["evictions"] == 2
+        assert cache.stats()["size"] == 2
+
+    def test_zero_size_disables_caching(self):
+        cache = ResponseCache(max_size=0)
+        build, calls = build_counter()
+        cache.get_or_build(ALL_DEBTS_KEY, build)
+        cache.get_or_build(ALL_DEBTS_KEY, build)
+        assert len(calls) == 2
+        assert cache.stats()["size"] == 0
+
+    def test_invalidate_pair_only_drops_affected_keys(self):
+        cache = ResponseCache(max_size=16)
+        build, _ = build_counter()
+        keys = [
+            ALL_DEBTS_KEY,
+            user_debts_key("1"),
+            user_debts_key("2"),
+            user_debts_key("3"),
+            debts_between_key("1", "2"),
+            debts_between_key("2", "1"),
+            debts_between_key("1", "3"),
+        ]
+        for key in keys:
+            cache.get_or_build(key, build)
+
+        cache.invalidate_pair("1", "2")
+
+        assert cache.stats()["invalidations"] == 5
+        assert cache.stats()["size"] == 2
+        misses = cache.stats()["misses"]
+        cache.get_or_build(user_debts_key("3"), build)
+        cache.get_or_build(debts_between_key("1", "3"), build)
+        assert cache.stats()["misses"] == misses
+
+    def test_debt_store_changes_invalidate_cached_responses(self):
+        cache = ResponseCache(max_size=16)
+        store = DebtStore()
+        store.add_pair_listener(cache.invalidate_pair)
+        build, calls = build_counter()
+        cache.get_or_build(user_debts_key("2"), build)
+
+        entry = LedgerEntry(6, "", "01-01-2025")
+        store.add_entry("1", "2", entry)
+        cache.get_or_build(user_debts_key("2"), build)
+        store.replace_entries("1", "2", [])
+        cache.get_or_build(user_debts_key("2"), build)
+
+        assert len(calls) == 3
@@ -0,0 +1,295 @@
+import json
+from datetime import datetime, timezone
+import pytest
+import api.storage.transaction_segments as transaction_segments
+from api.storage.json_repository import JsonRepository
+from api.storage.sqlite_repository import SqliteRepository
+from api.ledger import Ledger
+from models import TransactionEntry, UserPreferences
+
+@pytest.fixture
+def json_repository(tmp_path, monkeypatch):
+    monkeypatch.setattr("api.storage.json_repository.config.TRANSACTIONS_STORAGE_MODE", "jsonl")
+    return JsonRepository(tmp_path)
+
+@pytest.fixture(params=["json", "segmented", "sqlite"])
+def repository(request, tmp_path, monkeypatch):
+    monkeypatch.setattr("api.storage.json_repository.config.TRANSACTIONS_STORAGE_MODE", "jsonl")
+    if request.param == "json":
+        yield JsonRepository(tmp_path)
+    elif request.param == "segmented":
+        monkeypatch.setattr("api.storage.json_repository.config.TRANSACTIONS_STORAGE_MODE", "segmented")
+        monkeypatch.setattr("api.storage.json_repository.config.TRANSACTIONS_SEGMENT_PERIOD", "day")
+        yield JsonRepository(tmp_path)
+    else:
+        repository = SqliteRepository(tmp_path / "test.db")
+        yield repository
+        repository.close()
+
+def make_entry(amount="1", debtor="1", creditor="2", type="owe", timestamp="2025-01-01T12:00:00Z"):
+    return TransactionEntry(type=type, debtor=debtor, creditor=creditor, amount=amount, timestamp=timestamp)
+
+class TestTransactionLog:
+    def test_append_writes_one_line_per_transaction(self, json_repository, tmp_path):
+        json_repository.append_transaction(make_entry("1"))
+        json_repository.append_transaction(make_entry("1/2", type="settle"))
+
+        lines = (tmp_path / "transactions.jsonl").read_text().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[1])["amount"] == "1/2"
+
+    def test_iter_transactions_skips_partial_line(self, json_repository, tmp_path):
+        json_repository.append_transaction(make_entry())
+        with (tmp_path / "transactions.jsonl").open("a") as log:
+            log.write('{"type": "owe", "debt')
+
+        assert len(list(json_repository.iter_transactions())) == 1
+
+    def test_append_after_partial_line_keeps_new_transactions(self, json_repository, tmp_path):
+        json_repository.append_transaction(make_entry("1"))
+        with (tmp_path / "transactions.jsonl").open("a") as log:
+            log.write('{"type": "owe", "debt')
+
+        json_repository.append_transaction(make_entry("2"))
+        json_repository.append_transaction(make_entry("3"))
+
+        assert [str(e.amount) for e in json_repository.iter_transactions()] == ["1", "2", "3"]
+
+    def test_legacy_file_is_migrated_once(self, json_repository, tmp_path):
+        legacy = {"transactions": [make_entry("1").model_dump(), make_entry("2").model_dump()]}
+        (tmp_path / "transactions.json").write_text(json.dumps(legacy))
+
+        json_repository.append_transaction(make_entry("3"))
+
+        assert not (tmp_path / "transactions.json").exists()
+        assert (tmp_path / "transactions.json.migrated").exists()
+        assert [str(e.amount) for e in json_repository.iter_transactions()] == ["1", "2", "3"]
+
+    def test_transactions_recorded_in_json_mode_are_kept(self, json_repository, tmp_path, monkeypatch):
+        json_repository.append_transaction(make_entry("1"))
+        json_repository.append_transaction(make_entry("1"))
+        monkeypatch.setattr("api.storage.json_repository.config.TRANSACTIONS_STORAGE_MODE", "json")
+        # As left by an interrupted migration, plus a repeat and a new one recorded in "json" mode
+        for amount in ("1", "1", "1", "2"):
+            json_repository.append_transaction(make_entry(amount))
+        monkeypatch.setattr("api.storage.json_repository.config.TRANSACTIONS_STORAGE_MODE", "jsonl")
+
+        json_repository.append_transaction(make_entry("3"))
+
+        assert [str(e.amount) for e in json_repository.iter_transactions()] == ["1", "1", "1", "2", "3"]
+        assert (tmp_path / "transactions.json.migrated").exists()
+
+    def test_legacy_mode_still_rewrites_json(self, json_repository, tmp_path, monkeypatch):
+        monkeypatch.setattr("api.storage.json_repository.config.TRANSACTIONS_STORAGE_MODE", "json")
+        json_repository.append_transaction(make_entry())
+
+        assert (tmp_path / "transactions.json").exists()
+        assert not (tmp_path / "transactions.jsonl").exists()
+        assert len(list(json_repository.iter_transactions())) == 1
+
+class TestTransactionSegments:
+    @pytest.fixture
+    def segmented_repository(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("api.storage.json_repository.config.TRANSACTIONS_STORAGE_MODE", "segmented")
+        monkeypatch.setattr("api.storage.json_repository.config.TRANSACTIONS_SEGMENT_PERIOD", "month")
+        return JsonRepository(tmp_path)
+
+    def test_appends_go_to_monthly_segments(self, segmented_repository, tmp_path):
+        segmented_repository.append_transaction(make_entry(timestamp="2025-01-31T23:59:59Z"))
+        segmented_repository.append_transaction(make_entry(timestamp="2025-02-01T00:00:00Z"))
+
+        segments = sorted(path.name for path in (tmp_path / "transactions").glob("*.jsonl"))
+        assert segments == ["2025-01.jsonl", "2025-02.jsonl"]
+        manifest = json.loads((tmp_path / "transactions" / "segments.json").read_text())
+        assert manifest["segments"]["2025-01"]["count"] == 1
+
+    def test_range_query_only_opens_overlapping_segments(self, segmented_repository, monkeypatch):
+        for month in ("01", "02", "03"):
+            segmented_repository.append_transaction(make_entry(timestamp=f"2025-{month}-15T12:00:00Z"))
+
+        opened = []
+        read_transaction_lines = transaction_segments.read_transaction_lines
+        def recording_reader(path):
+            opened.append(path.name)
+            return read_transaction_lines(path)
+        monkeypatch.setattr(transaction_segments, "read_transaction_lines", recording_reader)
+
+        found = list(segmented_repository.iter_transactions(
+            start=datetime(2025, 2, 1, tzinfo=timezone.utc),
+            end=datetime(2025, 2, 28, tzinfo=timezone.utc),
+        ))
+        assert [t.timestamp for t in found] == ["2025-02-15T12:00:00Z"]
+        assert opened == ["2025-02.jsonl"]
+
+    def test_stale_manifest_is_rebuilt(self, segmented_repository, tmp_path, monkeypatch):
+        segmented_repository.append_transaction(make_entry(timestamp="2025-01-15T12:00:00Z"))
+        with (tmp_path / "transactions" / "2025-01.jsonl").open("a") as segment:
+            segment.write(make_entry(timestamp="2025-01-20T12:00:00Z").model_dump_json() + "\n")
+
+        reopened = JsonRepository(tmp_path)
+        found = list(reopened.iter_transactions(start=datetime(2025, 1, 18, tzinfo=timezone.utc)))
+        assert [t.timestamp for t in found] == ["2025-01-20T12:00:00Z"]
+
+    def test_append_after_partial_line_keeps_new_transactions(self, segmented_repository, tmp_path):
+        segmented_repository.append_transaction(make_entry("1", timestamp="2025-01-15T12:00:00Z"))
+        with (tmp_path / "transactions" / "2025-01.jsonl").open("a") as segment:
+            segment.write('{"type": "owe", "debt')
+
+        segmented_repository.append_transaction(make_entry("2", timestamp="2025-01-16T12:00:00Z"))
+        segmented_repository.append_transaction(make_entry("3", timestamp="2025-01-17T12:00:00Z"))
+
+        reopened = JsonRepository(tmp_path)
+        assert [str(e.amount) for e in reopened.iter_transactions()] == ["1", "2", "3"]
+
+    def test_log_is_migrated_to_segments(self, segmented_repository, tmp_path):
+        (tmp_path / "transactions.jsonl").write_text(
+            make_entry(timestamp="2025-01-15T12:00:00Z").model_dump_json() + "\n"
+            + make_entry(timestamp="2025-03-15T12:00:00Z").model_dump_json() + "\n"
+        )
+
+        assert len(list(segmented_repository.iter_transactions())) == 2
+        assert (tmp_path / "transactions.jsonl.migrated").exists()
+        assert sorted(path.name for path in (tmp_path / "transactions").glob("*.jsonl")) == ["2025-01.jsonl", "2025-03.jsonl"]
+
+    def test_log_entries_missing_from_segments_are_added(self, segmented_repository, tmp_path):
+        segmented_repository.append_transaction(make_entry("1", timestamp="2025-01-15T12:00:00Z"))
+        (tmp_path / "transactions.jsonl").write_text(
+            make_entry("1", timestamp="2025-01-15T12:00:00Z").model_dump_json() + "\n"
+            + make_entry("2", timestamp="2025-03-15T12:00:00Z").model_dump_json() + "\n"
+        )
+
+        assert [str(e.amount) for e in segmented_repository.iter_transactions()] == ["1", "2"]
+        assert (tmp_path / "transactions.jsonl.migrated").exists()
+
+class TestRepository:
+    def test_debts_round_trip(self, repository):
+        data = Ledger.from_dict({"debtors": {"1": {"creditors": {"2": [
+            {"amount": "1/2", "reason": "Coffee", "timestamp": "01-01-2025"},
+            {"amount": "2", "reason": "", "timestamp": "02-01-2025"},
+        ]}}}})
+        repository.save_debts(data)
+        assert repository.load_debts().to_dict() == data.to_dict()
+
+        repository.save_debts(Ledger())
+        assert repository.load_debts().debtors == {}
+
+    def test_iter_transactions_round_trip(self, repository):
+        repository.append_transaction(make_entry("3/2"))
+        repository.append_transaction(make_entry("2", debtor="3"))
+
+        entries = list(repository.iter_transactions())
+        assert [e.debtor for e in entries] == ["1", "3"]
+        assert str(entries[0].amount) == "3/2"
+
+    def test_append_transactions_in_one_write(self, repository):
+        repository.append_transaction(make_entry(debtor="1", timestamp="2025-01-02T12:00:00Z"))
+        repository.append_transactions([
+            make_entry(debtor="2", timestamp="2025-01-01T12:00:00Z"),
+            make_entry(debtor="3", timestamp="2025-01-02T13:00:00Z"),
+            make_entry(debtor="4", timestamp="2025-01-01T13:00:00Z"),
+        ])
+
+        assert sorted(e.debtor for e in repository.iter_transactions()) == ["1", "2", "3", "4"]
+        found = repository.iter_transactions(start=datetime(2025, 1, 2, tzinfo=timezone.utc))
+        assert [e.debtor for e in found] == ["1", "3"]
+
+    def test_iter_transactions_filters(self, repository):
+        repository.append_transaction(make_entry(debtor="1", creditor="2", timestamp="2025-01-01T12:00:00Z"))
+        repository.append_transaction(make_entry(debtor="2", creditor="3", type="settle", timestamp="2025-01-02T12:00:00Z"))
+        repository.append_transaction(make_entry(debtor="3", creditor="1", timestamp="2025-01-03T12:00:00"))
+        repository.append_transaction(make_entry(debtor="1", creditor="3", timestamp="2025-01-04T12:00:00+01:00"))
+
+        def debtors(**filters):
+            return [t.debtor + t.creditor for t in repository.iter_transactions(**filters)]
+
+        assert debtors(user_id="1") == ["12", "31", "13"]
+        assert debtors(transaction_type="settle") == ["23"]
+        assert debtors(
+            start=datetime(2025, 1, 2, tzinfo=timezone.utc),
+            end=datetime(2025, 1, 3, 23, 59, 59, 999999, tzinfo=timezone.utc),
+        ) == ["23", "31"]
+        assert debtors(user_id="3", transaction_type="owe", start=datetime(2025, 1, 3, tzinfo=timezone.utc)) == ["31", "13"]
+        assert debtors(user_id="1", counterparty_id="3") == ["31", "13"]
+
+    def test_preferences(self, repository):
+        assert repository.get_user_preferences("1") is None
+        repository.save_user_preferences("1", UserPreferences(use_unicode=True))
+        assert repository.get_user_preferences("1").use_unicode is True
+        repository.save_user_preferences("1", UserPreferences(use_unicode=False))
+        assert repository.get_user_preferences("1").use_unicode is False
+
+class TestSqliteRepository:
+    def test_save_debt_pairs_only_touches_those_pairs(self, tmp_path):
+        repository = SqliteRepository(tmp_path / "test.db")
+        repository.save_debts(Ledger.from_dict({"debtors": {
+            "1": {"creditors": {"2": [{"amount": "1", "timestamp": "01-01-2025"}]}},
+            "3": {"creditors": {"1": [{"amount": "2", "timestamp": "01-01-2025"}]}},
+        }}))
+
+        changed = Ledger.from_dict({"debtors": {"1": {"creditors": {"2": [
+            {"amount": "1", "timestamp": "01-01-2025"},
+            {"amount": "1/2", "timestamp": "02-01-2025"},
+        ]}}}})
+        repository.save_debt_pairs(changed, [("1", "2"), ("2", "3")])
+        loaded = repository.load_debts()
+        assert [str(e.amount) for e in loaded.debtors["1"].creditors["2"]] == ["1", "1/2"]
+        assert str(loaded.debtors["3"].creditors["1"][0].amount) == "2"
+
+        repository.save_debt_pairs(Ledger(), [("3", "1")])
+        assert "3" not in repository.load_debts().debtors
+        repository.close()
+
+    def test_imports_json_data_once(self, json_repository, tmp_path):
+        ledger = Ledger.from_dict({"debtors": {"1": {"creditors": {"2": [{"amount": "1/2", "timestamp": "01-01-2025"}]}}}})
+        json_repository.save_debts(ledger)
+        (tmp_path / "transactions.json").write_text(json.dumps({"transactions": [make_entry("1").model_dump()]}))
+        (tmp_path / "transactions.jsonl").write_text(make_entry("2").model_dump_json() + "\n")
+        json_repository.save_user_preferences("1", UserPreferences(use_unicode=True))
+
+        repository = SqliteRepository(tmp_path / "test.db")
+        assert repository.import_json(json_repository)
+        assert repository.load_debts().to_dict() == ledger.to_dict()
+        assert [str(e.amount) for e in repository.iter_transactions()] == ["1", "2"]
+        assert repository.get_user_preferences("1").use_unicode is True
+        assert (tmp_path / "transactions.json").exists()
+
+        assert not repository.import_json(json_repository)
+        assert len(list(repository.iter_transactions())) == 2
+        repository.close()
+
+    @pytest.mark.parametrize("mode, synchronous", [("sync", 2), ("batched", 1)], ids=["sync", "batched"])
+    def test_syncs_every_commit_in_sync_mode(self, tmp_path, monkeypatch, mode, synchronous):
+        monkeypatch.setattr("api.config.DEBTS_DURABILITY_MODE", mode)
+        repository = SqliteRepository(tmp_path / "test.db")
+        assert repository._connection.execute("PRAGMA synchronous").fetchone() == (synchronous,)
+        indexes = repository._connection.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'debt_entries'").fetchall()
+        assert indexes == [("idx_debt_entries_debtor",)]
+        repository.close()
+
+    def test_streams_transactions_while_writes_carry_on(self, tmp_path):
+        repository = SqliteRepository(tmp_path / "test.db")
+        repository.append_transactions([make_entry("1"), make_entry("2")])
+        transactions = repository.iter_transactions()
+        assert str(next(transactions).amount) == "1"
+
+        repository.append_transactions([make_entry("3")])
+
+        # The stream reads the snapshot it started from
+        assert [str(e.amount) for e in transactions] == ["2"]
+        assert [str(e.amount) for e in repository.iter_transactions()] == ["1", "2", "3"]
+        repository.close()
+
+class TestAtomicWrites:
+    def test_failed_write_keeps_previous_version(self, json_repository, tmp_path, monkeypatch):
+        first = Ledger.from_dict({"debtors": {"1": {"creditors": {"2": [{"amount": "1", "timestamp": "01-01-2025"}]}}}})
+        json_repository.save_debts(first)
+
+        def crash(*args):
+            raise OSError("disk full")
+        monkeypatch.setattr("api.storage.files.os.replace", crash)
+
+        with pytest.raises(OSError):
+            json_repository.save_debts(Ledger())
+
+        assert json_repository.load_debts().to_dict() == first.to_dict()
+        assert [path.name for path in tmp_path.iterdir()] == ["debts.json"]
@@ -0,0 +1,64 @@
+from fractions import Fraction
+import pytest
+from api.utilities.debt_helpers import debts_owed_by, settle_debts_between_users, sum_ticks
+from api.utilities.tick_helpers import format_ticks, from_ticks, normalize_ticks, parse_ticks, to_ticks
+from api.ledger import Ledger, LedgerDebtor, LedgerEntry
+
+@pytest.fixture(autouse=True)
+def sixths(monkeypatch):
+    monkeypatch.setattr("api.utilities.tick_helpers.config.SMALLEST_UNIT", Fraction(1, 6))
+
+def entry(amount):
+    return LedgerEntry.from_dict({"amount": amount, "timestamp": "01-01-2025"})
+
+class TestTicks:
+    @pytest.mark.parametrize("amount, ticks", [
+        ("1/6", 1),
+        ("1/2", 3),
+        ("5", 30),
+        ("1/7", Fraction(6, 7)),
+    ], ids=["one_tick", "half", "whole", "not_quantised"])
+    def test_round_trip(self, amount, ticks):
+        assert to_ticks(Fraction(amount)) == ticks
+        assert type(to_ticks(Fraction(amount))) is type(ticks)
+        assert from_ticks(ticks) == Fraction(amount)
+        assert format_ticks(ticks) == amount
+        assert parse_ticks(amount) == ticks
+
+    @pytest.mark.parametrize("text, ticks", [
+        ("-1/2", -3),
+        ("0.5", 3),
+        (" 2 ", 12),
+    ], ids=["negative", "decimal", "padded"])
+    def test_parse_other_forms(self, text, ticks):
+        assert parse_ticks(text) == ticks
+
+    def test_unquantised_remainders_collapse_back_to_int(self):
+        total = to_ticks(Fraction(1, 7)) + to_ticks(Fraction(6, 7))
+        assert normalize_ticks(total) == 6
+        assert type(normalize_ticks(total)) is int
+
+    def test_sum_ticks_mixes_legacy_amounts(self):
+        assert sum_ticks([entry("1/2"), entry("1/7")]) == Fraction(27, 7)
+        assert sum_ticks([entry("1/2"), entry("1/3")]) == 5
+
+class TestTickDebtHelpers:
+    def test_owed_by_sorted_by_subtotal(self):
+        data = Ledger({"1": LedgerDebtor({
+            "2": [entry("1/2")],
+            "3": [entry("1"), entry("1/6")],
+            "4": [entry("1/7")],
+        })})
+        owes, total = debts_owed_by(data, "1")
+        assert list(owes) == ["3", "2", "4"]
+        assert from_ticks(total) == Fraction(1, 2) + Fraction(7, 6) + Fraction(1, 7)
+
+    def test_settle_in_ticks_is_fifo(self):
+        updated, settled = settle_debts_between_users([entry("1/2"), entry("1")], 4)
+        assert settled == 4
+        assert [e.amount for e in updated] == [Fraction(5, 6)]
+
+    def test_settle_more_than_owed(self):
+        updated, settled = settle_debts_between_users([entry("1/2")], 12)
+        assert updated == []
+        assert settled == 3
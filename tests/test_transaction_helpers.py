@@ -0,0 +1,39 @@
+import pytest
+from fastapi import HTTPException
+from api.utilities.transaction_helpers import decode_cursor, encode_cursor, paginate
+
+class TestPaginate:
+    def test_pages_cover_every_item_once(self):
+        items = list(enumerate("abcdefg"))
+        pages, after = [], -1
+        while after is not None:
+            page, after = paginate(((key, item) for key, item in items if key > after), 3)
+            pages.append(page)
+        assert pages == [["a", "b", "c"], ["d", "e", "f"], ["g"]]
+
+    def test_exact_fit_has_no_next_page(self):
+        assert paginate(enumerate("abc"), 3) == (["a", "b", "c"], None)
+
+    def test_reads_one_item_past_the_page(self):
+        consumed = []
+        def items():
+            for key in range(10, 100):
+                consumed.append(key)
+                yield key, str(key)
+        page, after = paginate(items(), 3)
+        assert page == ["10", "11", "12"]
+        assert after == 12
+        assert consumed == [10, 11, 12, 13]
+
+class TestCursor:
+    def test_round_trip(self):
+        state = {"start_date": "2025-01-01", "user_id": None, "after": 200}
+        cursor = encode_cursor(state)
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == state
+
+    @pytest.mark.parametrize("cursor", ["not a cursor!", encode_cursor([1, 2]), "e30"[:2]], ids=["garbage", "not_a_dict", "truncated"])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor(cursor)
+        assert exc_info.value.detail == "INVALID_CURSOR"
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+import random
+import pytest
+from api.transaction_index import IndexedTransaction, TransactionIndex
+from api.utilities.transaction_helpers import timestamp_to_epoch, transaction_matches
+from models import TransactionEntry
+
+TIMESTAMP_FORMATS = ["%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%S.%f+02:00"]
+
+def random_transactions(count, seed=1):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    transactions = []
+    for _ in range(count):
+        moment = start + timedelta(seconds=rng.randrange(0, 90 * 86_400))
+        transactions.append(TransactionEntry(
+            type=rng.choice(["owe", "settle"]),
+            debtor=str(rng.randrange(5)),
+            creditor=str(rng.randrange(5, 10) % 8),
+            amount="1",
+            timestamp=moment.strftime(rng.choice(TIMESTAMP_FORMATS))
+        ))
+    return transactions
+
+class TestTransactionIndex:
+    @pytest.mark.parametrize("filters", [
+        {},
+        {"start": datetime(2025, 2, 1, tzinfo=timezone.utc), "end": datetime(2025, 2, 28, 23, 59, 59, 999999, tzinfo=timezone.utc)},
+        {"start": datetime(2025, 3, 1, tzinfo=timezone.utc), "user_id": "2"},
+        {"end": datetime(2025, 1, 10, tzinfo=timezone.utc), "transaction_type": "settle"},
+        {"start": datetime(2025, 1, 5, tzinfo=timezone.utc), "end": datetime(2025, 1, 5, tzinfo=timezone.utc)},
+        {"user_id": "3", "transaction_type": "owe", "start": datetime(2025, 1, 20, tzinfo=timezone.utc), "end": datetime(2025, 2, 10, tzinfo=timezone.utc)},
+        {"user_id": "1", "counterparty_id": "4"},
+        {"user_id": "1", "counterparty_id": "4", "transaction_type": "settle", "start": datetime(2025, 2, 1, tzinfo=timezone.utc)},
+        {"user_id": "9"},
+        {"transaction_type": "cashout"},
+    ], ids=["all", "month", "user_since", "type_until", "empty_range", "user_type_range", "pair", "pair_type_since", "unknown_user", "unknown_type"])
+    def test_query_matches_linear_scan(self, filters):
+        transactions = random_transactions(500)
+        index = TransactionIndex()
+        index.build(transactions[:250])
+        for transaction in transactions[250:]:
+            index.add(transaction)
+
+        expected = [t for t in transactions if transaction_matches(t, **filters)]
+        assert index.query(**filters) == expected
+
+    @pytest.mark.parametrize("in_order", [True, False], ids=["in_order", "out_of_order"])
+    @pytest.mark.parametrize("filters", [
+        {},
+        {"start": datetime(2025, 2, 1, tzinfo=timezone.utc), "end": datetime(2025, 2, 28, tzinfo=timezone.utc)},
+        {"user_id": "2"},
+        {"user_id": "1", "counterparty_id": "4"},
+        {"transaction_type": "settle"},
+    ], ids=["all", "month", "user", "pair", "type"])
+    def test_iter_matches_after_position(self, in_order, filters):
+        transactions = random_transactions(300)
+        if in_order:
+            transactions.sort(key=lambda t: timestamp_to_epoch(t.timestamp))
+        index = TransactionIndex()
+        index.build(transactions)
+
+        every_match = list(index.iter_matches(**filters))
+        assert [t for _, t in every_match] == index.query(**filters)
+        for after in (-1, 0, 57, 150, 299):
+            assert list(index.iter_matches(**filters, after=after)) == [
+                (position, t) for position, t in every_match if position > after
+            ]
+
+    def test_holds_compact_rows_and_returns_models(self):
+        transactions = random_transactions(50)
+        index = TransactionIndex()
+        index.build(transactions)
+
+        assert all(isinstance(row, IndexedTransaction) for row in index.transactions)
+        assert len({id(row.amount) for row in index.transactions}) == 1
+        found = index.query(user_id="1")
+        assert all(isinstance(transaction, TransactionEntry) for transaction in found)
+        assert found[0].model_dump() == next(t for t in transactions if "1" in (t.debtor, t.creditor)).model_dump()
+
+    def test_boundaries_are_inclusive(self):
+        index = TransactionIndex()
+        index.build([])
+        for timestamp in ["2025-01-01T00:00:00Z", "2025-01-01T23:59:59.999999Z", "2025-01-02T00:00:00Z"]:
+            index.add(TransactionEntry(type="owe", debtor="1", creditor="2", amount="1", timestamp=timestamp))
+
+        found = index.query(
+            start=datetime(2025, 1, 1, tzinfo=timezone.utc),
+            end=datetime.combine(datetime(2025, 1, 1).date(), datetime.max.time(), tzinfo=timezone.utc),
+        )
+        assert [t.timestamp for t in found] == ["2025-01-01T00:00:00Z", "2025-01-01T23:59:59.999999Z"]
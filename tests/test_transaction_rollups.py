@@ -0,0 +1,65 @@
+from datetime import date
+from fractions import Fraction
+import pytest
+from api.transaction_rollups import TransactionRollups
+from api.transaction_summary import TransactionSummary, transaction_day
+from tests.test_transaction_index import random_transactions
+
+AMOUNTS = ["1", "1/2", "3/4", "2", "5"]
+
+def varied_transactions(count):
+    return [
+        transaction.model_copy(update={"amount": Fraction(AMOUNTS[position % len(AMOUNTS)])})
+        for position, transaction in enumerate(random_transactions(count))
+    ]
+
+def scan_summary(transactions, start, end, user_id=None, transaction_type=None, period="day", per_user=False):
+    matching = [
+        transaction for transaction in transactions
+        if start <= transaction_day(transaction) <= end
+        and (not user_id or user_id in (transaction.debtor, transaction.creditor))
+        and (not transaction_type or transaction.type == transaction_type)
+    ]
+    return TransactionSummary.from_transactions(matching, period, per_user, user_id).to_dict()
+
+class TestTransactionRollups:
+    @pytest.mark.parametrize("filters", [
+        {},
+        {"start": date(2025, 2, 1), "end": date(2025, 2, 28)},
+        {"user_id": "2"},
+        {"user_id": "3", "transaction_type": "owe", "start": date(2025, 1, 20), "end": date(2025, 2, 10)},
+        {"transaction_type": "settle", "period": "week"},
+        {"per_user": True, "period": "month"},
+        {"user_id": "1", "per_user": True},
+        {"start": date(2025, 1, 5), "end": date(2025, 1, 5), "per_user": True},
+        {"user_id": "9"},
+        {"start": date(2024, 1, 1), "end": date(2024, 12, 31)},
+    ], ids=["all", "month", "user", "user_type_range", "type_weeks", "per_user_months", "user_per_user", "one_day", "unknown_user", "before_history"])
+    def test_summary_matches_scan_of_log(self, filters):
+        transactions = varied_transactions(500)
+        rollups = TransactionRollups()
+        rollups.build(transactions)
+
+        arguments = {"start": date(2025, 1, 1), "end": date(2025, 12, 31), **filters}
+        start, end = arguments.pop("start"), arguments.pop("end")
+        assert rollups.summarize(start, end, **arguments).to_dict() == scan_summary(transactions, start, end, **arguments)
+
+    def test_incremental_adds_match_rebuild(self):
+        transactions = varied_transactions(300)
+        incremental = TransactionRollups()
+        incremental.build(transactions[:100])
+        for transaction in transactions[100:]:
+            incremental.add(transaction)
+
+        rebuilt = TransactionRollups()
+        rebuilt.build(transactions)
+        assert incremental.daily == rebuilt.daily
+        assert incremental.daily_by_user == rebuilt.daily_by_user
+        assert incremental.days_between(date.min, date.max) == sorted(rebuilt.daily)
+
+    def test_build_replaces_previous_rollups(self):
+        rollups = TransactionRollups()
+        rollups.build(varied_transactions(50))
+        rollups.build([])
+        assert rollups.loaded
+        assert rollups.summarize(date.min, date.max).to_dict()["totals"] == {}
@@ -0,0 +1,51 @@
+from collections import Counter
+from fractions import Fraction
+import pytest
+from api.transaction_summary import TransactionSummary, transaction_day
+from models import TransactionEntry
+from tests.test_transaction_index import random_transactions
+
+def make_entry(transaction_type, debtor, creditor, amount, timestamp):
+    return TransactionEntry(type=transaction_type, debtor=debtor, creditor=creditor, amount=amount, timestamp=timestamp)
+
+class TestTransactionSummary:
+    def test_buckets_by_period(self):
+        transactions = [
+            make_entry("owe", "1", "2", "1/2", "2025-01-05T23:30:00Z"),
+            make_entry("owe", "1", "2", "1", "2025-01-06T00:30:00Z"),
+            make_entry("settle", "1", "2", "1/2", "2025-02-01T12:00:00Z"),
+        ]
+        assert list(TransactionSummary.from_transactions(transactions, "day").to_dict()["buckets"]) == [
+            "2025-01-05", "2025-01-06", "2025-02-01"
+        ]
+        weeks = TransactionSummary.from_transactions(transactions, "week").to_dict()["buckets"]
+        assert weeks == {
+            "2025-W01": {"owe": {"count": 1, "amount": "1/2"}},
+            "2025-W02": {"owe": {"count": 1, "amount": "1"}},
+            "2025-W05": {"settle": {"count": 1, "amount": "1/2"}},
+        }
+        months = TransactionSummary.from_transactions(transactions, "month").to_dict()
+        assert months["buckets"]["2025-01"] == {"owe": {"count": 2, "amount": "3/2"}}
+        assert months["totals"] == {"owe": {"count": 2, "amount": "3/2"}, "settle": {"count": 1, "amount": "1/2"}}
+
+    def test_offset_timestamps_are_bucketed_by_utc_day(self):
+        assert str(transaction_day(make_entry("owe", "1", "2", "1", "2025-01-02T01:00:00+02:00"))) == "2025-01-01"
+
+    @pytest.mark.parametrize("period", ["day", "week", "month"])
+    def test_matches_naive_totals(self, period):
+        transactions = random_transactions(500)
+        summary = TransactionSummary.from_transactions(transactions, period, per_user=True).to_dict()
+
+        counts = Counter(transaction.type for transaction in transactions)
+        assert {t: totals["count"] for t, totals in summary["totals"].items()} == counts
+        assert sum(bucket.get("owe", {}).get("count", 0) for bucket in summary["buckets"].values()) == counts["owe"]
+
+        owed_by_user = Counter()
+        for transaction in transactions:
+            if transaction.type == "owe":
+                owed_by_user[transaction.debtor] += transaction.amount
+        assert {
+            user_id: Fraction(types["owe"]["debtor"]["amount"])
+            for user_id, types in summary["users"].items()
+            if "debtor" in types.get("owe", {})
+        } == owed_by_user
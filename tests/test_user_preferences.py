@@ -1,5 +1,12 @@
+import asyncio
 import pytest
+from bot.utilities import user_preferences
+from bot.utilities.cache import TTLCache
 from tests.conftest import DummyInteraction, DummyUser
+from tests.test_cache import FakeClock
+
+# The autouse fixtures replace this with a fake, so keep the real one for testing the cache
+fetch_unicode_preference = user_preferences.fetch_unicode_preference
 
 class TestSetUnicodePreferenceCommand:
     @pytest.mark.parametrize("pref", [True, False])
@@ -10,4 +17,90 @@ class TestSetUnicodePreferenceCommand:
         assert shared.fake_api.calls['set_unicode_preference'] == {'user_id': "1", 'use_unicode': pref}
         calls = interaction.send_success_message_calls
         assert calls
-        assert calls[0]['kwargs']['title'] == 'Preference Updated'
\ No newline at end of file
+        assert calls[0]['kwargs']['title'] == 'Preference Updated'
+
+    @pytest.mark.parametrize("pref", [True, False])
+    @pytest.mark.asyncio
+    async def test_updates_cached_preference(self, bot, pref, preference_cache):
+        interaction = DummyInteraction(DummyUser(1), bot)
+        await bot.tree.commands['set_unicode_preference'](interaction, pref)
+        assert preference_cache.cache.get("1") is pref
+
+class FakePreferenceAPI:
+    def __init__(self):
+        self.preferences = {}
+        self.calls = 0
+        self.fail = False
+
+    async def get_unicode_preference(self, user_id):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("API down")
+        return self.preferences.get(user_id, False)
+
+@pytest.fixture
+def preference_cache(monkeypatch):
+    class PreferenceCache: pass
+    fixture = PreferenceCache()
+    fixture.clock = FakeClock()
+    fixture.cache = TTLCache(10, 100, fixture.clock)
+    fixture.api = FakePreferenceAPI()
+    monkeypatch.setattr(user_preferences, "_unicode_preferences", fixture.cache)
+    monkeypatch.setattr(user_preferences, "api_client", fixture.api)
+    monkeypatch.setattr(user_preferences.config, "UNICODE_PREFERENCE_REFRESH_AFTER", 50)
+    return fixture
+
+class TestFetchUnicodePreference:
+    @pytest.mark.asyncio
+    async def test_fetches_once_until_expired(self, preference_cache):
+        preference_cache.api.preferences["1"] = True
+        assert await fetch_unicode_preference(None, 1) is True
+        assert await fetch_unicode_preference(None, "1") is True
+        assert preference_cache.api.calls == 1
+
+        preference_cache.clock.now = 100
+        assert await fetch_unicode_preference(None, "1") is True
+        assert preference_cache.api.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_write_through_skips_api(self, preference_cache):
+        user_preferences.remember_unicode_preference(1, True)
+        assert await fetch_unicode_preference(None, "1") is True
+        assert preference_cache.api.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_refreshes_old_entries_in_background(self, preference_cache):
+        user_preferences.remember_unicode_preference("1", False)
+        preference_cache.api.preferences["1"] = True
+        preference_cache.clock.now = 60
+
+        # The old value is returned straight away and only one refresh is started
+        assert await fetch_unicode_preference(None, "1") is False
+        assert await fetch_unicode_preference(None, "1") is False
+        await asyncio.gather(*user_preferences._refreshing.values())
+
+        assert preference_cache.api.calls == 1
+        assert user_preferences._refreshing == {}
+        assert await fetch_unicode_preference(None, "1") is True
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_cached_value(self, preference_cache):
+        user_preferences.remember_unicode_preference("1", True)
+        preference_cache.api.fail = True
+        preference_cache.clock.now = 60
+
+        assert await fetch_unicode_preference(None, "1") is True
+        await asyncio.gather(*user_preferences._refreshing.values())
+        assert preference_cache.cache.get("1") is True
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_is_not_cached(self, preference_cache, monkeypatch):
+        errors = []
+        async def fake_handle_error(interaction, error, **kwargs):
+            errors.append(kwargs["title"])
+        monkeypatch.setattr(user_preferences, "handle_error", fake_handle_error)
+        preference_cache.api.fail = True
+
+        assert await fetch_unicode_preference(None, "1") is False
+        assert errors == ["Error Fetching Unicode Preference"]
+        assert len(preference_cache.cache) == 0
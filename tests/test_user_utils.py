@@ -0,0 +1,114 @@
+import asyncio
+import discord
+import pytest
+from bot.utilities import user_utils
+from bot.utilities.cache import TTLCache
+from tests.conftest import DummyUser
+from tests.test_cache import FakeClock
+
+class FakeGuild:
+    def __init__(self, *members, id=100):
+        self.id = id
+        self.members = {member.id: member for member in members}
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+class FakeClient:
+    def __init__(self, *cached_users, missing=()):
+        self.users = {user.id: user for user in cached_users}
+        self.missing = set(missing)
+        self.fetched = []
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    def get_user(self, user_id):
+        return self.users.get(user_id)
+
+    async def fetch_user(self, user_id):
+        self.fetched.append(user_id)
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if user_id in self.missing:
+            raise discord.NotFound(type("Response", (), {"status": 404, "reason": "Not Found"})(), "Unknown User")
+        return DummyUser(user_id, f"Fetched{user_id}")
+
+@pytest.fixture
+def name_cache(monkeypatch):
+    class NameCache: pass
+    fixture = NameCache()
+    fixture.clock = FakeClock()
+    fixture.cache = TTLCache(100, 60, fixture.clock)
+    monkeypatch.setattr(user_utils, "_display_names", fixture.cache)
+    return fixture
+
+class TestGetDisplayName:
+    @pytest.mark.asyncio
+    async def test_caches_until_expired(self, name_cache):
+        client = FakeClient()
+        assert await user_utils.get_display_name(client, "1") == "Fetched1"
+        assert await user_utils.get_display_name(client, 1) == "Fetched1"
+        assert client.fetched == [1]
+
+        name_cache.clock.now = 60
+        await user_utils.get_display_name(client, "1")
+        assert client.fetched == [1, 1]
+
+    @pytest.mark.asyncio
+    async def test_force_refresh(self, name_cache):
+        client = FakeClient()
+        await user_utils.get_display_name(client, "1")
+        await user_utils.get_display_name(client, "1", True)
+        assert client.fetched == [1, 1]
+
+    @pytest.mark.asyncio
+    async def test_prefers_guild_member_then_user_cache(self, name_cache):
+        client = FakeClient(DummyUser(2, "Cached2"))
+        guild = FakeGuild(DummyUser(1, "Nickname1"))
+        assert await user_utils.get_display_name(client, "1", guild=guild) == "Nickname1"
+        assert await user_utils.get_display_name(client, "2", guild=guild) == "Cached2"
+        assert client.fetched == []
+
+    @pytest.mark.asyncio
+    async def test_caches_nicknames_per_guild(self, name_cache):
+        client = FakeClient(DummyUser(1, "Global1"))
+        first = FakeGuild(DummyUser(1, "Nickname1"), id=100)
+        second = FakeGuild(DummyUser(1, "Other1"), id=200)
+        assert await user_utils.get_display_name(client, "1", guild=first) == "Nickname1"
+        assert await user_utils.get_display_name(client, "1", guild=second) == "Other1"
+        assert await user_utils.get_display_name(client, "1") == "Global1"
+        first.members.clear()
+        assert (await user_utils.get_display_names(client, ["1"], first)) == {"1": "Nickname1"}
+
+    @pytest.mark.asyncio
+    async def test_unknown_user(self, name_cache):
+        client = FakeClient(missing={1})
+        assert await user_utils.get_display_name(client, "1") == "Unknown User (1)"
+
+class TestGetDisplayNames:
+    @pytest.mark.asyncio
+    async def test_resolves_misses_concurrently_within_limit(self, name_cache, monkeypatch):
+        monkeypatch.setattr(user_utils.config, "DISPLAY_NAME_LOOKUP_CONCURRENCY", 3)
+        client = FakeClient(DummyUser(2, "Cached2"))
+        name_cache.cache.set((None, "5"), "Remembered5")
+        user_ids = ["1", "2", 3, "4", "5", "6", "7", "8", "1"]
+
+        names = await user_utils.get_display_names(client, user_ids)
+
+        assert list(names) == ["1", "2", "3", "4", "5", "6", "7", "8"]
+        assert names["2"] == "Cached2"
+        assert names["5"] == "Remembered5"
+        assert names["8"] == "Fetched8"
+        assert sorted(client.fetched) == [1, 3, 4, 6, 7, 8]
+        assert client.most_in_flight == 3
+
+        await user_utils.get_display_names(client, user_ids)
+        assert len(client.fetched) == 6
+
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self, name_cache, monkeypatch):
+        monkeypatch.setattr(user_utils, "_display_names", TTLCache(4, 60, name_cache.clock))
+        await user_utils.get_display_names(FakeClient(), range(10))
+        assert len(user_utils._display_names) == 4